@@ -0,0 +1,329 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from config import *
+from filter_expr import compile_filter
+from join_state import JoinState, records_accumulator
+from mapped_csv import MappedCsv
+from parallel_calc import ProcessEngine
+from point_files import PointFileCache, make_pnt_dict, write_bundle, read_point_file
+from research_calc import ResearchCalc
+from research_cli import stream_three_points
+from sidecar import save_sidecar, load_sidecar, sidecar_path
+from table_columns import extend_columns, column_mask, column_numbers, group_three_points, iter_row_chunks, \
+    read_csv_batches, export_csv, sample_matching_rows, preview_three_points
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Версия формата файла результатов.
+RESULTS_VERSION = 1
+
+# Значения столбцов синтетической таблицы (по образцу resources/data.csv).
+HEADERS = ["ФИО", "Возраст", "Город", "Образование", "Должность", "Стаж", "ЗП"]
+SURNAMES = ["Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов", "Попов", "Васильев", "Соколов", "Михайлов",
+            "Новиков", "Федоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семенов", "Егоров", "Павлов"]
+NAMES = ["Александр", "Сергей", "Дмитрий", "Андрей", "Алексей", "Максим", "Евгений", "Иван", "Михаил", "Артем",
+         "Игорь", "Виктор", "Семён", "Игнатий", "Николай", "Павел"]
+PATRONYMICS = ["Александрович", "Сергеевич", "Дмитриевич", "Андреевич", "Алексеевич", "Леонидович",
+               "Кириллович", "Никитич", "Иванович", "Михайлович", "Петрович", "Юрьевич"]
+CITIES = ["Москва", "Северск", "Томск", "Орск", "Дзержинск", "Новороссийск", "Казань", "Омск", "Пермь", "Самара",
+          "Уфа", "Тверь", "Курск", "Сочи", "Иркутск"]
+EDUCATIONS = ["Высшее", "Среднее", "Средне-специальное"]
+POSITIONS = ["Реставратор", "Автомеханик", "Производственный мастер", "Актриса", "Инженер", "Бухгалтер",
+             "Программист", "Водитель", "Менеджер", "Продавец", "Врач", "Учитель", "Юрист", "Экономист"]
+
+FILTER_EXPRESSION = "Образование = Высшее AND Возраст >= 30 AND Стаж <= 5"
+
+
+def generate_table(filename: str, rows: int, seed: int, chunk_rows: int = 100000):
+    """
+    Запись синтетической таблицы сотрудников в CSV (UTF-8).
+
+    :param filename: Путь к файлу.
+    :param rows: Количество строк.
+    :param seed: Начальное значение генератора (одинаковые seed и rows дают одинаковый файл).
+    :param chunk_rows: Количество строк, генерируемых за раз.
+    :return: None
+    """
+    rng = np.random.default_rng(seed)
+    with open(filename, 'w', newline='', encoding='utf-8') as File:
+        File.write(",".join(HEADERS) + "\n")
+        for start in range(0, rows, chunk_rows):
+            size = min(chunk_rows, rows - start)
+            surname = rng.integers(len(SURNAMES), size=size)
+            name = rng.integers(len(NAMES), size=size)
+            patronymic = rng.integers(len(PATRONYMICS), size=size)
+            age = rng.integers(20, 66, size=size)
+            city = rng.integers(len(CITIES), size=size)
+            education = rng.choice(len(EDUCATIONS), size=size, p=[0.45, 0.25, 0.30])
+            position = rng.integers(len(POSITIONS), size=size)
+            experience = rng.integers(0, 41, size=size) % (age - 17)
+            # Зарплата зависит от образования и стажа, распределение - логнормальное.
+            wage = np.round(rng.lognormal(10.6 + 0.15 * (education == 0) + 0.01 * experience, 0.45)).astype(np.int64)
+
+            lines = [SURNAMES[s] + " " + NAMES[n] + " " + PATRONYMICS[p] + "," + str(a) + "," + CITIES[c] + "," +
+                     EDUCATIONS[e] + "," + POSITIONS[d] + "," + str(x) + "," + str(w) + "\n"
+                     for s, n, p, a, c, e, d, x, w in zip(surname.tolist(), name.tolist(), patronymic.tolist(),
+                                                          age.tolist(), city.tolist(), education.tolist(),
+                                                          position.tolist(), experience.tolist(), wage.tolist())]
+            File.writelines(lines)
+
+
+def generate_points(directory: str, count: int, seed: int) -> list:
+    """
+    Набор .pnt файлов (версии 2) с трехточками филиалов и файл-набор с теми же записями.
+
+    :param directory: Папка для файлов.
+    :param count: Количество трехточек.
+    :param seed: Начальное значение генератора.
+    :return: Список путей к одиночным файлам.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    records = []
+    filenames = []
+    for i in range(count):
+        avg = rng.normal(55000, 8000)
+        probabilities = rng.dirichlet([3, 6, 1.5])
+        three_points = [[avg * rng.uniform(0.35, 0.6), probabilities[0]], [avg, probabilities[1]],
+                        [avg * rng.uniform(1.8, 2.6), probabilities[2]]]
+        record = make_pnt_dict(three_points, name="Филиал %d" % i)
+        records.append(record)
+        filenames.append(os.path.join(directory, "branch%05d.pnt" % i))
+        with open(filenames[-1], 'w') as File:
+            json.dump(record, File)
+    write_bundle(os.path.join(directory, "bundle.pnt"), records)
+    return filenames
+
+
+def prepare_data(data_dir: str, rows: int, seed: int) -> tuple:
+    """
+    Таблица и набор .pnt файлов для размера rows (создаются один раз и переиспользуются).
+
+    :return: (путь к CSV, список .pnt файлов, путь к файлу-набору).
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    table = os.path.join(data_dir, "table_%d_seed%d.csv" % (rows, seed))
+    if not os.path.exists(table):
+        generate_table(table + ".tmp", rows, seed)
+        os.replace(table + ".tmp", table)
+
+    points_dir = os.path.join(data_dir, "points_%d_seed%d" % (rows, seed))
+    count = min(max(rows // 1000, 10), 10000)
+    bundle = os.path.join(points_dir, "bundle.pnt")
+    if os.path.exists(bundle):
+        filenames = [os.path.join(points_dir, "branch%05d.pnt" % i) for i in range(count)]
+    else:
+        filenames = generate_points(points_dir, count, seed)
+    return table, filenames, bundle
+
+
+def load_columns(filename: str, encoding: str = 'utf-8') -> tuple:
+    """
+    Чтение CSV в столбцы теми же порциями, что и фоновая загрузка в окне.
+
+    :return: (заголовки, столбцы, количество строк).
+    """
+    batches = read_csv_batches(filename, encoding, csv_first_batch_rows, csv_batch_rows)
+    headers = [name.strip() for name in next(batches)]
+    columns = [None] * len(headers)
+    row_count = 0
+    for batch in batches:
+        extend_columns(columns, batch, row_count)
+        row_count += len(batch)
+    return headers, columns, row_count
+
+
+def measure(function, repeats: int, number: int = 1) -> float:
+    """
+    Лучшее время одного вызова из нескольких повторов.
+
+    :param function: Функция без параметров.
+    :param repeats: Количество повторов.
+    :param number: Количество вызовов в одном повторе (для быстрых функций).
+    :return: Время в секундах.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_size(rows: int, seed: int, repeats: int, data_dir: str, workers: int = 0) -> list:
+    """
+    Замеры всех этапов для таблицы из rows строк.
+
+    :param workers: Число процессов для замеров расчета в пуле процессов (0 - без этих замеров).
+
+    :return: Список результатов {"name", "rows", "seconds"}.
+    """
+    table, point_filenames, bundle = prepare_data(data_dir, rows, seed)
+    results = []
+
+    def bench(name: str, function, number: int = 1, count: int = rows):
+        seconds = measure(function, repeats, number)
+        results.append({"name": name, "rows": count, "seconds": seconds})
+        print("%-24s %10d %12.6f с" % (name, count, seconds))
+
+    # Загрузка.
+    bench("csv_load", lambda: load_columns(table))
+    headers, columns, row_count = load_columns(table)
+    bench("mapped_open", lambda: MappedCsv(table, 'utf-8').close())
+    bench("sidecar_save", lambda: save_sidecar(table, 'utf-8', headers, columns))
+    bench("sidecar_load", lambda: load_sidecar(table, 'utf-8'))
+    os.remove(sidecar_path(table))
+
+    # Отбор строк по свойству.
+    education = columns[headers.index("Образование")]
+    age = columns[headers.index("Возраст")]
+    wage = columns[headers.index("ЗП")]
+    bench("filter_property", lambda: column_mask(education, "Высшее", "=") & column_mask(age, "30", ">="))
+    bench("filter_expression", lambda: compile_filter(FILTER_EXPRESSION).mask(lambda name: columns[headers.index(name)]))
+
+    # Расчеты.
+    wages = column_numbers(wage)[column_mask(education, "Высшее", "=")]
+    semi = ResearchCalc.calc_semi(wages)
+    bench("calc_semi", lambda: ResearchCalc.calc_semi(wages), count=len(wages))
+    bench("calc_three_points", lambda: ResearchCalc.calc_three_points(semi), number=1000, count=1)
+    bench("group_three_points", lambda: group_three_points(columns[headers.index("Город")], wage))
+
+    def preview():
+        rows, scanned = sample_matching_rows(row_count, point_preview_rows, point_preview_seed,
+                                             lambda rows: column_mask(education.take(rows), "Высшее", "="),
+                                             point_preview_max_rows)
+        return preview_three_points(wage.take(rows), np.ones(len(rows), dtype=bool), row_count,
+                                    scanned_rows=scanned)
+
+    bench("preview_three_points", preview, count=min(point_preview_rows, row_count))
+    bench("stream_cli", lambda: stream_three_points(table, "Образование", "Высшее", encoding='utf-8'))
+    if workers:
+        wage_values = column_numbers(wage)
+        education_mask = column_mask(education, "Высшее", "=")
+        city = columns[headers.index("Город")]
+        with ProcessEngine(workers) as engine:
+            # Первый расчет запускает процессы пула и в замер не входит.
+            engine.mask_moments(wage_values, education_mask)
+            bench("calc_semi_processes", lambda: engine.mask_moments(wage_values, education_mask))
+            bench("group_three_points_processes", lambda: group_three_points(city, wage, engine=engine))
+
+    # Сохранение.
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "table.csv")
+        bench("csv_save", lambda: export_csv(output, headers, iter_row_chunks(columns, row_count), row_count,
+                                             encoding='utf-8'))
+
+    # Объединение трехточек.
+    def join_files():
+        state = JoinState()
+        state.sync(point_filenames, PointFileCache(point_file_cache_size, point_file_workers))
+        ResearchCalc.calc_three_points(state.semi())
+
+    def join_bundle():
+        ResearchCalc.calc_three_points(records_accumulator(read_point_file(bundle)).semi())
+
+    state = JoinState()
+    cache = PointFileCache(point_file_cache_size, point_file_workers)
+    state.sync(point_filenames, cache)
+    bench("pnt_join", join_files, count=len(point_filenames))
+    bench("pnt_join_bundle", join_bundle, count=len(point_filenames))
+    bench("pnt_join_unchanged", lambda: state.sync(point_filenames, cache), count=len(point_filenames))
+    return results
+
+
+def compare_results(results: list, baseline: list, tolerance: float = 0.25, min_seconds: float = 0.001) -> list:
+    """
+    Сравнение замеров с эталонными.
+
+    :param results: Текущие результаты.
+    :param baseline: Эталонные результаты.
+    :param tolerance: Допустимое относительное замедление.
+    :param min_seconds: Замедления меньше этого времени не учитываются (погрешность таймера).
+    :return: Список замедлений (название, строки, эталонное время, текущее время).
+    """
+    reference = {(item["name"], item["rows"]): item["seconds"] for item in baseline}
+    regressions = []
+    for item in results:
+        before = reference.get((item["name"], item["rows"]))
+        if before is None:
+            continue
+        if item["seconds"] > before * (1 + tolerance) and item["seconds"] - before > min_seconds:
+            regressions.append((item["name"], item["rows"], before, item["seconds"]))
+    return regressions
+
+
+def run_benchmarks(sizes: list, seed: int = 2024, repeats: int = 3, data_dir: str = None, workers: int = 0) -> dict:
+    """
+    Замеры для всех размеров таблиц.
+
+    :return: Словарь для записи в JSON.
+    """
+    data_dir = data_dir or os.path.join(BENCH_DIR, "data")
+    results = []
+    for rows in sizes:
+        print("\n** Таблица из %d строк **" % rows)
+        results.extend(run_size(rows, seed, repeats, data_dir, workers))
+    return {"version": RESULTS_VERSION,
+            "meta": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+                     "processor": platform.processor(), "cpu_count": os.cpu_count(), "seed": seed,
+                     "repeats": repeats, "workers": workers,
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
+
+
+def main(argv=None) -> int:
+    """ Точка входа набора замеров """
+    parser = argparse.ArgumentParser(description="Замеры производительности расчета, загрузки и объединения трехточек.")
+    parser.add_argument("--sizes", nargs="+", type=lambda value: int(float(value)),
+                        default=[1000, 10000, 100000, 1000000],
+                        help="Количества строк таблиц (например 1e3 1e5 1e7).")
+    parser.add_argument("--seed", type=int, default=2024, help="Начальное значение генератора данных.")
+    parser.add_argument("--repeats", type=int, default=3, help="Количество повторов каждого замера.")
+    parser.add_argument("--data-dir", default=None, help="Папка для синтетических данных.")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="Файл результатов (JSON).")
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"),
+                        help="Эталонные результаты для сравнения.")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результаты как эталонные.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Допустимое относительное замедление.")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Число процессов для замеров расчета в пуле процессов (0 - без этих замеров).")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.seed, args.repeats, args.data_dir, args.workers)
+    with open(args.output, 'w') as File:
+        json.dump(report, File, indent=1)
+    print("\nРезультаты сохранены в " + args.output)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as File:
+            json.dump(report, File, indent=1)
+        print("Эталон сохранен в " + args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Эталон " + args.baseline + " не найден - сравнение пропущено.")
+        return 0
+
+    with open(args.baseline) as File:
+        regressions = compare_results(report["results"], json.load(File)["results"], args.tolerance)
+    for name, rows, before, after in regressions:
+        print("Замедление: %s [%d]: %.6f с -> %.6f с (x%.2f)" % (name, rows, before, after, after / before))
+    if regressions:
+        return 1
+    print("Замедлений относительно эталона нет.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,49 @@
 # Ожидаемые ключи при загрузке трехточки.
 pnt_keys = ["Min", "Avg", "Max"]
 
+
+# Варианты названия колонки с ЗП.
+wage_column_names = ["ЗП", "Заработная плата", "Зарплата"]
+
+# Размер первой и последующих порций строк при фоновой загрузке CSV.
+csv_first_batch_rows = 100
+csv_batch_rows = 5000
+
+# Количество запоминаемых результатов расчета трехточки по свойству.
+point_cache_size = 32
+
+# Файлы CSV не меньше этого размера (в байтах) открываются только для просмотра через отображение в память.
+csv_mapped_view_size = 512 * 1024 * 1024
+
+# Если выделенные строки образуют больше диапазонов, таблица перестраивается одной операцией.
+delete_ranges_limit = 16
+
+# Количество запоминаемых трехточек из .pnt файлов и число потоков их чтения.
+point_file_cache_size = 65536
+point_file_workers = 8
+
+# Файл сохраненного состояния объединения трехточек (в папке данных приложения).
+join_state_filename = "join_state.json"
+
+# Трассировка этапов операций с момента запуска (также включается переменной окружения RESEARCH_TRACE=1).
+trace_enabled = False
+
+# Бюджет времени от запуска до первой отрисовки окна в мс (проверяется отчетом window.py --startup-report).
+startup_budget_ms = 1000
+
+# Фоновый расчет трехточки: число потоков пула и количество строк, обрабатываемых между проверками отмены.
+point_calc_workers = 2
+point_calc_chunk_rows = 1000000
+
+# Расчет моментов в пуле процессов для больших таблиц: число процессов (0 - не использовать, None - по числу
+# ядер) и минимальное количество строк таблицы.
+process_pool_workers = 0
+process_pool_min_rows = 5000000
+
+# Предварительная трехточка для больших таблиц по повторяемой случайной выборке подходящих строк: размер выборки
+# (0 - без предварительного расчета), минимальное количество строк таблицы, начальное значение генератора и
+# наибольшее количество строк, просматриваемых для набора выборки.
+point_preview_rows = 20000
+point_preview_min_rows = 1000000
+point_preview_seed = 2024
+point_preview_max_rows = 2000000
@@ -0,0 +1,194 @@
+import re
+
+from lazy_import import np
+from research_calc import ErrorCodes, parse_number
+from table_columns import column_mask
+
+# Лексемы условия: скобки, запятая, операции, строки в кавычках и слова (названия столбцов, значения, ключевые слова).
+TOKEN_PATTERN = re.compile(r"""\s*(?:
+    (?P<lpar>\() | (?P<rpar>\)) | (?P<comma>,) |
+    (?P<op>>=|<=|!=|<>|==|=) |
+    (?P<quoted>"(?:[^"]|"")*"|'(?:[^']|'')*') |
+    (?P<word>[^\s(),=<>!"']+)
+)""", re.X)
+
+KEYWORDS = ("AND", "OR", "NOT", "IN")
+
+
+class FilterExpressionErrors(Exception):
+    pass
+
+
+def tokenize(text: str) -> list:
+    """
+    Разбиение условия на лексемы.
+
+    :param text: Текст условия.
+    :return: Список пар (тип, значение); ключевые слова имеют тип "kw".
+    """
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise FilterExpressionErrors("Неожиданный символ в позиции %d." % pos)
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "quoted":
+            value = value[1:-1].replace(value[0] * 2, value[0])
+        elif kind == "word" and value.upper() in KEYWORDS:
+            kind, value = "kw", value.upper()
+        tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """
+    Разбор условия методом рекурсивного спуска.
+
+    Грамматика:
+        expr       := and_expr (OR and_expr)*
+        and_expr   := not_expr (AND not_expr)*
+        not_expr   := NOT not_expr | '(' expr ')' | comparison
+        comparison := name op value | name [NOT] IN '(' value (',' value)* ')'
+    """
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.pos = 0
+        self.names = set()
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, kind: str, value: str = None) -> str:
+        token_kind, token_value = self.peek()
+        if token_kind != kind or (value is not None and token_value != value):
+            raise FilterExpressionErrors("Ожидалось %s, получено %s." % (value or kind, token_value))
+        self.pos += 1
+        return token_value
+
+    def accept(self, kind: str, value: str = None) -> bool:
+        token_kind, token_value = self.peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self):
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            raise FilterExpressionErrors("Лишние символы после условия: %s." % self.peek()[1])
+        return node
+
+    def expr(self):
+        node = self.and_expr()
+        while self.accept("kw", "OR"):
+            node = ("or", node, self.and_expr())
+        return node
+
+    def and_expr(self):
+        node = self.not_expr()
+        while self.accept("kw", "AND"):
+            node = ("and", node, self.not_expr())
+        return node
+
+    def not_expr(self):
+        if self.accept("kw", "NOT"):
+            return ("not", self.not_expr())
+        if self.accept("lpar"):
+            node = self.expr()
+            self.take("rpar")
+            return node
+        return self.comparison()
+
+    def value(self) -> str:
+        kind, value = self.peek()
+        if kind not in ("word", "quoted"):
+            raise FilterExpressionErrors("Ожидалось значение, получено %s." % value)
+        self.pos += 1
+        return value
+
+    def comparison(self):
+        name = self.value()
+        self.names.add(name)
+
+        negate = self.accept("kw", "NOT")
+        if negate or self.accept("kw", "IN"):
+            if negate:
+                self.take("kw", "IN")
+            self.take("lpar")
+            values = [self.value()]
+            while self.accept("comma"):
+                values.append(self.value())
+            self.take("rpar")
+            node = ("in", name, tuple(values))
+            return ("not", node) if negate else node
+
+        op = self.take("op")
+        value = self.value()
+        if op in (">=", "<=") and parse_number(value) is None:
+            raise FilterExpressionErrors("Сравнение %s возможно только с числом." % op)
+        if op in ("!=", "<>"):
+            return ("not", ("cmp", name, "=", value))
+        return ("cmp", name, "=" if op == "==" else op, value)
+
+
+class FilterExpression:
+    """ Скомпилированное условие отбора строк """
+
+    def __init__(self, text: str, node, names: set):
+        self.text = text
+        self.node = node
+        self.names = names
+
+    def _evaluate(self, node, get_column) -> "np.ndarray":
+        kind = node[0]
+        if kind == "and":
+            return self._evaluate(node[1], get_column) & self._evaluate(node[2], get_column)
+        if kind == "or":
+            return self._evaluate(node[1], get_column) | self._evaluate(node[2], get_column)
+        if kind == "not":
+            return ~self._evaluate(node[1], get_column)
+
+        column = get_column(node[1])
+        if column is None:
+            raise FilterExpressionErrors("В таблице нет столбца %s." % node[1])
+        if kind == "in":
+            mask = column_mask(column, node[2][0], "=")
+            for value in node[2][1:]:
+                mask |= column_mask(column, value, "=")
+            return mask
+        return column_mask(column, node[3], node[2])
+
+    def mask(self, get_column):
+        """
+        Векторное вычисление условия по столбцам таблицы.
+
+        :param get_column: Функция, возвращающая столбец по названию (или None).
+        :return: Булев массив строк или ErrorCodes.ERROR_NOT_PROPERTY для неизвестного столбца.
+        """
+        try:
+            return self._evaluate(self.node, get_column)
+        except FilterExpressionErrors:
+            return ErrorCodes.ERROR_NOT_PROPERTY
+
+
+def compile_filter(text: str):
+    """
+    Компиляция условия вида "Отдел = ИТ AND Возраст >= 30 AND NOT Город IN (Москва, Томск)".
+
+    Поддерживаются =, !=, >=, <=, IN, AND, OR, NOT и скобки. Названия и значения с пробелами
+    записываются в кавычках, десятичные дроби - через точку.
+
+    :param text: Текст условия.
+    :return: FilterExpression или ErrorCodes.ERROR_FILTER_SYNTAX.
+    """
+    try:
+        parser = _Parser(tokenize(text))
+        node = parser.parse()
+    except FilterExpressionErrors:
+        return ErrorCodes.ERROR_FILTER_SYNTAX
+    return FilterExpression(text, node, parser.names)
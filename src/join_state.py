@@ -0,0 +1,140 @@
+import json
+import os
+
+from lazy_import import np
+from research_calc import ErrorCodes, MomentAccumulator
+from tracing import tracer
+
+# Версия файла состояния объединения.
+JOIN_STATE_VERSION = 1
+
+
+def _moments(accumulator: MomentAccumulator) -> list:
+    return [accumulator.count, accumulator.mean, accumulator.m2, accumulator.m3, accumulator.m4]
+
+
+def _accumulator(moments: list) -> MomentAccumulator:
+    accumulator = MomentAccumulator()
+    accumulator.count, accumulator.mean, accumulator.m2, accumulator.m3, accumulator.m4 = moments
+    return accumulator
+
+
+def records_accumulator(records: list) -> MomentAccumulator:
+    """
+    Вклад трехточек файла в объединение: пары [x, p] как гистограмма с весами p (как в calc_semi).
+
+    :param records: Список PointRecord.
+    :return: MomentAccumulator.
+    """
+    pairs = np.array([pair for record in records for pair in record.points], dtype=np.float64).reshape(-1, 2)
+    return MomentAccumulator().update_batch(pairs[:, 0], pairs[:, 1])
+
+
+class JoinState:
+    """
+    Накопленное объединение трехточек с моментами вклада каждого файла.
+
+    При повторном объединении добавляются только новые и измененные файлы, а исключенные из выбора
+    вычитаются из общих моментов, поэтому пересчет занимает O(изменившихся файлов).
+    """
+
+    def __init__(self):
+        # Путь -> (время изменения, размер, накопитель вклада файла).
+        self.files = {}
+        self.total = MomentAccumulator()
+
+    def __len__(self):
+        return len(self.files)
+
+    def add(self, filename: str, mtime_ns: int, size: int, accumulator: MomentAccumulator):
+        """ Добавление вклада файла (прежний вклад того же файла заменяется) """
+        self.remove(filename)
+        self.files[filename] = (mtime_ns, size, accumulator)
+        self.total.merge(accumulator)
+
+    def remove(self, filename: str) -> bool:
+        """ Вычитание вклада файла из объединения """
+        entry = self.files.pop(filename, None)
+        if entry is None:
+            return False
+        if self.files:
+            self.total.remove(entry[2])
+        else:
+            self.total = MomentAccumulator()
+        return True
+
+    def sync(self, filenames: list, point_files) -> tuple | ErrorCodes:
+        """
+        Приведение объединения к выбранному набору файлов.
+
+        :param filenames: Пути к .pnt файлам, которые должны входить в объединение.
+        :param point_files: PointFileCache для чтения новых и измененных файлов.
+        :return: (количество прочитанных файлов, количество исключенных файлов) или ErrorCodes
+                 первого файла с ошибкой (тогда состояние не изменяется).
+        """
+        selected = {}
+        for filename in filenames:
+            path = os.path.abspath(filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return ErrorCodes.ERROR_FILE_NOT_LOADED
+            selected[path] = (stat.st_mtime_ns, stat.st_size)
+
+        changed = [path for path, key in selected.items()
+                   if path not in self.files or self.files[path][:2] != key]
+        with tracer.span("pnt_read", files=len(changed)):
+            loaded = point_files.load(changed)
+        for records in loaded:
+            if isinstance(records, ErrorCodes):
+                return records
+
+        removed = [path for path in self.files if path not in selected]
+        with tracer.span("join_merge", files=len(changed) + len(removed)):
+            for path in removed:
+                self.remove(path)
+            for path, records in zip(changed, loaded):
+                self.add(path, *selected[path], records_accumulator(records))
+        return len(changed), len(removed)
+
+    def semi(self) -> list | ErrorCodes:
+        """ Семиинварианты объединения в формате calc_semi """
+        return self.total.semi()
+
+    def to_dict(self) -> dict:
+        return {"version": JOIN_STATE_VERSION,
+                "total": _moments(self.total),
+                "files": {path: [mtime_ns, size, _moments(accumulator)]
+                          for path, (mtime_ns, size, accumulator) in self.files.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "JoinState":
+        state = cls()
+        state.total = _accumulator(data["total"])
+        for path, (mtime_ns, size, moments) in data["files"].items():
+            state.files[path] = (mtime_ns, size, _accumulator(moments))
+        return state
+
+    def save(self, filename: str):
+        """ Сохранение состояния через временный файл """
+        temp = filename + ".tmp"
+        with open(temp, 'w') as File:
+            json.dump(self.to_dict(), File)
+        os.replace(temp, filename)
+
+    @classmethod
+    def load(cls, filename: str) -> "JoinState":
+        """
+        Загрузка сохраненного состояния.
+
+        :param filename: Путь к файлу состояния.
+        :return: JoinState (пустой, если файла нет или он поврежден).
+        """
+        try:
+            with open(filename) as File:
+                data = json.load(File)
+            if data.get("version") != JOIN_STATE_VERSION:
+                return cls()
+            return cls.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return cls()
@@ -0,0 +1,32 @@
+import importlib
+
+
+class LazyModule:
+    """
+    Модуль, импортируемый при первом обращении к его атрибуту.
+
+    Импорт расчетных модулей не загружает NumPy, пока расчет действительно не понадобится, поэтому
+    запуск рабочих процессов и тестов, которым нужна только часть модулей, занимает миллисекунды.
+    Полученные атрибуты запоминаются в объекте, и повторные обращения идут без перехвата.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute: str):
+        value = getattr(self._load(), attribute)
+        setattr(self, attribute, value)
+        return value
+
+    def __repr__(self):
+        state = "загружен" if self._module is not None else "не загружен"
+        return "<LazyModule %s (%s)>" % (self._name, state)
+
+
+np = LazyModule("numpy")
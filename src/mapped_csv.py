@@ -0,0 +1,172 @@
+import csv
+import io
+import locale
+import mmap
+import threading
+
+from lazy_import import np
+from research_calc import LRUCache
+from table_columns import make_column, to_string_column
+
+
+class MappedCsv:
+    """
+    CSV-файл, отображенный в память, с индексом смещений строк.
+
+    Файл не загружается целиком: при открытии один раз строится массив смещений начала строк,
+    а сами строки разбираются по требованию.
+    """
+
+    def __init__(self, filename: str, encoding: str = None, scan_chunk: int = 8 * 1024 * 1024):
+        self.filename = filename
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self._file = open(filename, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = self._build_offsets(scan_chunk)
+        self.headers = self._parse(0)
+        self._rows = LRUCache(4096)
+        self._columns = LRUCache(4)
+        # Столбцы строятся и из потоков фонового расчета.
+        self._columns_lock = threading.Lock()
+
+    def _build_offsets(self, scan_chunk: int) -> "np.ndarray":
+        """
+        Построение смещений начала строк за один проход по файлу.
+
+        Переводы строк внутри полей в кавычках границей строки не считаются.
+
+        :param scan_chunk: Размер просматриваемого за раз участка файла.
+        :return: Массив int64 длины (количество строк + 1), последний элемент - конец данных.
+        """
+        size = len(self._map)
+        parts = [np.zeros(1, dtype=np.int64)]
+        in_quotes = False
+        for start in range(0, size, scan_chunk):
+            chunk = np.frombuffer(self._map, dtype=np.uint8, count=min(scan_chunk, size - start), offset=start)
+            newlines = np.flatnonzero(chunk == 10)
+            quotes = chunk == 34
+            if in_quotes or quotes.any():
+                parity = np.cumsum(quotes, dtype=np.int32)
+                inside = (parity[newlines] + in_quotes) % 2 == 1
+                newlines = newlines[~inside]
+                in_quotes = bool((parity[-1] + in_quotes) % 2)
+            parts.append(newlines.astype(np.int64) + start + 1)
+            del chunk
+
+        offsets = np.concatenate(parts)
+        if offsets[-1] != size:
+            offsets = np.append(offsets, size)
+        return offsets
+
+    @property
+    def row_count(self) -> int:
+        """ Количество строк данных (без заголовка) """
+        return max(len(self.offsets) - 2, 0)
+
+    def _parse(self, line: int, errors: str = "strict") -> list:
+        """ Разбор строки файла по ее номеру (0 - заголовок), errors - обработка ошибок декодирования """
+        raw = self._map[self.offsets[line]:self.offsets[line + 1]].decode(self.encoding, errors)
+        fields = next(csv.reader([raw.rstrip("\r\n")]), [])
+        return [field.strip() for field in fields]
+
+    def row(self, row: int) -> list:
+        """
+        Значения ячеек строки данных (разобранные строки запоминаются).
+
+        Строка не в кодировке файла выводится с символами замены: ошибка при отрисовке таблицы
+        завершила бы приложение. Расчеты по такой строке (column, sample_columns) прерываются ошибкой.
+
+        :param row: Номер строки данных.
+        :return: Список строк.
+        """
+        fields = self._rows.get(row)
+        if fields is None:
+            fields = self._parse(row + 1, "replace")
+            self._rows.put(row, fields)
+        return fields
+
+    def column(self, col: int, chunk_rows: int = 65536):
+        """
+        Столбец целиком в компактном виде (см. table_columns) для фильтрации и расчетов.
+
+        :param col: Номер столбца.
+        :param chunk_rows: Количество строк, разбираемых за раз.
+        :return: StringColumn или NumericColumn.
+        """
+        with self._columns_lock:
+            return self._build_column(col, chunk_rows)
+
+    def _build_column(self, col: int, chunk_rows: int):
+        column = self._columns.get(col)
+        if column is not None:
+            return column
+
+        for first in range(1, self.row_count + 1, chunk_rows):
+            last = min(first + chunk_rows, self.row_count + 1)
+            text = self._map[self.offsets[first]:self.offsets[last]].decode(self.encoding)
+            values = [row[col].strip() if col < len(row) else "" for row in csv.reader(io.StringIO(text))]
+            if column is None:
+                column = make_column(values)
+            elif not column.extend(values):
+                column = to_string_column(column)
+                column.extend(values)
+
+        if column is None:
+            column = make_column([])
+        self._columns.put(col, column)
+        return column
+
+    def sample_columns(self, cols: list, rows) -> dict:
+        """
+        Столбцы только для выбранных строк (без построения столбцов целиком и без кэша строк).
+
+        :param cols: Номера столбцов.
+        :param rows: Номера строк данных.
+        :return: Словарь {номер столбца: столбец}.
+        """
+        values = {col: [] for col in cols}
+        for row in rows:
+            fields = self._parse(int(row) + 1)
+            for col in cols:
+                values[col].append(fields[col] if col < len(fields) else "")
+        return {col: make_column(column) for col, column in values.items()}
+
+    def iter_rows(self, chunk_rows: int = 65536, transform=None):
+        """
+        Строки данных порциями для потоковой обработки всего файла.
+
+        :param chunk_rows: Количество строк в порции.
+        :param transform: Преобразование значений ячеек.
+        :return: Генератор списков строк.
+        """
+        for first in range(1, self.row_count + 1, chunk_rows):
+            last = min(first + chunk_rows, self.row_count + 1)
+            text = self._map[self.offsets[first]:self.offsets[last]].decode(self.encoding)
+            rows = []
+            for row in csv.reader(io.StringIO(text)):
+                if transform is None:
+                    rows.append([field.strip() for field in row])
+                else:
+                    rows.append([transform(field.strip()) for field in row])
+            yield rows
+
+    def close(self):
+        self._rows.clear()
+        self._columns.clear()
+        self._map.close()
+        self._file.close()
+
+
+class MappedColumns:
+    """ Доступ к столбцам MappedCsv по номеру, как к списку столбцов модели """
+
+    def __init__(self, mapped: MappedCsv):
+        self.mapped = mapped
+
+    def __len__(self):
+        return len(self.mapped.headers)
+
+    def __getitem__(self, col: int):
+        if not 0 <= col < len(self):
+            raise IndexError("Нет столбца с номером %d." % col)
+        return self.mapped.column(col)
@@ -0,0 +1,230 @@
+import os
+
+from lazy_import import np
+from research_calc import MomentAccumulator
+
+
+class SharedArray:
+    """
+    Массив NumPy в блоке разделяемой памяти.
+
+    Процессы пула подключаются к блоку по описанию (имя, тип, форма) и читают данные без копирования
+    и сериализации. Блок удаляется создавшим его процессом через close().
+    """
+
+    def __init__(self, array):
+        from multiprocessing import shared_memory
+        array = np.ascontiguousarray(array)
+        self._memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self._memory.buf)
+        self.array[...] = array
+        self.descriptor = (self._memory.name, array.dtype.str, array.shape)
+
+    def close(self):
+        self.array = None
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+
+def _attach(descriptor: tuple):
+    """
+    Подключение к массиву в разделяемой памяти из процесса пула.
+
+    :param descriptor: SharedArray.descriptor.
+    :return: (блок памяти, массив); блок закрывается после работы с массивом.
+    """
+    from multiprocessing import shared_memory
+    name, dtype, shape = descriptor
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _mask_moments(values_descriptor: tuple, mask_descriptor: tuple, start: int, stop: int) -> MomentAccumulator:
+    """ Моменты значений порции строк [start, stop), отмеченных в маске (пустые значения пропускаются) """
+    values_memory, values = _attach(values_descriptor)
+    mask_memory, mask = _attach(mask_descriptor)
+    try:
+        chunk = values[start:stop][mask[start:stop]]
+        return MomentAccumulator().update_batch(chunk[~np.isnan(chunk)])
+    finally:
+        # Блок можно закрыть только после освобождения всех массивов поверх него.
+        values = mask = None
+        values_memory.close()
+        mask_memory.close()
+
+
+def group_moments(group_ids, values, groups_count: int):
+    """
+    Центральные моменты значений по группам за один векторный проход.
+
+    :param group_ids: Номер группы для каждого значения.
+    :param values: Значения (NaN пропускаются).
+    :param groups_count: Количество групп.
+    :return: Массив (groups_count, 5): количество, среднее, m2, m3, m4 (суммы степеней отклонений).
+    """
+    valid = ~np.isnan(values)
+    group_ids = group_ids[valid]
+    values = values[valid]
+
+    counts = np.bincount(group_ids, minlength=groups_count).astype(np.float64)
+    with np.errstate(all="ignore"):
+        means = np.bincount(group_ids, weights=values, minlength=groups_count) / counts
+    means[counts == 0] = 0.
+    dev = values - means[group_ids]
+    dev2 = dev * dev
+    return np.column_stack([counts, means,
+                            np.bincount(group_ids, weights=dev2, minlength=groups_count),
+                            np.bincount(group_ids, weights=dev2 * dev, minlength=groups_count),
+                            np.bincount(group_ids, weights=dev2 * dev2, minlength=groups_count)])
+
+
+def merge_group_moments(a, b):
+    """
+    Точное объединение моментов групп двух частей данных (формулы Пебая, векторно по группам).
+
+    :param a: Результат group_moments первой части.
+    :param b: Результат group_moments второй части.
+    :return: Массив (groups_count, 5) моментов объединения.
+    """
+    na, mean_a, m2a, m3a, m4a = a.T
+    nb, mean_b, m2b, m3b, m4b = b.T
+    n = na + nb
+    delta = mean_b - mean_a
+    with np.errstate(all="ignore"):
+        delta_n = np.where(n > 0, delta / n, 0.)
+
+    m2 = m2a + m2b + delta * delta_n * na * nb
+    m3 = m3a + m3b + delta * delta_n ** 2 * na * nb * (na - nb) + 3. * delta_n * (na * m2b - nb * m2a)
+    m4 = m4a + m4b + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb) \
+        + 6. * delta_n ** 2 * (na * na * m2b + nb * nb * m2a) + 4. * delta_n * (na * m3b - nb * m3a)
+    return np.column_stack([n, mean_a + delta_n * nb, m2, m3, m4])
+
+
+def group_semi(moments):
+    """ Семиинварианты групп в формате calc_semi_grouped (для пустых групп - NaN и размер 0) """
+    counts = moments[:, 0]
+    with np.errstate(all="ignore"):
+        c2 = moments[:, 2] / counts
+        means = np.where(counts > 0, moments[:, 1], np.nan)
+        return np.column_stack([means, c2, moments[:, 3] / counts, moments[:, 4] / counts - 3 * c2 ** 2, counts])
+
+
+def _group_moments(ids_descriptor: tuple, values_descriptor: tuple, groups_count: int, start: int, stop: int):
+    """ Моменты групп для порции строк [start, stop) """
+    ids_memory, group_ids = _attach(ids_descriptor)
+    values_memory, values = _attach(values_descriptor)
+    try:
+        return group_moments(group_ids[start:stop], values[start:stop], groups_count)
+    finally:
+        group_ids = values = None
+        ids_memory.close()
+        values_memory.close()
+
+
+class ProcessEngine:
+    """
+    Расчет моментов в пуле процессов.
+
+    Таблица делится на порции строк, каждый процесс считает моменты своих порций по столбцам
+    в разделяемой памяти, а частичные моменты точно объединяются в семиинварианты.
+    """
+
+    def __init__(self, workers: int = None, chunks_per_worker: int = 2):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+        self._executor = None
+
+    def _pool(self):
+        """ Пул запускается при первом расчете и сохраняется для следующих (процессы создаются через spawn) """
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def ranges(self, row_count: int) -> list:
+        """ Границы порций строк """
+        chunks = max(min(self.workers * self.chunks_per_worker, row_count), 1)
+        bounds = np.linspace(0, row_count, chunks + 1).astype(np.int64).tolist()
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _run(self, function, args: list, progress=None, cancelled=None) -> list | None:
+        """
+        Выполнение function для каждой порции в пуле.
+
+        :return: Результаты в порядке порций или None, если расчет отменен.
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait
+        futures = [self._pool().submit(function, *arguments) for arguments in args]
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                if cancelled is not None and cancelled():
+                    return None
+                if progress is not None and done:
+                    progress((len(futures) - len(pending)) * 100 // len(futures))
+            return [future.result() for future in futures]
+        finally:
+            # Блоки памяти удаляются после выхода, поэтому незавершенные порции дожидаются.
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+    def mask_moments(self, values, mask, progress=None, cancelled=None) -> MomentAccumulator | None:
+        """
+        Моменты значений строк, отмеченных в маске.
+
+        :param values: Массив значений (float64, NaN - пустые ячейки).
+        :param mask: Булев массив подходящих строк.
+        :param progress: Функция, принимающая процент обработанных порций.
+        :param cancelled: Функция, возвращающая True, если расчет нужно прервать.
+        :return: MomentAccumulator или None, если расчет отменен.
+        """
+        with SharedArray(np.asarray(values, dtype=np.float64)) as shared_values, \
+                SharedArray(np.asarray(mask, dtype=bool)) as shared_mask:
+            parts = self._run(_mask_moments, [(shared_values.descriptor, shared_mask.descriptor, start, stop)
+                                              for start, stop in self.ranges(len(values))], progress, cancelled)
+        if parts is None:
+            return None
+        accumulator = MomentAccumulator()
+        for part in parts:
+            accumulator.merge(part)
+        return accumulator
+
+    def grouped_semi(self, group_ids, values, groups_count: int):
+        """
+        Семиинварианты всех групп (аналог ResearchCalc.calc_semi_grouped, NaN в values пропускаются).
+
+        :param group_ids: Номер группы (0..groups_count-1) для каждого значения.
+        :param values: Массив значений той же длины.
+        :param groups_count: Количество групп.
+        :return: Массив (groups_count, 5) семиинвариантов.
+        """
+        with SharedArray(np.asarray(group_ids, dtype=np.intp)) as shared_ids, \
+                SharedArray(np.asarray(values, dtype=np.float64)) as shared_values:
+            parts = self._run(_group_moments, [(shared_ids.descriptor, shared_values.descriptor, groups_count,
+                                                start, stop) for start, stop in self.ranges(len(values))])
+        moments = parts[0]
+        for part in parts[1:]:
+            moments = merge_group_moments(moments, part)
+        return group_semi(moments)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
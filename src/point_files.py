@@ -0,0 +1,325 @@
+import json
+import math
+import os
+
+from config import *
+from research_calc import ErrorCodes, LRUCache
+
+# Версия формата записи трехточки: 1 - значения строками "[x, p]", 2 - числами, с объемом выборки и семиинвариантами.
+PNT_VERSION = 2
+
+# Набор трехточек: строка-заголовок фиксированной длины, по одной записи в строке и строка с индексом смещений.
+BUNDLE_FORMAT = "pnt-bundle"
+BUNDLE_HEADER_SIZE = 128
+
+
+class PointRecord:
+    """ Трехточка из .pnt файла с семиинвариантами выборки (если они сохранены) """
+    __slots__ = ("points", "semi", "name")
+
+    def __init__(self, points: list, semi: list = None, name: str = None):
+        self.points = points
+        self.semi = semi
+        self.name = name
+
+    @property
+    def count(self):
+        """ Объем выборки или None для записей версии 1 """
+        return None if self.semi is None else self.semi[4]
+
+    def to_dict(self) -> dict:
+        return make_pnt_dict(self.points, self.semi, self.name)
+
+
+def make_pnt_dict(three_points: list, semi: list = None, name: str = None) -> dict:
+    """
+    Формирование записи трехточки версии 2 для сохранения в .pnt.
+
+    :param three_points: Результат calc_three_points.
+    :param semi: Результат calc_semi (семиинварианты и объем выборки).
+    :param name: Название трехточки (свойство или значение группы).
+    :return: {"version": 2, "name": ..., "Min": [x, p], "Avg": [x, p], "Max": [x, p], "count": n, "semi": [k1..k4]}
+    """
+    record = {"version": PNT_VERSION}
+    if name is not None:
+        record["name"] = str(name)
+    for key, point in zip(pnt_keys, three_points):
+        record[key] = [float(point[0]), float(point[1])]
+    if semi is not None:
+        record["count"] = int(semi[4])
+        record["semi"] = [float(value) for value in semi[:4]]
+    return record
+
+
+def parse_pnt_value(value) -> list | ErrorCodes:
+    """
+    Перевод строки вида "[x, p]" в список чисел без регулярных выражений.
+
+    :param value: Значение из .pnt файла.
+    :return: [x, p] или ErrorCodes.ERROR_NOT_NUMERIC.
+    """
+    if not isinstance(value, str):
+        return ErrorCodes.ERROR_NOT_NUMERIC
+    value = value.strip()
+    if not (value.startswith("[") and value.endswith("]")):
+        return ErrorCodes.ERROR_NOT_NUMERIC
+
+    parts = value[1:-1].split(",")
+    if len(parts) != 2:
+        return ErrorCodes.ERROR_NOT_NUMERIC
+    try:
+        pair = [float(parts[0]), float(parts[1])]
+    except ValueError:
+        return ErrorCodes.ERROR_NOT_NUMERIC
+    if not (math.isfinite(pair[0]) and math.isfinite(pair[1])):
+        return ErrorCodes.ERROR_NOT_NUMERIC
+    return pair
+
+
+def _numbers(value, length: int) -> list | None:
+    """ Список из length конечных чисел или None """
+    if not isinstance(value, list) or len(value) != length:
+        return None
+    for number in value:
+        if isinstance(number, bool) or not isinstance(number, (int, float)) or not math.isfinite(number):
+            return None
+    return [float(number) for number in value]
+
+
+def parse_point_record(json_data) -> PointRecord | ErrorCodes:
+    """
+    Разбор записи трехточки версии 1 или 2.
+
+    :param json_data: Запись, прочитанная из JSON.
+    :return: PointRecord или ErrorCodes.
+    """
+    if not isinstance(json_data, dict):
+        return ErrorCodes.ERROR_INVALID_FILE_FORMAT
+    version = json_data.get("version", 1)
+    if version not in (1, PNT_VERSION):
+        return ErrorCodes.ERROR_INVALID_FILE_FORMAT
+
+    points = []
+    for k in pnt_keys:
+        if k not in json_data:
+            return ErrorCodes.ERROR_POINT_NOT_LOADED
+        if version == 1:
+            pair = parse_pnt_value(json_data[k])
+        else:
+            pair = _numbers(json_data[k], 2) or ErrorCodes.ERROR_NOT_NUMERIC
+        if isinstance(pair, ErrorCodes):
+            return pair
+        points.append(pair)
+
+    semi = None
+    if version == PNT_VERSION and "semi" in json_data:
+        semi = _numbers(json_data["semi"], 4)
+        count = json_data.get("count")
+        if semi is None or isinstance(count, bool) or not isinstance(count, int) or count < 0:
+            return ErrorCodes.ERROR_NOT_NUMERIC
+        semi.append(count)
+
+    name = json_data.get("name")
+    return PointRecord(points, semi, None if name is None else str(name))
+
+
+def _bundle_header(line: bytes) -> dict | None:
+    """ Заголовок набора трехточек или None, если строка - не заголовок набора """
+    if not line.startswith(b'{"format"'):
+        return None
+    try:
+        header = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get("format") != BUNDLE_FORMAT:
+        return None
+    return header
+
+
+def write_bundle(filename: str, records) -> int:
+    """
+    Запись набора трехточек в один файл через временный файл.
+
+    :param filename: Путь к файлу.
+    :param records: Записи make_pnt_dict (название записи используется в индексе).
+    :return: Количество записанных трехточек.
+    """
+    index = []
+    temp = filename + ".tmp"
+    try:
+        with open(temp, 'wb') as File:
+            File.write(b" " * (BUNDLE_HEADER_SIZE - 1) + b"\n")
+            for record in records:
+                index.append([record.get("name", str(len(index))), File.tell()])
+                File.write(json.dumps(record).encode() + b"\n")
+
+            index_offset = File.tell()
+            File.write(json.dumps({"index": index}).encode() + b"\n")
+
+            # Заголовок с положением индекса записывается последним на место заполнителя.
+            header = json.dumps({"format": BUNDLE_FORMAT, "version": PNT_VERSION, "count": len(index),
+                                 "index": index_offset}).encode()
+            File.seek(0)
+            File.write(header.ljust(BUNDLE_HEADER_SIZE - 1) + b"\n")
+        os.replace(temp, filename)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+    return len(index)
+
+
+def iter_bundle(filename: str):
+    """
+    Последовательное чтение записей набора трехточек без загрузки файла целиком.
+
+    :param filename: Путь к файлу набора.
+    :return: Генератор PointRecord (или ErrorCodes для поврежденных записей).
+    """
+    with open(filename, 'rb') as File:
+        header = _bundle_header(File.readline())
+        if header is None:
+            yield ErrorCodes.ERROR_INVALID_FILE_FORMAT
+            return
+        for _ in range(header["count"]):
+            try:
+                yield parse_point_record(json.loads(File.readline()))
+            except ValueError:
+                yield ErrorCodes.ERROR_INVALID_FILE_FORMAT
+
+
+class PointBundle:
+    """ Чтение отдельных трехточек набора по названию через индекс смещений """
+
+    def __init__(self, filename: str):
+        self._file = open(filename, 'rb')
+        header = _bundle_header(self._file.readline())
+        if header is None:
+            self._file.close()
+            raise ValueError("Файл не является набором трехточек.")
+        self._file.seek(header["index"])
+        self.index = dict(json.loads(self._file.readline())["index"])
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    @property
+    def names(self) -> list:
+        return list(self.index)
+
+    def get(self, name: str) -> PointRecord | ErrorCodes | None:
+        """
+        Трехточка по названию.
+
+        :param name: Название записи.
+        :return: PointRecord, ErrorCodes для поврежденной записи или None, если записи нет.
+        """
+        offset = self.index.get(name)
+        if offset is None:
+            return None
+        self._file.seek(offset)
+        try:
+            return parse_point_record(json.loads(self._file.readline()))
+        except ValueError:
+            return ErrorCodes.ERROR_INVALID_FILE_FORMAT
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_point_file(filename: str) -> list | ErrorCodes:
+    """
+    Чтение всех трехточек .pnt файла: одиночной записи версии 1 или 2 либо набора.
+
+    :param filename: Путь к файлу.
+    :return: Список PointRecord или ErrorCodes.
+    """
+    if os.path.splitext(filename)[1] != '.pnt':
+        return ErrorCodes.ERROR_INVALID_FILE_FORMAT
+
+    try:
+        with open(filename, 'rb') as File:
+            data = File.read()
+    except OSError:
+        return ErrorCodes.ERROR_FILE_NOT_LOADED
+    if not data:
+        return ErrorCodes.ERROR_EMPTY_FILE
+
+    lines = data.split(b"\n")
+    header = _bundle_header(lines[0])
+    try:
+        if header is None:
+            records = [parse_point_record(json.loads(data))]
+        else:
+            records = [parse_point_record(json.loads(line)) for line in lines[1:header["count"] + 1]]
+    except ValueError:
+        return ErrorCodes.ERROR_INVALID_FILE_FORMAT
+
+    for record in records:
+        if isinstance(record, ErrorCodes):
+            return record
+    return records
+
+
+class PointFileCache:
+    """
+    Загрузка трехточек из множества .pnt файлов в пуле потоков.
+
+    Прочитанные трехточки запоминаются по (путь, время изменения, размер), поэтому при повторном
+    объединении читаются только новые и измененные файлы.
+    """
+
+    def __init__(self, maxsize: int = 65536, workers: int = 8):
+        self.workers = workers
+        self._points = LRUCache(maxsize)
+
+    @staticmethod
+    def _key(filename: str):
+        """ Ключ кэша файла или None, если файл недоступен """
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return os.path.abspath(filename), stat.st_mtime_ns, stat.st_size
+
+    def load(self, filenames: list) -> list:
+        """
+        Трехточки файлов в порядке списка.
+
+        :param filenames: Пути к .pnt файлам.
+        :return: Список результатов read_point_file.
+        """
+        keys = [self._key(filename) for filename in filenames]
+        results = [None] * len(filenames)
+        missing = []
+        for i, key in enumerate(keys):
+            if key is None:
+                results[i] = ErrorCodes.ERROR_FILE_NOT_LOADED
+                continue
+            results[i] = self._points.get(key)
+            if results[i] is None:
+                missing.append(i)
+
+        if len(missing) == 1:
+            results[missing[0]] = read_point_file(filenames[missing[0]])
+        elif missing:
+            # Пул потоков (и logging, который он тянет) загружается только при чтении нескольких файлов.
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+                for i, point in zip(missing, pool.map(read_point_file, [filenames[i] for i in missing])):
+                    results[i] = point
+
+        for i in missing:
+            self._points.put(keys[i], results[i])
+        return results
+
+    def clear(self):
+        self._points.clear()
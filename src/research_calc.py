@@ -0,0 +1,498 @@
+from collections import OrderedDict
+from enum import Enum
+import math
+import re
+
+from lazy_import import np
+
+# Число в ячейке: целое, отрицательное или десятичное с точкой либо запятой.
+# Ведущие нули и длинные числа (коды, телефоны) числами не считаются.
+NUMBER_PATTERN = re.compile(r"-?(?:0|[1-9]\d{0,14})(?:[.,]\d+)?")
+
+
+class ErrorCodes(Enum):
+    ERROR_STR_ARRAY = 0,
+    ERROR_TYPE_HISTOGRAM = 1,
+    ERROR_STR_HISTOGRAM = 2,
+    ERROR_ELEMENT_COUNT = 3,
+    ERROR_NOT_NUMERIC = 4,
+    ERROR_DISPERSION_ZERO = 5,
+    ERROR_UNDER_ROOT_NEGATIVE = 6,
+    ERROR_Q_ZERO = 7,
+    ERROR_Q_ECCENTRICITY = 8,
+    ERROR_PROBABILITY_NOT_1 = 9,
+    ERROR_MULTIPLE_ELEMENTS = 10,
+    ERROR_TABLE_NOT_LOADED = 11,
+    ERROR_FILE_NOT_LOADED = 12,
+    ERROR_INVALID_FILE_FORMAT = 13,
+    ERROR_EMPTY_FILE = 14,
+    ERROR_NO_LINE_SELECTED = 15
+    ERROR_NOT_PROPERTY = 16
+    ERROR_NOT_MONEY = 17
+    ERROR_POINT_NOT_LOADED = 18
+    ERROR_EMPTY_PROPERTY = 19
+    ERROR_FILTER_SYNTAX = 20
+    ERROR_CALC_FAILED = 21
+
+
+class ResearchCalcErrors(Exception):
+    pass
+
+
+class MomentAccumulator:
+    """
+    Накопитель центральных моментов до 4-го порядка.
+
+    Хранит количество, среднее и суммы степеней отклонений от среднего. Накопители отдельных частей
+    данных (файлов, потоков, разделов) объединяются точно через merge() без конкатенации данных.
+    """
+    __slots__ = ("count", "mean", "m2", "m3", "m4")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.m3 = 0.
+        self.m4 = 0.
+
+    @classmethod
+    def from_semi(cls, semi: list) -> "MomentAccumulator":
+        """
+        Накопитель по семиинвариантам в формате calc_semi (обращение semi()).
+
+        :param semi: [среднее, c2, c3, c4, объем выборки].
+        :return: MomentAccumulator.
+        """
+        accumulator = cls()
+        n = semi[4]
+        c2 = float(semi[1])
+        accumulator.count = n
+        accumulator.mean = float(semi[0])
+        accumulator.m2 = c2 * n
+        accumulator.m3 = float(semi[2]) * n
+        accumulator.m4 = (float(semi[3]) + 3 * c2 ** 2) * n
+        return accumulator
+
+    def copy(self) -> "MomentAccumulator":
+        """ Копия накопителя """
+        other = MomentAccumulator()
+        other.count, other.mean, other.m2, other.m3, other.m4 = self.count, self.mean, self.m2, self.m3, self.m4
+        return other
+
+    def _combine(self, count, mean, m2, m3, m4):
+        """ Объединение с моментами другой части данных (формулы Пебая) """
+        if count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.m3, self.m4 = count, mean, m2, m3, m4
+            return self
+
+        na, nb = self.count, count
+        n = na + nb
+        delta = mean - self.mean
+        delta_n = delta / n
+
+        new_m2 = self.m2 + m2 + delta * delta_n * na * nb
+        new_m3 = self.m3 + m3 + delta * delta_n ** 2 * na * nb * (na - nb) \
+            + 3. * delta_n * (na * m2 - nb * self.m2)
+        new_m4 = self.m4 + m4 + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb) \
+            + 6. * delta_n ** 2 * (na * na * m2 + nb * nb * self.m2) \
+            + 4. * delta_n * (na * m3 - nb * self.m3)
+
+        self.count = n
+        self.mean = self.mean + delta_n * nb
+        self.m2, self.m3, self.m4 = new_m2, new_m3, new_m4
+        return self
+
+    def update(self, value: float, count=1) -> "MomentAccumulator":
+        """
+        Добавление одного значения.
+
+        :param value: Значение.
+        :param count: Количество повторений значения.
+        :return: self
+        """
+        return self._combine(count, float(value), 0., 0., 0.)
+
+    def update_batch(self, values, counts=None) -> "MomentAccumulator":
+        """
+        Добавление массива значений за один векторный проход.
+
+        :param values: Массив значений.
+        :param counts: Количества для каждого значения (гистограмма) или None.
+        :return: self
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if counts is None:
+            size = values.size
+            if size == 0:
+                return self
+            mean = values.sum() / size
+            dev = values - mean
+            dev2 = dev * dev
+            m2 = dev2.sum()
+            m3 = np.dot(dev2, dev)
+            m4 = np.dot(dev2, dev2)
+        else:
+            counts = np.asarray(counts)
+            size = counts.sum().item()
+            if size == 0:
+                return self
+            weights = counts.astype(np.float64, copy=False)
+            mean = np.dot(values, weights) / size
+            dev = values - mean
+            dev2w = dev * dev * weights
+            m2 = dev2w.sum()
+            m3 = np.dot(dev2w, dev)
+            m4 = np.dot(dev2w, dev * dev)
+        return self._combine(size, float(mean), float(m2), float(m3), float(m4))
+
+    def merge(self, other: "MomentAccumulator") -> "MomentAccumulator":
+        """
+        Точное объединение с другим накопителем.
+
+        :param other: Накопитель другой части данных.
+        :return: self
+        """
+        return self._combine(other.count, other.mean, other.m2, other.m3, other.m4)
+
+    def remove(self, other: "MomentAccumulator") -> "MomentAccumulator":
+        """
+        Исключение ранее объединенной части данных (обращение формул merge).
+
+        :param other: Накопитель исключаемой части данных.
+        :return: self
+        """
+        if other.count == 0:
+            return self
+        n, nb = self.count, other.count
+        na = n - nb
+        # Если исключаются все данные, накопитель обнуляется без накопления погрешности.
+        if na <= 1e-9 * max(abs(n), 1):
+            self.count, self.mean, self.m2, self.m3, self.m4 = 0, 0., 0., 0., 0.
+            return self
+
+        mean_a = (n * self.mean - nb * other.mean) / na
+        delta = other.mean - mean_a
+        delta_n = delta / n
+
+        m2_a = self.m2 - other.m2 - delta * delta_n * na * nb
+        m3_a = self.m3 - other.m3 - delta * delta_n ** 2 * na * nb * (na - nb) \
+            - 3. * delta_n * (na * other.m2 - nb * m2_a)
+        m4_a = self.m4 - other.m4 - delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb) \
+            - 6. * delta_n ** 2 * (na * na * other.m2 + nb * nb * m2_a) \
+            - 4. * delta_n * (na * other.m3 - nb * m3_a)
+
+        self.count, self.mean = na, mean_a
+        self.m2, self.m3, self.m4 = max(m2_a, 0.), m3_a, max(m4_a, 0.)
+        return self
+
+    def semi(self) -> list | ErrorCodes:
+        """
+        Семиинварианты накопленных данных в формате calc_semi.
+
+        :return: Массив из 5-ти элементов.
+        """
+        if self.count == 0:
+            return ErrorCodes.ERROR_ELEMENT_COUNT
+        n = self.count
+        c2 = self.m2 / n
+        return [self.mean, c2, self.m3 / n, self.m4 / n - 3 * c2 ** 2, n]
+
+
+class ResearchCalc:
+    """ Вычисление трехточки """
+    def __init__(self):
+        super(ResearchCalc, self).__init__()
+
+    @staticmethod
+    def _prepare_semi_input(data_array):
+        """
+        Приведение входных данных calc_semi к паре массивов (значения, количества).
+
+        :param data_array: Список чисел, гистограмма [[число, кол-во], ...], массив float64,
+                           массив формы (N, 2) или пара массивов numpy (значения, количества).
+        :return: (values, counts), где counts = None для обычного массива, либо ErrorCodes.
+        """
+        exit_code = None
+        try:
+            # Пара массивов numpy (значения, количества). Пара списков, например ([1, 5], [2, 3]),
+            # остается гистограммой [[число, кол-во], ...], как и раньше.
+            if isinstance(data_array, tuple) and len(data_array) == 2 \
+                    and all(isinstance(x, np.ndarray) for x in data_array):
+                values = np.asarray(data_array[0])
+                counts = np.asarray(data_array[1])
+                if values.ndim != 1 or values.shape != counts.shape:
+                    exit_code = ErrorCodes.ERROR_TYPE_HISTOGRAM
+                    raise ResearchCalcErrors("Гистограмма задана неверно - длины массивов значений и количеств различны.")
+                if values.dtype.kind not in "biuf" or counts.dtype.kind not in "biuf":
+                    exit_code = ErrorCodes.ERROR_STR_HISTOGRAM
+                    raise ResearchCalcErrors("Среди элементов гистограммы присутсвуют не числа.")
+                return values.astype(np.float64, copy=False), counts
+
+            # Быстрый путь: numpy сам определяет тип элементов без цикла на Python.
+            try:
+                arr = np.asarray(data_array)
+            except ValueError:
+                arr = None
+
+            if arr is not None and arr.dtype.kind in "biuf":
+                if arr.ndim == 1:
+                    return arr.astype(np.float64, copy=False), None
+                if arr.ndim == 2 and arr.shape[1] == 2 and isinstance(data_array, np.ndarray):
+                    return arr[:, 0].astype(np.float64), arr[:, 1]
+
+            # Медленный путь: поэлементная проверка для определения кода ошибки.
+            if not all(isinstance(x, (int, float, list)) for x in data_array):
+                exit_code = ErrorCodes.ERROR_STR_ARRAY
+                raise ResearchCalcErrors("Среди элементов массива присутсвуют строки. "
+                                         "Необходимо изменить входные данные на целые числа или числа с плавающей точкой.")
+
+            if not all(isinstance(x, list) and len(x) == 2 for x in data_array):
+                exit_code = ErrorCodes.ERROR_TYPE_HISTOGRAM
+                raise ResearchCalcErrors("Гистограмма задана неверно - ожидаемый вид [{число, кол-во}, ..., {число, кол-во}]")
+
+            if not all(isinstance(x, (int, float)) for item in data_array for x in item):
+                exit_code = ErrorCodes.ERROR_STR_HISTOGRAM
+                raise ResearchCalcErrors("Среди элементов списка присутсвуют строки. "
+                                         "Необходимо изменить входные данные на целые числа или числа с плавающей точкой.")
+
+            arr = np.asarray(data_array)
+            return arr[:, 0].astype(np.float64), arr[:, 1]
+        except ResearchCalcErrors:
+            return exit_code
+
+    @staticmethod
+    def calc_semi(data_array):
+        """
+        Вычисление четырех первых семиинвариантов для массива данных.
+
+        Помимо списков принимает массивы numpy (float64 или формы (N, 2)) и пары массивов numpy (значения, количества).
+
+        :param data_array: Входной массив данных.
+        :return: Массив из 5-ти элементов.
+        """
+        exit_code = None
+        try:
+            prepared = ResearchCalc._prepare_semi_input(data_array)
+            if isinstance(prepared, ErrorCodes):
+                exit_code = prepared
+                raise ResearchCalcErrors("Входные данные заданы неверно.")
+
+            accumulator = MomentAccumulator().update_batch(*prepared)
+            if accumulator.count == 0:
+                exit_code = ErrorCodes.ERROR_ELEMENT_COUNT
+                raise ResearchCalcErrors("Входной массив пуст - вычисление семиинвариантов невозможно.")
+
+            return accumulator.semi()
+        except ResearchCalcErrors:
+            return exit_code
+
+    @staticmethod
+    def calc_semi_grouped(group_ids, data_array, groups_count: int = None):
+        """
+        Вычисление семиинвариантов сразу для всех групп за один векторный проход по данным.
+
+        :param group_ids: Номер группы (0..groups_count-1) для каждого элемента.
+        :param data_array: Массив данных той же длины.
+        :param groups_count: Количество групп (по умолчанию - max(group_ids) + 1).
+        :return: Массив (groups_count, 5) семиинвариантов, для пустых групп - NaN и размер 0.
+        """
+        group_ids = np.asarray(group_ids, dtype=np.intp)
+        values = np.asarray(data_array, dtype=np.float64)
+        if groups_count is None:
+            groups_count = int(group_ids.max()) + 1 if group_ids.size else 0
+
+        counts = np.bincount(group_ids, minlength=groups_count).astype(np.float64)
+        with np.errstate(all="ignore"):
+            means = np.bincount(group_ids, weights=values, minlength=groups_count) / counts
+            dev = values - means[group_ids]
+            dev2 = dev * dev
+            c2 = np.bincount(group_ids, weights=dev2, minlength=groups_count) / counts
+            c3 = np.bincount(group_ids, weights=dev2 * dev, minlength=groups_count) / counts
+            c4 = np.bincount(group_ids, weights=dev2 * dev2, minlength=groups_count) / counts
+
+        return np.column_stack([means, c2, c3, c4 - 3 * c2 ** 2, counts])
+
+    @staticmethod
+    def calc_three_points(semi_list: list):
+        """
+        Вычисление трехточки.
+
+        :param semi_list: Массив с семиинвариантами.
+        :return: Среднее минимальное, среднее максимальное, среднее среднее.
+        """
+        exit_code = None
+        try:
+            if not len(semi_list) == 5:
+                exit_code = ErrorCodes.ERROR_ELEMENT_COUNT
+                raise ResearchCalcErrors("Количество элементов входного массива != 5.")
+
+            if not all(isinstance(x, (int, float)) for x in semi_list):
+                exit_code = ErrorCodes.ERROR_NOT_NUMERIC
+                raise ResearchCalcErrors("В списке присутствуют не числа.")
+
+            xs = semi_list[0]
+            dd = semi_list[1]
+
+            if dd == 0:
+                exit_code = ErrorCodes.ERROR_DISPERSION_ZERO
+                raise ResearchCalcErrors("Дисперсия равна 0 - дальнейшие вычисления невозможны.")
+
+            aa = semi_list[2] / dd / 2.
+            ee = semi_list[3]
+            ss = math.sqrt(dd)
+
+            first = ee / (dd ** 2)
+            second = (3. * (aa ** 2)) / dd
+            under_root = 3 + first - second
+
+            if under_root < 0:
+                exit_code = ErrorCodes.ERROR_UNDER_ROOT_NEGATIVE
+                raise ResearchCalcErrors("Подкоренное значение для q отрицательно - дальнейшие вычисления невозможны.")
+
+            qq = math.sqrt(under_root)
+
+            if qq == 0:
+                exit_code = ErrorCodes.ERROR_Q_ZERO
+                raise ResearchCalcErrors("Вспомогательная величина q = 0 - дальнейшие вычисления невозможны.")
+            if (qq - aa) == 0 or (qq + aa) == 0:
+                exit_code = ErrorCodes.ERROR_Q_ECCENTRICITY
+                raise ResearchCalcErrors("Вспомогательная величина (q ± A) = 0 - дальнейшие вычисления невозможны.")
+
+            x1, x2 = -ss * qq + xs + aa, ss * qq + xs + aa
+            p1, p2 = ss / (2. * qq * (ss * qq - aa)), ss / (2. * qq * (ss * qq + aa))
+            p3 = 1 - p1 - p2
+
+            if (p1 + p2 + p3) != 1:
+                exit_code = ErrorCodes.ERROR_PROBABILITY_NOT_1
+                raise ResearchCalcErrors("Сумма вероятностей не равна 1.")
+
+            return [[x1, p1], [xs, p3], [x2, p2]]
+        except ResearchCalcErrors:
+            return exit_code
+
+    @staticmethod
+    def calc_three_points_batch(semi_array):
+        """
+        Вычисление трехточек сразу для множества наборов семиинвариантов.
+
+        Ошибки отмечаются построчно и не прерывают расчет остальных строк.
+
+        :param semi_array: Массив формы (N, 5) с семиинвариантами.
+        :return: (points, statuses): points - массив (N, 3, 2) пар [x, p] (NaN для строк с ошибкой),
+                 statuses - массив (N,) из ErrorCodes или None для успешных строк.
+        """
+        exit_code = None
+        try:
+            semi = np.asarray(semi_array)
+            if semi.ndim != 2 or semi.shape[1] != 5:
+                exit_code = ErrorCodes.ERROR_ELEMENT_COUNT
+                raise ResearchCalcErrors("Ожидается массив формы (N, 5).")
+
+            if semi.dtype.kind not in "biuf":
+                exit_code = ErrorCodes.ERROR_NOT_NUMERIC
+                raise ResearchCalcErrors("В массиве присутствуют не числа.")
+
+            semi = semi.astype(np.float64, copy=False)
+            statuses = np.full(semi.shape[0], None, dtype=object)
+            ok = np.ones(semi.shape[0], dtype=bool)
+
+            def flag(mask, code):
+                mask = mask & ok
+                statuses[mask] = code
+                ok[mask] = False
+
+            with np.errstate(all="ignore"):
+                xs = semi[:, 0]
+                dd = semi[:, 1]
+                flag(dd == 0, ErrorCodes.ERROR_DISPERSION_ZERO)
+                flag(dd < 0, ErrorCodes.ERROR_UNDER_ROOT_NEGATIVE)
+
+                aa = semi[:, 2] / dd / 2.
+                ee = semi[:, 3]
+                ss = np.sqrt(dd)
+
+                under_root = 3 + ee / (dd ** 2) - (3. * (aa ** 2)) / dd
+                flag(under_root < 0, ErrorCodes.ERROR_UNDER_ROOT_NEGATIVE)
+
+                qq = np.sqrt(under_root)
+                flag(qq == 0, ErrorCodes.ERROR_Q_ZERO)
+                flag(((qq - aa) == 0) | ((qq + aa) == 0), ErrorCodes.ERROR_Q_ECCENTRICITY)
+
+                x1, x2 = -ss * qq + xs + aa, ss * qq + xs + aa
+                p1, p2 = ss / (2. * qq * (ss * qq - aa)), ss / (2. * qq * (ss * qq + aa))
+                p3 = 1 - p1 - p2
+                flag((p1 + p2 + p3) != 1, ErrorCodes.ERROR_PROBABILITY_NOT_1)
+
+            points = np.stack([np.stack([x1, p1], axis=1),
+                               np.stack([xs, p3], axis=1),
+                               np.stack([x2, p2], axis=1)], axis=1)
+            points[~ok] = np.nan
+            return points, statuses
+        except ResearchCalcErrors:
+            return exit_code
+
+
+class LRUCache:
+    """ Кэш результатов ограниченного размера с вытеснением давно не использованных записей """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+def parse_number(value) -> float | None:
+    """
+    Перевод строки ячейки в число.
+
+    :param value: Строка ячейки.
+    :return: float или None, если строка не число.
+    """
+    value = str(value)
+    if NUMBER_PATTERN.fullmatch(value):
+        return float(value.replace(",", "."))
+    return None
+
+
+def property_matches(item, prop_item, operation: str) -> bool:
+    """
+    Проверка значения ячейки на соответствие выбранному свойству.
+
+    :param item: Значение ячейки столбца свойства.
+    :param prop_item: Значение выбранного свойства.
+    :param operation: Операция сравнения (">=", "<=", иначе - равенство).
+    :return: True, если значение подходит под свойство.
+    """
+    # Обработка числовых значений.
+    number = parse_number(item)
+    prop_number = parse_number(prop_item)
+    if number is not None and prop_number is not None:
+        if operation == ">=":
+            return number >= prop_number
+        elif operation == "<=":
+            return number <= prop_number
+        return number == prop_number
+    return item == prop_item
+
@@ -0,0 +1,132 @@
+import argparse
+import csv
+import json
+import os
+import sys
+
+from config import *
+from research_calc import ErrorCodes, ResearchCalcErrors, MomentAccumulator, ResearchCalc, \
+    property_matches, parse_number
+from point_files import make_pnt_dict
+
+
+def stream_three_points(filename: str, column: str, value: str, operation: str = "=",
+                        encoding: str = None, chunk_size: int = 65536):
+    """
+    Потоковый расчет трехточки по CSV-файлу без загрузки таблицы в память.
+
+    Из каждой строки используются только столбец свойства и столбец ЗП, подходящие зарплаты
+    накапливаются порциями по chunk_size в MomentAccumulator.
+
+    :param filename: Путь к CSV-файлу.
+    :param column: Название столбца свойства.
+    :param value: Значение свойства.
+    :param operation: Операция сравнения (">=", "<=", "=").
+    :param encoding: Кодировка файла.
+    :param chunk_size: Размер порции зарплат для векторного накопления.
+    :return: (трехточка, семиинварианты) или ErrorCodes.
+    """
+    exit_code = None
+    try:
+        if os.path.splitext(filename)[1] != '.csv':
+            exit_code = ErrorCodes.ERROR_INVALID_FILE_FORMAT
+            raise ResearchCalcErrors("Загружен файл неверного формата.")
+
+        if os.stat(filename).st_size == 0:
+            exit_code = ErrorCodes.ERROR_EMPTY_FILE
+            raise ResearchCalcErrors("Загружен пустой файл - работа с ним невозможна.")
+
+        with open(filename, newline='', encoding=encoding) as File:
+            reader = csv.reader(File)
+            headers = [name.strip() for name in next(reader)]
+
+            if column not in headers:
+                exit_code = ErrorCodes.ERROR_NOT_PROPERTY
+                raise ResearchCalcErrors("В таблице нет столбца свойства.")
+            prop_col = headers.index(column)
+
+            # Получения номера колонки с ЗП.
+            wage_col = None
+            for name in wage_column_names:
+                if name in headers:
+                    wage_col = headers.index(name)
+
+            if wage_col is None:
+                exit_code = ErrorCodes.ERROR_NOT_MONEY
+                raise ResearchCalcErrors("В таблице нет столбца ЗП(заработная плата).")
+
+            last_col = max(prop_col, wage_col)
+            accumulator = MomentAccumulator()
+            correct_rows = 0
+            wages = []
+            for row in reader:
+                if len(row) <= last_col:
+                    continue
+                if property_matches(row[prop_col].strip(), value, operation):
+                    correct_rows += 1
+                    wage = parse_number(row[wage_col].strip())
+                    if wage is not None:
+                        wages.append(wage)
+                        if len(wages) >= chunk_size:
+                            accumulator.update_batch(wages)
+                            wages.clear()
+            accumulator.update_batch(wages)
+
+        # Вычисление трехточки.
+        correct_len = 3
+        if not (correct_rows > correct_len and accumulator.count > correct_len):
+            exit_code = ErrorCodes.ERROR_EMPTY_PROPERTY
+            raise ResearchCalcErrors("Недостаточно строк, подходящих под свойство.")
+
+        semi = accumulator.semi()
+        three_points = ResearchCalc.calc_three_points(semi)
+        if isinstance(three_points, ErrorCodes):
+            exit_code = three_points
+            raise ResearchCalcErrors("Расчет трехточки невозможен.")
+
+        return three_points, semi
+    except ResearchCalcErrors:
+        return exit_code
+    except OSError:
+        # Файл не найден, недоступен или не читается.
+        return ErrorCodes.ERROR_FILE_NOT_LOADED
+    except (UnicodeDecodeError, csv.Error):
+        # Кодировка не подходит или строки CSV не разбираются.
+        return ErrorCodes.ERROR_INVALID_FILE_FORMAT
+
+
+def main(argv=None) -> int:
+    """ Точка входа консольного расчета трехточки """
+    parser = argparse.ArgumentParser(description="Расчет трехточки по CSV-файлу без графического интерфейса.")
+    parser.add_argument("filename", help="CSV-файл с данными.")
+    parser.add_argument("-c", "--column", required=True, help="Название столбца свойства.")
+    parser.add_argument("-v", "--value", required=True, help="Значение свойства.")
+    parser.add_argument("--op", default="=", choices=[">=", "<=", "="], help="Операция сравнения для чисел.")
+    parser.add_argument("-o", "--output", help="Путь к .pnt файлу (по умолчанию рядом с CSV).")
+    parser.add_argument("--encoding", default=None, help="Кодировка CSV-файла.")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="Размер порции накопления.")
+    args = parser.parse_args(argv)
+
+    result = stream_three_points(args.filename, args.column, args.value, args.op,
+                                 encoding=args.encoding, chunk_size=args.chunk_size)
+    if isinstance(result, ErrorCodes):
+        print("Ошибка: " + result.name, file=sys.stderr)
+        return 1
+
+    three_points, semi = result
+    output = args.output or os.path.splitext(args.filename)[0] + ".pnt"
+    try:
+        with open(output, 'w', newline='') as File:
+            File.write(json.dumps(make_pnt_dict(three_points, semi, args.column + " " + args.op + " " + args.value)))
+    except OSError:
+        # Папки нет или запись в нее запрещена.
+        print("Ошибка: " + ErrorCodes.ERROR_FILE_NOT_LOADED.name, file=sys.stderr)
+        return 1
+
+    print("Строк в выборке: " + str(semi[4]))
+    print("Трехточка сохранена в " + output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
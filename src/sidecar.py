@@ -0,0 +1,103 @@
+import json
+import os
+import zipfile
+
+from lazy_import import np
+from table_columns import StringColumn, NumericColumn
+
+# Версия формата файла-спутника; файлы другой версии игнорируются.
+# Версия 2: числовые столбцы хранят только значения, текст которых восстанавливается без изменений.
+SIDECAR_VERSION = 2
+SIDECAR_SUFFIX = ".cache.npz"
+
+
+def sidecar_path(filename: str) -> str:
+    """ Путь к файлу-спутнику рядом с CSV """
+    return filename + SIDECAR_SUFFIX
+
+
+def source_key(filename: str, encoding: str) -> dict:
+    """ Ключ исходного файла: путь, размер, время изменения и кодировка """
+    stat = os.stat(filename)
+    return {"version": SIDECAR_VERSION,
+            "path": os.path.abspath(filename),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "encoding": encoding}
+
+
+def save_sidecar(filename: str, encoding: str, headers: list, columns: list, key: dict = None) -> bool:
+    """
+    Сохранение разобранных столбцов CSV в двоичный файл-спутник (.npz).
+
+    Строковые столбцы сохраняются кодами и словарем (строки словаря - одним блоком UTF-8 со смещениями).
+
+    :param filename: Путь к исходному CSV.
+    :param encoding: Кодировка, с которой разбирался CSV.
+    :param headers: Заголовки столбцов.
+    :param columns: Столбцы (см. table_columns).
+    :param key: Ключ исходного файла, снятый до начала его чтения (по умолчанию - текущий).
+    :return: True, если файл записан.
+    """
+    arrays = {}
+    kinds = []
+    for i, column in enumerate(columns):
+        kinds.append(column.kind)
+        if isinstance(column, NumericColumn):
+            arrays["data_%d" % i] = column.to_numpy()
+        else:
+            encoded = [value.encode("utf-8") for value in column.dictionary]
+            arrays["codes_%d" % i] = column.codes_numpy()
+            arrays["dict_%d" % i] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+            arrays["dict_offsets_%d" % i] = np.cumsum([0] + [len(value) for value in encoded], dtype=np.int64)
+
+    if key is None:
+        key = source_key(filename, encoding)
+    meta = dict(key, headers=list(headers), kinds=kinds)
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    target = sidecar_path(filename)
+    temp = target + ".tmp"
+    try:
+        with open(temp, "wb") as File:
+            np.savez(File, **arrays)
+        os.replace(temp, target)
+    except OSError:
+        if os.path.exists(temp):
+            os.remove(temp)
+        return False
+    return True
+
+
+def load_sidecar(filename: str, encoding: str):
+    """
+    Загрузка столбцов из файла-спутника, если исходный CSV с тех пор не изменялся.
+
+    :param filename: Путь к исходному CSV.
+    :param encoding: Кодировка, с которой разбирается CSV.
+    :return: (заголовки, столбцы) или None, если файла-спутника нет или он устарел.
+    """
+    target = sidecar_path(filename)
+    if not os.path.exists(target):
+        return None
+
+    try:
+        with np.load(target, allow_pickle=False) as File:
+            meta = json.loads(File["meta"].tobytes().decode("utf-8"))
+            key = source_key(filename, encoding)
+            if any(meta.get(name) != value for name, value in key.items()):
+                return None
+
+            columns = []
+            for i, kind in enumerate(meta["kinds"]):
+                if kind == NumericColumn.kind:
+                    columns.append(NumericColumn.from_array(File["data_%d" % i]))
+                    continue
+                blob = File["dict_%d" % i].tobytes()
+                offsets = File["dict_offsets_%d" % i].tolist()
+                dictionary = [blob[offsets[j]:offsets[j + 1]].decode("utf-8") for j in range(len(offsets) - 1)]
+                columns.append(StringColumn.from_arrays(File["codes_%d" % i], dictionary))
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        return None
+
+    return meta["headers"], columns
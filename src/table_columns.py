@@ -0,0 +1,672 @@
+from array import array
+import csv
+import math
+import os
+import re
+
+from lazy_import import np
+from research_calc import ErrorCodes, MomentAccumulator, ResearchCalc, parse_number, property_matches
+from tracing import tracer
+
+
+class StringColumn:
+    """
+    Строковый столбец со словарным кодированием.
+
+    Каждая ячейка хранится 4-байтовым кодом в array('i'), сами строки - один раз в словаре.
+    """
+    kind = "str"
+
+    def __init__(self, values=()):
+        self.codes = array('i')
+        self.dictionary = []
+        self._lookup = {}
+        self.extend(values)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _code(self, value: str) -> int:
+        """ Код строки в словаре (строка добавляется при необходимости) """
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.dictionary)
+            self._lookup[value] = code
+            self.dictionary.append(value)
+        return code
+
+    def get(self, row: int) -> str:
+        return self.dictionary[self.codes[row]]
+
+    def set(self, row: int, value: str) -> bool:
+        self.codes[row] = self._code(value)
+        return True
+
+    def extend(self, values) -> bool:
+        code = self._code
+        self.codes.extend(code(value) for value in values)
+        return True
+
+    def insert(self, row: int, count: int):
+        """ Вставка count пустых ячеек перед строкой row """
+        self.codes[row:row] = array('i', [self._code("")]) * count
+
+    def remove(self, row: int, count: int):
+        del self.codes[row:row + count]
+
+    def codes_numpy(self) -> "np.ndarray":
+        """ Копия кодов столбца в виде массива int32 """
+        return np.array(self.codes, dtype=np.int32)
+
+    def strings(self, start: int, stop: int, transform=None) -> list:
+        """
+        Значения ячеек строк [start, stop).
+
+        :param transform: Преобразование значения (применяется один раз к каждому значению словаря).
+        :return: Список строк.
+        """
+        dictionary = self.dictionary if transform is None else [transform(value) for value in self.dictionary]
+        return [dictionary[code] for code in self.codes[start:stop]]
+
+    def transformed(self, transform) -> "StringColumn":
+        """ Столбец с преобразованным словарем (коды - общие с исходным столбцом, только для чтения) """
+        column = StringColumn()
+        column.codes = self.codes
+        column.dictionary = [transform(value) for value in self.dictionary]
+        return column
+
+    def take(self, keep: "np.ndarray") -> "StringColumn":
+        """ Новый столбец только из строк, отмеченных в булевом массиве keep (или с номерами из keep) """
+        return StringColumn.from_arrays(self.codes_numpy()[keep], self.dictionary)
+
+    def copy(self) -> "StringColumn":
+        """ Снимок столбца для чтения из другого потока """
+        column = StringColumn()
+        column.codes = array('i', self.codes)
+        column.dictionary = list(self.dictionary)
+        column._lookup = dict(self._lookup)
+        return column
+
+    @classmethod
+    def from_arrays(cls, codes: "np.ndarray", dictionary: list) -> "StringColumn":
+        """ Восстановление столбца из кодов и словаря без повторного кодирования строк """
+        column = cls()
+        column.dictionary = list(dictionary)
+        column._lookup = {value: code for code, value in enumerate(column.dictionary)}
+        column.codes.frombytes(np.ascontiguousarray(codes, dtype=np.int32).tobytes())
+        return column
+
+
+# Порция ячеек, соединенная через перевод строки, в которой каждая ячейка - число или пустая строка.
+# Число в том виде, в котором его выводит NumericColumn.format: без ведущих и конечных нулей, "-0" и запятой.
+# Ячейки в другом виде ("1.50", "2,5", "100.0") остаются строками, чтобы их текст не менялся.
+_CANONICAL_NUMBER = r"(?:0|-?[1-9]\d{0,14}|-?0(?=\.))(?:\.\d*[1-9])?"
+_NUMBER_LINES = re.compile("(?:{0})?(?:\n(?:{0})?)*".format(_CANONICAL_NUMBER))
+
+
+class NumericColumn:
+    """
+    Числовой столбец в array('d'). Пустая ячейка хранится как NaN.
+    """
+    kind = "num"
+
+    def __init__(self, values=()):
+        self.data = array('d')
+        if not self.extend(values):
+            raise ValueError("Столбец содержит нечисловые значения.")
+
+    def __len__(self):
+        return len(self.data)
+
+    @staticmethod
+    def parse(value: str):
+        """
+        Перевод строки ячейки в число для расчетов (в том числе "1,5" и "1.50").
+
+        :param value: Строка ячейки.
+        :return: float, NaN для пустой строки или None, если строка не число.
+        """
+        if value == "":
+            return math.nan
+        return parse_number(value)
+
+    @staticmethod
+    def format(value: float) -> str:
+        if value != value:
+            return ""
+        if value.is_integer():
+            return str(int(value))
+        return repr(value)
+
+    def get(self, row: int) -> str:
+        return self.format(self.data[row])
+
+    def set(self, row: int, value: str) -> bool:
+        number = self.parse(value)
+        if number is None or self.format(number) != value:
+            return False
+        self.data[row] = number
+        return True
+
+    def extend(self, values) -> bool:
+        """
+        Добавление значений в конец столбца.
+
+        Вся порция проверяется одним проходом регулярного выражения и переводится в числа целиком.
+        Значение хранится числом, только если format восстанавливает из него исходный текст ячейки.
+
+        :return: False, если среди значений есть нечисловые (столбец не изменяется).
+        """
+        values = list(values)
+        text = "\n".join(values)
+        if not _NUMBER_LINES.fullmatch(text):
+            return False
+        try:
+            numbers = [float(value) if value else math.nan for value in values]
+        except ValueError:
+            # Многострочные ячейки могут совпасть с шаблоном построчно.
+            return False
+        # Дроби с большим числом знаков и очень малые числа repr выводит иначе.
+        if "." in text and any(self.format(number) != value for number, value in zip(numbers, values) if value):
+            return False
+        self.data.extend(numbers)
+        return True
+
+    def to_numpy(self) -> "np.ndarray":
+        """ Копия значений столбца в виде массива float64 """
+        return np.array(self.data, dtype=np.float64)
+
+    def strings(self, start: int, stop: int, transform=None) -> list:
+        """
+        Значения ячеек строк [start, stop).
+
+        :param transform: Преобразование значения.
+        :return: Список строк.
+        """
+        fmt = self.format
+        values = [fmt(value) for value in self.data[start:stop]]
+        return values if transform is None else [transform(value) for value in values]
+
+    def take(self, keep: "np.ndarray") -> "NumericColumn":
+        """ Новый столбец только из строк, отмеченных в булевом массиве keep (или с номерами из keep) """
+        return NumericColumn.from_array(self.to_numpy()[keep])
+
+    def copy(self) -> "NumericColumn":
+        """ Снимок столбца для чтения из другого потока """
+        column = NumericColumn()
+        column.data = array('d', self.data)
+        return column
+
+    @classmethod
+    def from_array(cls, values: "np.ndarray") -> "NumericColumn":
+        """ Восстановление столбца из массива float64 """
+        column = cls()
+        column.data.frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        return column
+
+    def insert(self, row: int, count: int):
+        """ Вставка count пустых ячеек перед строкой row """
+        self.data[row:row] = array('d', [math.nan]) * count
+
+    def remove(self, row: int, count: int):
+        del self.data[row:row + count]
+
+
+def make_column(values: list):
+    """
+    Создание столбца подходящего типа по списку строк.
+
+    :param values: Строки ячеек.
+    :return: NumericColumn, если все непустые значения - числа, иначе StringColumn.
+    """
+    if any(values):
+        try:
+            return NumericColumn(values)
+        except ValueError:
+            pass
+    return StringColumn(values)
+
+
+def to_string_column(column) -> StringColumn:
+    """ Перевод столбца любого типа в строковый """
+    if isinstance(column, StringColumn):
+        return column
+    return StringColumn(column.get(row) for row in range(len(column)))
+
+
+def extend_columns(columns: list, rows: list, row_count: int, width: int = None):
+    """
+    Добавление порции строк в столбцы таблицы.
+
+    Тип столбца определяется по первой порции строк; если в числовой столбец попадает нечисловое значение,
+    столбец переводится в строковый.
+
+    :param columns: Столбцы таблицы (изменяются на месте).
+    :param rows: Список строк, каждая - список значений ячеек.
+    :param row_count: Количество строк в таблице до добавления.
+    :param width: Количество заполняемых столбцов (по умолчанию - все).
+    :return: None
+    """
+    for col in range(len(columns) if width is None else width):
+        values = [row[col] if col < len(row) else "" for row in rows]
+        if row_count == 0:
+            columns[col] = make_column(values)
+        elif not columns[col].extend(values):
+            columns[col] = to_string_column(columns[col])
+            columns[col].extend(values)
+
+
+def column_mask(column, prop_item: str, operation: str) -> "np.ndarray":
+    """
+    Векторная проверка строк столбца на соответствие свойству (см. property_matches).
+
+    Для строкового столбца свойство проверяется один раз для каждого значения словаря.
+
+    :param column: Столбец свойства.
+    :param prop_item: Значение свойства.
+    :param operation: Операция сравнения.
+    :return: Булев массив длины столбца.
+    """
+    if isinstance(column, NumericColumn):
+        values = column.to_numpy()
+        number = parse_number(prop_item)
+        if number is None:
+            # С нечисловым свойством совпадают только пустые ячейки при пустом свойстве.
+            return np.isnan(values) if prop_item == "" else np.zeros(len(values), dtype=bool)
+        if operation == ">=":
+            return values >= number
+        elif operation == "<=":
+            return values <= number
+        return values == number
+
+    table = np.fromiter((property_matches(value, prop_item, operation) for value in column.dictionary),
+                        dtype=bool, count=len(column.dictionary))
+    return table[column.codes_numpy()]
+
+
+def column_numbers(column) -> "np.ndarray":
+    """
+    Числовые значения столбца.
+
+    :param column: Столбец.
+    :return: Массив float64, NaN для пустых и нечисловых ячеек.
+    """
+    if isinstance(column, NumericColumn):
+        return column.to_numpy()
+
+    table = np.array([NumericColumn.parse(value) for value in column.dictionary], dtype=np.float64)
+    return table[column.codes_numpy()]
+
+
+def column_groups(column):
+    """
+    Разбиение строк по различным значениям столбца.
+
+    :param column: Столбец группировки.
+    :return: (названия групп, номер группы для каждой строки).
+    """
+    if isinstance(column, NumericColumn):
+        values, group_ids = np.unique(column.to_numpy(), return_inverse=True)
+        return [NumericColumn.format(value) for value in values.tolist()], group_ids.ravel()
+    return list(column.dictionary), column.codes_numpy()
+
+
+def group_three_points(key_column, wage_column, min_count: int = 3, engine=None) -> list:
+    """
+    Трехточки для всех значений столбца за один проход по таблице.
+
+    :param key_column: Столбец группировки.
+    :param wage_column: Столбец ЗП.
+    :param min_count: Группы с количеством зарплат не больше min_count пропускаются.
+    :param engine: ProcessEngine для расчета моментов в пуле процессов (по умолчанию - в текущем процессе).
+    :return: Список (значение, семиинварианты, трехточка) в порядке значений; для групп,
+             где расчет невозможен, вместо трехточки - ErrorCodes.
+    """
+    labels, group_ids = column_groups(key_column)
+    wages = column_numbers(wage_column)
+    if engine is not None:
+        semi = engine.grouped_semi(group_ids, wages, len(labels))
+    else:
+        valid = ~np.isnan(wages)
+        semi = ResearchCalc.calc_semi_grouped(group_ids[valid], wages[valid], len(labels))
+    points, statuses = ResearchCalc.calc_three_points_batch(semi)
+
+    result = []
+    for i, label in enumerate(labels):
+        # Пустые ячейки свойством не считаются.
+        if label == "" or semi[i, 4] <= min_count:
+            continue
+        group_semi = semi[i, :4].tolist() + [int(semi[i, 4])]
+        three_points = statuses[i] if statuses[i] is not None else points[i].tolist()
+        result.append((label, group_semi, three_points))
+    return result
+
+
+def mask_three_points(wage_column, correct_rows: "np.ndarray", min_count: int = 3, chunk_rows: int = None,
+                      progress=None, cancelled=None, engine=None) -> tuple | None:
+    """
+    Трехточка по строкам, отмеченным в булевом массиве.
+
+    Моменты зарплат накапливаются порциями строк, между порциями проверяется отмена.
+
+    :param wage_column: Столбец ЗП.
+    :param correct_rows: Булев массив подходящих строк.
+    :param min_count: Расчет выполняется, если подходящих строк и зарплат больше min_count.
+    :param chunk_rows: Количество строк в порции (по умолчанию - все строки за раз).
+    :param progress: Функция, принимающая процент обработанных строк.
+    :param cancelled: Функция, возвращающая True, если расчет нужно прервать.
+    :param engine: ProcessEngine для расчета моментов в пуле процессов (порции задаются движком).
+    :return: (семиинварианты, трехточка или ErrorCodes); (None, None), если подходящих строк мало;
+             None, если расчет отменен.
+    """
+    with tracer.span("wages", rows=len(correct_rows)):
+        wages = column_numbers(wage_column)
+    if not correct_rows.sum() > min_count:
+        return None, None
+
+    row_count = len(wages)
+    step = chunk_rows or max(row_count, 1)
+    with tracer.span("calc_semi") as span:
+        if engine is not None:
+            accumulator = engine.mask_moments(wages, correct_rows, progress, cancelled)
+        else:
+            accumulator = MomentAccumulator()
+            for start in range(0, row_count, step):
+                if cancelled is not None and cancelled():
+                    return None
+                chunk = wages[start:start + step][correct_rows[start:start + step]]
+                accumulator.update_batch(chunk[~np.isnan(chunk)])
+                if progress is not None:
+                    progress(min(start + step, row_count) * 100 // row_count)
+        if accumulator is None:
+            return None
+        span.set(rows=accumulator.count)
+
+    if not accumulator.count > min_count:
+        return None, None
+    semi = accumulator.semi()
+    with tracer.span("calc_three_points"):
+        return semi, ResearchCalc.calc_three_points(semi)
+
+
+class LiveMoments:
+    """
+    Моменты зарплат отобранных строк, обновляемые при изменении отдельных строк таблицы.
+
+    Вклад строк вычисляется той же функцией отбора, что и полный расчет, поэтому после правок
+    моменты совпадают с полным пересчетом (с точностью до округления).
+    """
+    # Вклад большего количества строк вычисляется векторно по копиям столбцов.
+    row_values_limit = 1024
+
+    def __init__(self, selection: tuple, make_mask, cols: list, wage_col: int, accumulator: MomentAccumulator):
+        # Описание отбора (ключ расчета без версии таблицы) и функция, строящая по столбцам маску строк.
+        self.selection = selection
+        self.make_mask = make_mask
+        # Столбцы, нужные для отбора и расчета (включая столбец ЗП).
+        self.cols = set(cols)
+        self.wage_col = wage_col
+        self.accumulator = accumulator
+
+    def rows_moments(self, columns, rows) -> MomentAccumulator:
+        """
+        Вклад строк таблицы в моменты отбора.
+
+        :param columns: Столбцы таблицы (доступ по номеру).
+        :param rows: Номера строк.
+        :return: MomentAccumulator зарплат тех из строк, что подходят под отбор.
+        """
+        if len(rows) <= self.row_values_limit:
+            # Значения нескольких строк берутся по одной, без копирования столбцов целиком.
+            part = {col: make_column([columns[col].get(row) for row in rows]) for col in self.cols}
+        else:
+            rows = np.asarray(rows, dtype=np.intp)
+            part = {col: columns[col].take(rows) for col in self.cols}
+        wages = column_numbers(part[self.wage_col])[self.make_mask(part)]
+        return MomentAccumulator().update_batch(wages[~np.isnan(wages)])
+
+    def add_rows(self, columns, rows):
+        self.accumulator.merge(self.rows_moments(columns, rows))
+
+    def remove_rows(self, columns, rows):
+        self.accumulator.remove(self.rows_moments(columns, rows))
+
+    def result(self, min_count: int = 3) -> tuple:
+        """
+        Трехточка по текущим моментам.
+
+        :param min_count: Расчет выполняется, если зарплат больше min_count.
+        :return: (семиинварианты, трехточка или ErrorCodes) или (None, None), как mask_three_points.
+        """
+        if not self.accumulator.count > min_count:
+            return None, None
+        semi = self.accumulator.semi()
+        return semi, ResearchCalc.calc_three_points(semi)
+
+
+def sample_matching_rows(row_count: int, sample_size: int, seed: int, select, max_rows: int = None,
+                         cancelled=None):
+    """
+    Повторяемая случайная выборка строк таблицы, подходящих под условие отбора.
+
+    Строки просматриваются в случайном порядке порциями (каждая следующая вдвое больше предыдущей), пока не
+    наберется sample_size подходящих строк. Первые sample_size подходящих строк случайного порядка - равномерная
+    выборка без возвращения из всех подходящих строк, поэтому узкий отбор не оставляет выборку пустой.
+
+    :param row_count: Количество строк таблицы.
+    :param sample_size: Размер выборки подходящих строк.
+    :param seed: Начальное значение генератора.
+    :param select: Функция, возвращающая по номерам строк (по возрастанию) булев массив подходящих строк
+                   или ErrorCodes.
+    :param max_rows: Наибольшее количество просматриваемых строк (по умолчанию - вся таблица).
+    :param cancelled: Функция, возвращающая True, если выборку нужно прервать.
+    :return: (номера подходящих строк по возрастанию, количество просмотренных строк), ErrorCodes или None,
+             если выборка прервана.
+    """
+    rng = np.random.default_rng(seed)
+    limit = row_count if max_rows is None else min(max_rows, row_count)
+    order = rng.choice(row_count, size=limit, replace=False)
+    matched = []
+    found = scanned = 0
+    batch = max(sample_size, 1)
+    while scanned < limit and found < sample_size:
+        if cancelled is not None and cancelled():
+            return None
+        rows = order[scanned:scanned + batch]
+        # Строки порции читаются по возрастанию номеров, подходящие берутся в случайном порядке.
+        positions = np.argsort(rows)
+        correct_rows = select(rows[positions])
+        if isinstance(correct_rows, ErrorCodes):
+            return correct_rows
+        hits = np.empty(len(rows), dtype=bool)
+        hits[positions] = correct_rows
+        hit_positions = np.flatnonzero(hits)
+        if found + len(hit_positions) >= sample_size:
+            # Просмотр заканчивается на строке, дополнившей выборку.
+            hit_positions = hit_positions[:sample_size - found]
+            matched.append(rows[hit_positions])
+            scanned += int(hit_positions[-1]) + 1
+            found = sample_size
+            break
+        matched.append(rows[hit_positions])
+        found += len(hit_positions)
+        scanned += len(rows)
+        batch *= 2
+    rows = np.concatenate(matched) if matched else np.empty(0, dtype=np.int64)
+    return np.sort(rows), scanned
+
+
+def preview_three_points(wage_column, correct_rows: "np.ndarray", row_count: int, min_count: int = 3,
+                         resamples: int = 32, seed: int = 0, scanned_rows: int = None) -> tuple | None:
+    """
+    Предварительная трехточка по выборке строк с оценкой погрешности.
+
+    Погрешность оценивается бутстрепом: трехточки пересчитываются по resamples выборкам с возвращением,
+    погрешность значения точки - 1.96 стандартного отклонения (с поправкой на долю выбранных строк таблицы).
+
+    :param wage_column: Столбец ЗП выборки.
+    :param correct_rows: Булев массив подходящих строк выборки.
+    :param row_count: Количество строк всей таблицы.
+    :param min_count: Оценка выполняется, если подходящих зарплат в выборке больше min_count.
+    :param resamples: Количество бутстреп-выборок.
+    :param seed: Начальное значение генератора бутстрепа.
+    :param scanned_rows: Количество просмотренных строк таблицы, если в выборку взяты только подходящие
+                         из них (см. sample_matching_rows; по умолчанию - len(correct_rows)).
+    :return: (семиинварианты, трехточка, погрешности значений Min/Avg/Max или None) или None,
+             если оценка невозможна.
+    """
+    wages = column_numbers(wage_column)[correct_rows]
+    wages = wages[~np.isnan(wages)]
+    if not len(wages) > min_count:
+        return None
+    semi = ResearchCalc.calc_semi(wages)
+    three_points = ResearchCalc.calc_three_points(semi)
+    if isinstance(three_points, ErrorCodes):
+        return None
+
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(wages), size=(resamples, len(wages)))
+    semi_batch = ResearchCalc.calc_semi_grouped(np.repeat(np.arange(resamples), len(wages)),
+                                                wages[picks].ravel(), resamples)
+    points, statuses = ResearchCalc.calc_three_points_batch(semi_batch)
+    points = points[np.array([status is None for status in statuses], dtype=bool)]
+    if len(points) < 2:
+        return semi, three_points, None
+    scanned_rows = len(correct_rows) if scanned_rows is None else scanned_rows
+    fraction = min(scanned_rows / max(row_count, 1), 1.)
+    errors = 1.96 * np.std(points[:, :, 0], axis=0) * math.sqrt(1. - fraction)
+    return semi, three_points, errors.tolist()
+
+
+def row_ranges(rows) -> list:
+    """
+    Объединение номеров строк в непрерывные диапазоны.
+
+    :param rows: Номера строк в любом порядке (повторы допускаются).
+    :return: Список (начало, количество) по убыванию начала - для удаления с конца таблицы.
+    """
+    ranges = []
+    for row in sorted(set(rows), reverse=True):
+        if ranges and ranges[-1][0] == row + 1:
+            ranges[-1][0] = row
+            ranges[-1][1] += 1
+        else:
+            ranges.append([row, 1])
+    return [tuple(item) for item in ranges]
+
+
+def replace_comma(value: str) -> str:
+    """ Замена запятых в значении ячейки при сохранении в CSV """
+    return value.replace(",", ";")
+
+
+def iter_row_chunks(columns: list, row_count: int, chunk_rows: int = 65536, transform=None):
+    """
+    Строки таблицы порциями, собранные напрямую из столбцов.
+
+    :param columns: Столбцы таблицы.
+    :param row_count: Количество строк.
+    :param chunk_rows: Количество строк в порции.
+    :param transform: Преобразование значений ячеек.
+    :return: Генератор списков строк.
+    """
+    # Словари строковых столбцов преобразуются один раз на всю запись, а не для каждой порции.
+    string_columns = [isinstance(column, StringColumn) for column in columns]
+    if transform is not None:
+        columns = [column.transformed(transform) if is_string else column
+                   for column, is_string in zip(columns, string_columns)]
+    transforms = [None if is_string else transform for is_string in string_columns]
+    for start in range(0, row_count, chunk_rows):
+        stop = min(start + chunk_rows, row_count)
+        yield list(zip(*[column.strings(start, stop, column_transform)
+                         for column, column_transform in zip(columns, transforms)]))
+
+
+def read_csv_batches(filename: str, encoding: str, first_batch_rows: int, batch_rows: int, progress=None,
+                     cancelled=None):
+    """
+    Чтение CSV порциями строк: первая порция небольшая, чтобы первые строки можно было показать сразу.
+
+    :param filename: Путь к файлу.
+    :param encoding: Кодировка файла.
+    :param first_batch_rows: Количество строк в первой порции.
+    :param batch_rows: Количество строк в следующих порциях.
+    :param progress: Функция, принимающая процент прочитанных байт.
+    :param cancelled: Функция, возвращающая True, если чтение нужно прервать.
+    :return: Генератор: сначала заголовки, затем списки строк с очищенными от пробелов значениями.
+    """
+    file_size = max(os.stat(filename).st_size, 1)
+
+    def lines(File):
+        """ Построчное декодирование файла с подсчетом прочитанных байт """
+        read_bytes = 0
+        last_percent = -1
+        for line in File:
+            read_bytes += len(line)
+            percent = read_bytes * 100 // file_size
+            if percent != last_percent and progress is not None:
+                last_percent = percent
+                progress(percent)
+            yield line.decode(encoding)
+
+    with open(filename, 'rb') as File:
+        reader = csv.reader(lines(File))
+        yield next(reader)
+
+        batch = []
+        size = first_batch_rows
+        span = tracer.span("csv_parse")
+        for row in reader:
+            if cancelled is not None and cancelled():
+                break
+            batch.append([field.strip() for field in row])
+            if len(batch) >= size:
+                span.set(rows=len(batch))
+                span.finish()
+                yield batch
+                batch = []
+                size = batch_rows
+                span = tracer.span("csv_parse")
+
+        span.set(rows=len(batch))
+        span.finish()
+        if batch and not (cancelled is not None and cancelled()):
+            yield batch
+
+
+def export_csv(filename: str, headers: list, row_chunks, row_count: int, progress=None, cancelled=None,
+               encoding: str = None) -> bool:
+    """
+    Запись таблицы в CSV крупными буферизованными порциями через временный файл.
+
+    :param filename: Путь к файлу.
+    :param headers: Заголовки столбцов.
+    :param row_chunks: Итератор порций строк (см. iter_row_chunks).
+    :param row_count: Общее количество строк (для прогресса).
+    :param progress: Функция, принимающая процент записанных строк.
+    :param cancelled: Функция, возвращающая True, если запись нужно прервать.
+    :param encoding: Кодировка файла.
+    :return: True, если таблица записана полностью.
+    """
+    written = 0
+    temp = filename + ".tmp"
+    try:
+        with open(temp, 'w', newline='', encoding=encoding, buffering=1024 * 1024) as File:
+            writer = csv.writer(File)
+            writer.writerow(headers)
+            for rows in row_chunks:
+                if cancelled is not None and cancelled():
+                    break
+                writer.writerows(rows)
+                written += len(rows)
+                if progress is not None:
+                    progress(written * 100 // max(row_count, 1))
+            else:
+                File.close()
+                # Файл заменяется только после полной записи.
+                os.replace(temp, filename)
+                return True
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+    return False
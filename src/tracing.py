@@ -0,0 +1,235 @@
+from collections import deque
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class _NullSpan:
+    """ Пустой участок, возвращаемый при выключенной трассировке (ничего не измеряет) """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def set(self, **args):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Измеряемый участок: время выполнения, аргументы (например, количество строк) и пик выделенной памяти.
+
+    Участок начинается при создании и завершается через finish() или выход из with.
+    """
+    __slots__ = ("tracer", "name", "category", "args", "tid", "start", "duration", "peak", "_memory", "_running_peak")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.tid = threading.get_ident()
+        self.duration = None
+        self.peak = None
+        self._memory = None
+        self._running_peak = 0
+        tracer._start(self)
+
+    def set(self, **args):
+        """ Добавление аргументов участка (rows - количество обработанных строк) """
+        self.args.update(args)
+
+    def finish(self):
+        if self.duration is None:
+            self.tracer._finish(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.finish()
+        return False
+
+    @property
+    def end(self) -> int:
+        return self.start + self.duration
+
+
+class Tracer:
+    """
+    Сбор участков выполнения операций окна.
+
+    Операция (загрузка, расчет, сохранение, объединение) - участок верхнего уровня, который может
+    начинаться и заканчиваться в разных обработчиках; этапы - вложенные участки в любом потоке.
+    """
+
+    def __init__(self, max_events: int = 100000):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)
+        self.last_operation = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter_ns()
+        self._own_tracemalloc = False
+
+    def enable(self, memory: bool = True):
+        """
+        Включение трассировки.
+
+        :param memory: Измерять пики выделенной памяти (через tracemalloc, заметно замедляет работу).
+        :return: None
+        """
+        self.enabled = True
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+
+    def disable(self):
+        self.enabled = False
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+            self._own_tracemalloc = False
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+            self.last_operation = None
+
+    def span(self, name: str, **args):
+        """
+        Участок этапа операции.
+
+        :param name: Название этапа.
+        :param args: Аргументы участка.
+        :return: Span или NULL_SPAN при выключенной трассировке.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, "stage", args)
+
+    def operation(self, name: str, **args):
+        """
+        Участок операции верхнего уровня (не вкладывается в стек этапов текущего потока).
+
+        :param name: Название операции.
+        :param args: Аргументы участка.
+        :return: Span или NULL_SPAN при выключенной трассировке.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, "operation", args)
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _start(self, span: Span):
+        if span.category == "stage":
+            stack = self._stack()
+            if tracemalloc.is_tracing():
+                # Пик отсчитывается заново для каждого участка, пик внешнего участка запоминается.
+                current, peak = tracemalloc.get_traced_memory()
+                if stack:
+                    stack[-1]._running_peak = max(stack[-1]._running_peak, peak)
+                tracemalloc.reset_peak()
+                span._memory = span._running_peak = current
+            stack.append(span)
+        span.start = time.perf_counter_ns()
+
+    def _finish(self, span: Span):
+        span.duration = time.perf_counter_ns() - span.start
+        if span.category == "stage":
+            stack = self._stack()
+            if span in stack:
+                stack.remove(span)
+            if span._memory is not None and tracemalloc.is_tracing():
+                peak = max(span._running_peak, tracemalloc.get_traced_memory()[1])
+                span.peak = peak - span._memory
+                if stack:
+                    stack[-1]._running_peak = max(stack[-1]._running_peak, peak)
+
+        with self._lock:
+            self.events.append(span)
+            if span.category == "operation":
+                self.last_operation = span
+
+    def summary(self, operation: Span = None) -> list:
+        """
+        Этапы операции, сгруппированные по названию.
+
+        :param operation: Операция (по умолчанию - последняя завершенная).
+        :return: Список (название, время в мс, строк, файлов, пик памяти в байтах или None, количество участков).
+        """
+        operation = operation or self.last_operation
+        if operation is None:
+            return []
+
+        stages = {}
+        with self._lock:
+            events = [span for span in self.events if span.category == "stage"
+                      and span.start >= operation.start and span.end <= operation.end]
+        for span in events:
+            total = stages.setdefault(span.name, [0, 0, 0, None, 0])
+            total[0] += span.duration
+            total[1] += span.args.get("rows", 0)
+            total[2] += span.args.get("files", 0)
+            if span.peak is not None:
+                total[3] = max(total[3] or 0, span.peak)
+            total[4] += 1
+        return [(name, duration / 1e6, rows, files, peak, count)
+                for name, (duration, rows, files, peak, count) in stages.items()]
+
+    def format_summary(self, operation: Span = None) -> str:
+        """ Строка с временем последней операции и ее этапов для вывода в окне """
+        operation = operation or self.last_operation
+        if operation is None:
+            return ""
+        parts = ["%s: %.1f мс" % (operation.name, operation.duration / 1e6)]
+        for name, duration, rows, files, peak, count in self.summary(operation):
+            details = []
+            if rows:
+                details.append("%d стр." % rows)
+            if files:
+                details.append("%d файл." % files)
+            if peak is not None:
+                details.append("%.1f МБ" % (peak / 2 ** 20))
+            parts.append("%s %.1f мс" % (name, duration) + (" (" + ", ".join(details) + ")" if details else ""))
+        return " | ".join(parts)
+
+    def export_chrome(self, filename: str) -> int:
+        """
+        Запись участков в формате Chrome trace event (chrome://tracing, Perfetto).
+
+        :param filename: Путь к файлу.
+        :return: Количество записанных участков.
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+        trace = []
+        for span in events:
+            args = dict(span.args)
+            if span.peak is not None:
+                args["peak_bytes"] = span.peak
+            trace.append({"name": span.name, "cat": span.category, "ph": "X", "pid": pid, "tid": span.tid,
+                          "ts": (span.start - self._origin) / 1000, "dur": span.duration / 1000, "args": args})
+        with open(filename, 'w') as File:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, File, default=str)
+        return len(trace)
+
+
+# Общий объект трассировки приложения.
+tracer = Tracer()
@@ -1,13 +1,80 @@
+import hashlib
+import json
 import os
+from xml.etree import ElementTree
 
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SRC_DIR)
 
-def convert_ui_to_py():
-    """ Конвертирование .ui в .py """
-    pyuic_main_command = "pyuic5 ../ui/main.ui -o main_app.py"
-    pyrcc_main_command = "pyrcc5 ../res.qrc -o res_rc.py"
-    os.system(pyuic_main_command)
-    os.system(pyrcc_main_command)
+# Файл с хэшами исходников, из которых сгенерированы модули интерфейса и ресурсов.
+HASHES_FILENAME = os.path.join(SRC_DIR, ".ui2py.json")
+
+
+def file_hash(filename: str) -> str:
+    with open(filename, 'rb') as File:
+        return hashlib.sha256(File.read()).hexdigest()
+
+
+def qrc_files(qrc_filename: str) -> list:
+    """ Файлы, перечисленные в .qrc (изменение картинки тоже требует пересборки ресурсов) """
+    base = os.path.dirname(qrc_filename)
+    return [os.path.join(base, item.text) for item in ElementTree.parse(qrc_filename).iter("file")]
+
+
+def conversions() -> list:
+    """
+    Генерируемые модули.
+
+    :return: Список (модуль, команда, исходные файлы).
+    """
+    ui = os.path.join(ROOT_DIR, "ui", "main.ui")
+    qrc = os.path.join(ROOT_DIR, "res.qrc")
+    main_app = os.path.join(SRC_DIR, "main_app.py")
+    res_rc = os.path.join(SRC_DIR, "res_rc.py")
+    qrc_sources = [qrc] + (qrc_files(qrc) if os.path.exists(qrc) else [])
+    return [(main_app, 'pyuic5 "%s" -o "%s"' % (ui, main_app), [ui]),
+            (res_rc, 'pyrcc5 "%s" -o "%s"' % (qrc, res_rc), qrc_sources)]
+
+
+def source_hashes(sources: list) -> dict | None:
+    """ Хэши исходных файлов или None, если какого-то файла нет """
+    try:
+        return {os.path.relpath(source, ROOT_DIR): file_hash(source) for source in sources}
+    except OSError:
+        return None
+
+
+def convert_ui_to_py(force: bool = False) -> list:
+    """
+    Конвертирование .ui и .qrc в .py, если исходники изменились с прошлой генерации.
+
+    :param force: Сгенерировать модули независимо от хэшей.
+    :return: Список сгенерированных модулей.
+    """
+    try:
+        with open(HASHES_FILENAME) as File:
+            saved = json.load(File)
+    except (OSError, ValueError):
+        saved = {}
+
+    generated = []
+    for module, command, sources in conversions():
+        name = os.path.basename(module)
+        hashes = source_hashes(sources)
+        if hashes is None:
+            # Исходников нет (установка без папки ui) - используется готовый модуль.
+            continue
+        if not force and saved.get(name) == hashes and os.path.exists(module):
+            continue
+        if os.system(command) == 0:
+            saved[name] = hashes
+            generated.append(module)
+
+    if generated:
+        with open(HASHES_FILENAME, 'w') as File:
+            json.dump(saved, File, indent=1)
+    return generated
 
 
 if __name__ == "__main__":
-    convert_ui_to_py()
\ No newline at end of file
+    convert_ui_to_py(force=True)
@@ -1,15 +1,62 @@
+import os
 import sys
-from PyQt5 import QtWidgets
 
-from window_logic import ResearchApp
+from tracing import tracer
+
+
+def startup_report(window, operation) -> bool:
+    """
+    Вывод времени этапов запуска до первой отрисовки окна.
+
+    :param window: Окно приложения.
+    :param operation: Операция трассировки запуска.
+    :return: Время запуска уложилось в бюджет - true, иначе - false.
+    """
+    from config import startup_budget_ms
+    window.finish_operation(operation)
+    elapsed = operation.duration / 1e6
+    report = tracer.format_summary(operation)
+    if elapsed > startup_budget_ms:
+        report += " | бюджет %d мс превышен" % startup_budget_ms
+    print(report, flush=True)
+    return elapsed <= startup_budget_ms
 
 
 def main():
-    app = QtWidgets.QApplication(sys.argv)
-    window = ResearchApp()
+    # Отчет о запуске включает трассировку (без замера памяти, чтобы не искажать время).
+    report = "--startup-report" in sys.argv or bool(os.environ.get("RESEARCH_STARTUP_REPORT"))
+    if report:
+        tracer.enable(memory=False)
+    startup = tracer.operation("startup")
+
+    # Модули интерфейса пересобираются, только если изменились .ui или ресурсы.
+    with tracer.span("ui2py"):
+        from ui2py import convert_ui_to_py
+        convert_ui_to_py()
+
+    with tracer.span("import"):
+        from PyQt5 import QtWidgets
+        from window_logic import ResearchApp
+
+    with tracer.span("qapplication"):
+        app = QtWidgets.QApplication(sys.argv)
+        # Название приложения задает папку данных (состояние объединения трехточек).
+        app.setApplicationName("Research")
+
+    with tracer.span("window_init"):
+        window = ResearchApp()
+
+    show = tracer.span("first_paint")
+    window.first_painted.connect(lambda: show.finish())
+    if report:
+        window.first_painted.connect(lambda: startup_report(window, startup))
     window.show()
     app.exec_()
 
 
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # Процессы пула расчетов в собранном приложении запускаются через этот же исполняемый файл.
+        import multiprocessing
+        multiprocessing.freeze_support()
     main()
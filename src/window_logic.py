@@ -1,183 +1,585 @@
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtCore import Qt
-from enum import Enum
 
 from PyQt5.QtWidgets import QDesktopWidget
 
 import main_app
-import csv
-import math
+import locale
 import os
 import json
 import re
+import sys
 from config import *
+from lazy_import import np
+from mapped_csv import MappedCsv, MappedColumns
+from sidecar import load_sidecar, save_sidecar, source_key
+from filter_expr import compile_filter
+from point_files import PointFileCache, make_pnt_dict, write_bundle
+from join_state import JoinState
+from tracing import tracer, NULL_SPAN
+from table_columns import StringColumn, to_string_column, extend_columns, column_mask, group_three_points, \
+    mask_three_points, preview_three_points, sample_matching_rows, LiveMoments, iter_row_chunks, read_csv_batches, \
+    export_csv, replace_comma, row_ranges
+# Расчетная часть не зависит от Qt; классы расчета доступны и отсюда для прежнего кода.
+from research_calc import ErrorCodes, MomentAccumulator, ResearchCalc, LRUCache, parse_number
 
 
-class ErrorCodes(Enum):
-    ERROR_STR_ARRAY = 0,
-    ERROR_TYPE_HISTOGRAM = 1,
-    ERROR_STR_HISTOGRAM = 2,
-    ERROR_ELEMENT_COUNT = 3,
-    ERROR_NOT_NUMERIC = 4,
-    ERROR_DISPERSION_ZERO = 5,
-    ERROR_UNDER_ROOT_NEGATIVE = 6,
-    ERROR_Q_ZERO = 7,
-    ERROR_Q_ECCENTRICITY = 8,
-    ERROR_PROBABILITY_NOT_1 = 9,
-    ERROR_MULTIPLE_ELEMENTS = 10,
-    ERROR_TABLE_NOT_LOADED = 11,
-    ERROR_FILE_NOT_LOADED = 12,
-    ERROR_INVALID_FILE_FORMAT = 13,
-    ERROR_EMPTY_FILE = 14,
-    ERROR_NO_LINE_SELECTED = 15
-    ERROR_NOT_PROPERTY = 16
-    ERROR_NOT_MONEY = 17
-    ERROR_POINT_NOT_LOADED = 18
-    ERROR_EMPTY_PROPERTY = 19
-
-
-class ResearchCalcErrors(Exception):
+class ResearchAppErrors(Exception):
     pass
 
 
-class ResearchAppErrors(Exception):
-    pass
+# Сообщения об ошибках фонового расчета трехточки.
+point_error_messages = {
+    ErrorCodes.ERROR_NOT_PROPERTY: "Внимание! В таблице нет столбца из условия.",
+    ErrorCodes.ERROR_FILE_NOT_LOADED: "Внимание! Файл не читается - расчет невозможен.",
+    ErrorCodes.ERROR_INVALID_FILE_FORMAT: "Внимание! В файле есть строки в другой кодировке - расчет невозможен.",
+}
 
 
-class ResearchCalc:
-    """ Вычисление трехточки """
-    def __init__(self):
-        super(ResearchCalc, self).__init__()
+class ResearchSignals(QtCore.QObject):
+    """ Сигналы для основного приложения """
+    delete_rows = QtCore.pyqtSignal(int, int)
 
-    @staticmethod
-    def calc_semi(data_array: list):
+
+class ColumnarTableModel(QtCore.QAbstractTableModel):
+    """
+    Модель таблицы с хранением данных по столбцам.
+
+    Вместо объекта QStandardItem на каждую ячейку хранит по одному массиву на столбец (см. table_columns).
+    """
+    # Сигналы до изменения ячейки (строка, столбец) и до удаления набора строк сбросом модели.
+    cell_about_to_change = QtCore.pyqtSignal(int, int)
+    row_set_about_to_be_removed = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super(ColumnarTableModel, self).__init__(parent)
+        self.headers = []
+        self.columns = []
+        self.row_count = 0
+        # Столбцы, отданные в снимки для фоновых расчетов (id объектов).
+        self.shared_columns = set()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        return self.columns[index.column()].get(index.row())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            if 0 <= section < len(self.headers):
+                return self.headers[section]
+            return None
+        return section + 1
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+
+        value = "" if value is None else str(value)
+        col = index.column()
+        self.cell_about_to_change.emit(index.row(), col)
+        if not self.own_column(col).set(index.row(), value):
+            # Нечисловое значение в числовом столбце - столбец становится строковым.
+            self.columns[col] = to_string_column(self.columns[col])
+            self.columns[col].set(index.row(), value)
+
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def insertRows(self, row, count, parent=QtCore.QModelIndex()):
+        if parent.isValid() or count <= 0 or not 0 <= row <= self.row_count:
+            return False
+
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + count - 1)
+        for col in range(len(self.columns)):
+            self.own_column(col).insert(row, count)
+        self.row_count += count
+        self.endInsertRows()
+        return True
+
+    def removeRows(self, row, count, parent=QtCore.QModelIndex()):
+        if parent.isValid() or count <= 0 or row < 0 or row + count > self.row_count:
+            return False
+
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row + count - 1)
+        for col in range(len(self.columns)):
+            self.own_column(col).remove(row, count)
+        self.row_count -= count
+        self.endRemoveRows()
+        return True
+
+    def remove_row_set(self, rows):
         """
-        Вычисление четырех первых семиинвариантов для массива данных.
+        Удаление произвольного набора строк одним сбросом модели.
 
-        :param data_array: Входной массив данных.
-        :return: Массив из 5-ти элементов.
+        :param rows: Номера удаляемых строк.
+        :return: None
         """
-        exit_code = None
-        try:
-            if not all(isinstance(x, (int, float, list)) for x in data_array):
-                exit_code = ErrorCodes.ERROR_STR_ARRAY
-                raise ResearchCalcErrors("Среди элементов массива присутсвуют строки. "
-                                         "Необходимо изменить входные данные на целые числа или числа с плавающей точкой.")
-
-            m1, m2, m3, m4 = 0, 0, 0, 0
-            size = 0
-            for item in data_array:
-                # Гистограмма
-                if isinstance(item, list):
-                    if len(item) != 2:
-                        exit_code = ErrorCodes.ERROR_TYPE_HISTOGRAM
-                        raise ResearchCalcErrors("Гистограмма задана неверно - ожидаемый вид [{число, кол-во}, ..., {число, кол-во}]")
-
-                    if len(item) == 2:
-                        for i in range(len(data_array)):
-                            if not all(isinstance(x, (int, float)) for x in data_array[i]):
-                                exit_code = ErrorCodes.ERROR_STR_HISTOGRAM
-                                raise ResearchCalcErrors("Среди элементов списка присутсвуют строки. "
-                                                         "Необходимо изменить входные данные на целые числа или числа с плавающей точкой.")
-
-                    size += item[1]
-                    m1 += item[1] * item[0]
-                    m2 += item[1] * item[0] ** 2
-                    m3 += item[1] * item[0] ** 3
-                    m4 += item[1] * item[0] ** 4
-                # Массив
-                elif isinstance(item, float) or isinstance(item, int):
-                    size = len(data_array)
-                    m1 += item
-                    m2 += item ** 2
-                    m3 += item ** 3
-                    m4 += item ** 4
-
-            # Вычисление моментов.
-            m1 /= size
-            m2 /= size
-            m3 /= size
-            m4 /= size
-
-            # Вычисление семиинвариантов.
-            s1 = m1
-            s2 = m2 - m1 ** 2
-            s3 = m3 - 3 * m1 * m2 + 2 * m1 ** 3
-            s4 = m4 - 4 * m1 * m3 - 3 * m2 ** 2 + 12 * m1 ** 2 * m2 - 6 * m1 ** 4
-            return [s1, s2, s3, s4, size]
-        except ResearchCalcErrors:
-            return exit_code
+        keep = np.ones(self.row_count, dtype=bool)
+        keep[np.fromiter(rows, dtype=np.intp)] = False
+        self.row_set_about_to_be_removed.emit(np.flatnonzero(~keep))
+
+        self.beginResetModel()
+        self.columns = [column.take(keep) for column in self.columns]
+        self.row_count = int(keep.sum())
+        self.endResetModel()
+
+    def clear(self):
+        """ Очистка модели """
+        self.beginResetModel()
+        self.headers = []
+        self.columns = []
+        self.row_count = 0
+        self.endResetModel()
+
+    def setHorizontalHeaderLabels(self, labels: list):
+        """ Установка названий столбцов (пустые столбцы создаются при необходимости) """
+        self.beginResetModel()
+        self.headers = list(labels)
+        while len(self.columns) < len(self.headers):
+            column = StringColumn()
+            column.insert(0, self.row_count)
+            self.columns.append(column)
+        self.endResetModel()
+
+    def set_columns(self, headers: list, columns: list):
+        """
+        Замена содержимого модели готовыми столбцами одной операцией.
+
+        :param headers: Заголовки столбцов.
+        :param columns: Столбцы одинаковой длины (см. table_columns).
+        :return: None
+        """
+        self.beginResetModel()
+        self.headers = list(headers)
+        self.columns = list(columns)
+        self.row_count = len(columns[0]) if columns else 0
+        self.endResetModel()
+
+    def column_snapshot(self, cols: list) -> dict:
+        """
+        Столбцы для расчета в другом потоке.
+
+        Столбцы отдаются без копирования; столбец из снимка копируется перед первым изменением таблицы
+        (см. own_column), поэтому расчет видит таблицу на момент запуска.
+
+        :param cols: Номера столбцов.
+        :return: Словарь {номер столбца: столбец}.
+        """
+        snapshot = {col: self.columns[col] for col in cols}
+        self.shared_columns.update(id(column) for column in snapshot.values())
+        return snapshot
 
     @staticmethod
-    def calc_three_points(semi_list: list):
+    def column_sample(snapshot: dict, cols: list, rows) -> dict:
+        """ Выбранные строки столбцов снимка (вызывается в потоке расчета) """
+        return {col: snapshot[col].take(rows) for col in cols}
+
+    def own_column(self, col: int):
+        """ Столбец для изменения: если он отдан в снимок, сначала заменяется копией """
+        column = self.columns[col]
+        if id(column) in self.shared_columns:
+            self.shared_columns.discard(id(column))
+            column = self.columns[col] = column.copy()
+        return column
+
+    def append_rows(self, rows: list):
         """
-        Вычисление трехточки.
+        Добавление порции строк одной операцией модели.
 
-        :param semi_list: Массив с семиинвариантами.
-        :return: Среднее минимальное, среднее максимальное, среднее среднее.
+        :param rows: Список строк, каждая - список значений ячеек.
+        :return: None
         """
-        exit_code = None
-        try:
-            if not len(semi_list) == 5:
-                exit_code = ErrorCodes.ERROR_ELEMENT_COUNT
-                raise ResearchCalcErrors("Количество элементов входного массива != 5.")
+        if not rows:
+            return
+
+        width = max(len(self.headers), max(len(row) for row in rows))
+        if width > len(self.headers):
+            self.beginInsertColumns(QtCore.QModelIndex(), len(self.headers), width - 1)
+            for col in range(len(self.headers), width):
+                self.headers.append(str(col + 1))
+                if col >= len(self.columns):
+                    column = StringColumn()
+                    column.insert(0, self.row_count)
+                    self.columns.append(column)
+            self.endInsertColumns()
+
+        self.beginInsertRows(QtCore.QModelIndex(), self.row_count, self.row_count + len(rows) - 1)
+        if self.row_count:
+            for col in range(width):
+                self.own_column(col)
+        extend_columns(self.columns, rows, self.row_count, width)
+        self.row_count += len(rows)
+        self.endInsertRows()
+
+
+class MappedTableModel(QtCore.QAbstractTableModel):
+    """
+    Модель только для просмотра поверх CSV-файла, отображенного в память.
+
+    Разбираются только отображаемые строки; столбцы для расчетов строятся по требованию.
+    """
+
+    def __init__(self, mapped: MappedCsv, parent=None):
+        super(MappedTableModel, self).__init__(parent)
+        self.mapped = mapped
+        self.headers = mapped.headers
+        self.columns = MappedColumns(mapped)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.mapped.row_count
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        row = self.mapped.row(index.row())
+        return row[index.column()] if index.column() < len(row) else ""
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if 0 <= section < len(self.headers) else None
+        return section + 1
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    def column_snapshot(self, cols: list) -> MappedColumns:
+        """ Столбцы файла не меняются, поэтому снимком служат сами столбцы (строятся в потоке расчета) """
+        return self.columns
+
+    def column_sample(self, snapshot: MappedColumns, cols: list, rows) -> dict:
+        """ Выбранные строки разбираются из файла без построения столбцов (вызывается в потоке расчета) """
+        return self.mapped.sample_columns(cols, rows)
+
+    def close(self):
+        self.mapped.close()
+
+
+class LivePointTracker(QtCore.QObject):
+    """
+    Моменты текущего отбора строк, обновляемые по сигналам модели таблицы.
+
+    Правка ячейки вычитает прежний вклад строки и добавляет новый, добавленные строки прибавляются,
+    удаляемые - вычитаются, поэтому трехточка после изменения пересчитывается за O(изменившихся строк).
+    Сброс модели и добавление столбцов прекращают отслеживание.
+    """
+    changed = QtCore.pyqtSignal()
+
+    def __init__(self, model: ColumnarTableModel):
+        super(LivePointTracker, self).__init__(model)
+        self.model = model
+        self.moments = None
+        # Строка, вклад которой вычтен до правки ячейки и добавляется после нее.
+        self._edited_row = None
+        # Сброс модели после удаления набора строк уже учтен.
+        self._reset_expected = False
+
+        model.cell_about_to_change.connect(self.cell_about_to_change)
+        model.dataChanged.connect(self.data_changed)
+        model.rowsInserted.connect(self.rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self.rows_about_to_be_removed)
+        model.row_set_about_to_be_removed.connect(self.row_set_about_to_be_removed)
+        model.modelReset.connect(self.model_reset)
+        model.columnsInserted.connect(self.clear)
+
+    def track(self, moments: LiveMoments):
+        """ Начало отслеживания моментов отбора (моменты соответствуют текущей таблице) """
+        self.moments = moments
+        self._edited_row = None
+        self._reset_expected = False
+
+    def clear(self):
+        self.moments = None
+        self._edited_row = None
+
+    def tracks(self, selection: tuple) -> bool:
+        """ Отслеживается ли отбор (ключ расчета без версии таблицы) """
+        return self.moments is not None and self.moments.selection == selection
+
+    def result(self, selection: tuple) -> tuple | None:
+        """
+        Трехточка отбора по отслеживаемым моментам.
 
-            if not all(isinstance(x, (int, float)) for x in semi_list):
-                exit_code = ErrorCodes.ERROR_NOT_NUMERIC
-                raise ResearchCalcErrors("В списке присутствуют не числа.")
+        :param selection: Описание отбора (ключ расчета без версии таблицы).
+        :return: (семиинварианты, трехточка или ErrorCodes) или None, если этот отбор не отслеживается.
+        """
+        return self.moments.result() if self.tracks(selection) else None
 
-            xs = semi_list[0]
-            dd = semi_list[1]
+    @QtCore.pyqtSlot(int, int)
+    def cell_about_to_change(self, row: int, col: int):
+        if self.moments is not None and col in self.moments.cols:
+            self.moments.remove_rows(self.model.columns, [row])
+            self._edited_row = row
+
+    @QtCore.pyqtSlot(QtCore.QModelIndex, QtCore.QModelIndex)
+    def data_changed(self, top_left, bottom_right):
+        if self.moments is None:
+            return
+        row = self._edited_row
+        self._edited_row = None
+        if row is not None and top_left.row() == row == bottom_right.row():
+            self.moments.add_rows(self.model.columns, [row])
+            self.changed.emit()
+        elif any(col in self.moments.cols for col in range(top_left.column(), bottom_right.column() + 1)):
+            # Изменение не через setData - прежний вклад строк неизвестен.
+            self.clear()
+
+    @QtCore.pyqtSlot(QtCore.QModelIndex, int, int)
+    def rows_inserted(self, parent, first: int, last: int):
+        if self.moments is not None:
+            self.moments.add_rows(self.model.columns, range(first, last + 1))
+            self.changed.emit()
+
+    @QtCore.pyqtSlot(QtCore.QModelIndex, int, int)
+    def rows_about_to_be_removed(self, parent, first: int, last: int):
+        if self.moments is not None:
+            self.moments.remove_rows(self.model.columns, range(first, last + 1))
+            self.changed.emit()
+
+    @QtCore.pyqtSlot(object)
+    def row_set_about_to_be_removed(self, rows):
+        if self.moments is not None:
+            self.moments.remove_rows(self.model.columns, rows)
+            self._reset_expected = True
+
+    @QtCore.pyqtSlot()
+    def model_reset(self):
+        if self._reset_expected:
+            self._reset_expected = False
+            self.changed.emit()
+        else:
+            self.clear()
 
-            if dd == 0:
-                exit_code = ErrorCodes.ERROR_DISPERSION_ZERO
-                raise ResearchCalcErrors("Дисперсия равна 0 - дальнейшие вычисления невозможны.")
 
-            aa = semi_list[2] / dd / 2.
-            ee = semi_list[3]
-            ss = math.sqrt(dd)
+class CsvLoadWorker(QtCore.QObject):
+    """ Фоновое чтение CSV-файла порциями строк """
+    header_loaded = QtCore.pyqtSignal(list)
+    rows_loaded = QtCore.pyqtSignal(list)
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(bool)
 
-            first = ee / (dd ** 2)
-            second = (3. * (aa ** 2)) / dd
-            under_root = 3 + first - second
+    def __init__(self, filename: str, encoding: str = None):
+        super(CsvLoadWorker, self).__init__()
+        self.filename = filename
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self._cancelled = False
 
-            if under_root < 0:
-                exit_code = ErrorCodes.ERROR_UNDER_ROOT_NEGATIVE
-                raise ResearchCalcErrors("Подкоренное значение для q отрицательно - дальнейшие вычисления невозможны.")
+    def cancel(self):
+        """ Запрос на отмену загрузки (вызывается из потока интерфейса) """
+        self._cancelled = True
 
-            qq = math.sqrt(under_root)
+    @QtCore.pyqtSlot()
+    def run(self):
+        """
+        Чтение файла порциями строк (см. read_csv_batches).
 
-            if qq == 0:
-                exit_code = ErrorCodes.ERROR_Q_ZERO
-                raise ResearchCalcErrors("Вспомогательная величина q = 0 - дальнейшие вычисления невозможны.")
-            if (qq - aa) == 0 or (qq + aa) == 0:
-                exit_code = ErrorCodes.ERROR_Q_ECCENTRICITY
-                raise ResearchCalcErrors("Вспомогательная величина (q ± A) = 0 - дальнейшие вычисления невозможны.")
+        :return: None
+        """
+        try:
+            batches = read_csv_batches(self.filename, self.encoding, csv_first_batch_rows, csv_batch_rows,
+                                       progress=self.progress.emit, cancelled=lambda: self._cancelled)
+            self.header_loaded.emit(next(batches))
+            for batch in batches:
+                self.rows_loaded.emit(batch)
+        except Exception:
+            self.finished.emit(False)
+            return
+        self.finished.emit(True)
+
+
+class CsvSaveWorker(QtCore.QObject):
+    """ Фоновая запись таблицы в CSV порциями строк """
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(bool)
+
+    def __init__(self, filename: str, headers: list, row_chunks, row_count: int):
+        super(CsvSaveWorker, self).__init__()
+        self.filename = filename
+        self.headers = headers
+        self.row_chunks = row_chunks
+        self.row_count = row_count
+        self._cancelled = False
+
+    def cancel(self):
+        """ Запрос на отмену сохранения (вызывается из потока интерфейса) """
+        self._cancelled = True
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        try:
+            with tracer.span("csv_write", rows=self.row_count):
+                success = export_csv(self.filename, self.headers, self.row_chunks, self.row_count,
+                                     progress=self.progress.emit, cancelled=lambda: self._cancelled)
+        except Exception:
+            success = False
+        self.finished.emit(success)
+
+
+class PointCalcWorker(QtCore.QObject):
+    """ Расчет трехточки в пуле потоков по снимку нужных столбцов таблицы """
+    preview = QtCore.pyqtSignal(object)
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(object)
+
+    def __init__(self, key: tuple, columns, wage_col: int, make_mask, engine=None, sample=None, row_count: int = 0):
+        super(PointCalcWorker, self).__init__()
+        self.key = key
+        self.columns = columns
+        self.wage_col = wage_col
+        self.make_mask = make_mask
+        self.engine = engine
+        # Функция, возвращающая нужные столбцы для выбранных строк (None - без предварительного расчета).
+        self.sample = sample
+        self.row_count = row_count
+        self._cancelled = False
+
+    def cancel(self):
+        """ Запрос на отмену расчета (вызывается из потока интерфейса) """
+        self._cancelled = True
+
+    def preview_result(self) -> tuple | None:
+        """
+        Предварительная трехточка по выборке подходящих строк.
 
-            x1, x2 = -ss * qq + xs + aa, ss * qq + xs + aa
-            p1, p2 = ss / (2. * qq * (ss * qq - aa)), ss / (2. * qq * (ss * qq + aa))
-            p3 = 1 - p1 - p2
+        :return: (семиинварианты, трехточка, погрешности, размер выборки) или None, если оценка невозможна.
+        """
+        sample = sample_matching_rows(self.row_count, point_preview_rows, point_preview_seed,
+                                      lambda rows: self.make_mask(self.sample(rows)), point_preview_max_rows,
+                                      cancelled=lambda: self._cancelled)
+        if sample is None or isinstance(sample, ErrorCodes):
+            return None
+        rows, scanned = sample
+        columns = self.sample(rows)
+        result = preview_three_points(columns[self.wage_col], np.ones(len(rows), dtype=bool), self.row_count,
+                                      seed=point_preview_seed, scanned_rows=scanned)
+        return None if result is None else result + (len(rows),)
+
+    def run(self):
+        """
+        Отбор строк и расчет трехточки порциями строк.
 
-            if (p1 + p2 + p3) != 1:
-                exit_code = ErrorCodes.ERROR_PROBABILITY_NOT_1
-                raise ResearchCalcErrors("Сумма вероятностей не равна 1.")
+        Если задана выборка, сначала сигналом preview передается предварительная трехточка.
+        Сигнал finished передает (семиинварианты, трехточка), ErrorCodes, если в таблице нет столбца
+        из условия или файл не читается, или None, если расчет отменен.
 
-            return [[x1, p1], [xs, p3], [x2, p2]]
-        except ResearchCalcErrors:
-            return exit_code
+        :return: None
+        """
+        try:
+            if self.sample is not None:
+                with tracer.span("preview"):
+                    preview = self.preview_result()
+                if preview is not None and not self._cancelled:
+                    self.preview.emit(preview)
+            with tracer.span("filter"):
+                correct_rows = self.make_mask(self.columns)
+            if isinstance(correct_rows, ErrorCodes):
+                result = correct_rows
+            else:
+                result = mask_three_points(self.columns[self.wage_col], correct_rows, chunk_rows=point_calc_chunk_rows,
+                                           progress=self.progress.emit, cancelled=lambda: self._cancelled,
+                                           engine=self.engine)
+        except OSError:
+            # Отображенный в память файл удален или не читается.
+            result = ErrorCodes.ERROR_FILE_NOT_LOADED
+        except UnicodeDecodeError:
+            result = ErrorCodes.ERROR_INVALID_FILE_FORMAT
+        except Exception:
+            # Прочие ошибки - ошибки программы: они выводятся как необработанные, поле трехточки не зависает.
+            sys.excepthook(*sys.exc_info())
+            result = ErrorCodes.ERROR_CALC_FAILED
+        self.finished.emit(None if self._cancelled else result)
+
+
+class GroupPointsDialog(QtWidgets.QDialog):
+    """ Окно с трехточками для всех значений столбца """
+
+    def __init__(self, parent, column_name: str, groups: list, filedialog_path: str):
+        super(GroupPointsDialog, self).__init__(parent)
+        self.column_name = column_name
+        self.groups = groups
+        self.filedialog_path = filedialog_path
+        self.setWindowTitle("Трехточки по столбцу " + column_name)
+        self.resize(900, 500)
+        self.setStyleSheet("font: 10pt \"Century Gothic\";")
+
+        table = QtWidgets.QTableWidget(len(groups), 5, self)
+        table.setHorizontalHeaderLabels([column_name, "Количество", "Min", "Avg", "Max"])
+        table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        for row, (label, semi, three_points) in enumerate(groups):
+            table.setItem(row, 0, QtWidgets.QTableWidgetItem(label))
+            table.setItem(row, 1, QtWidgets.QTableWidgetItem(str(semi[4])))
+            if isinstance(three_points, ErrorCodes):
+                table.setItem(row, 2, QtWidgets.QTableWidgetItem("Расчёт не возможен"))
+                continue
+            for col, point in enumerate(three_points):
+                text = "[" + format(point[0], '.0f') + ", " + format(point[1], '.2f') + "]"
+                table.setItem(row, col + 2, QtWidgets.QTableWidgetItem(text))
+
+        save_button = QtWidgets.QPushButton("Сохранить трехточки", self)
+        save_button.clicked.connect(self.save_points_logic)
+        close_button = QtWidgets.QPushButton("Закрыть", self)
+        close_button.clicked.connect(self.accept)
+
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(save_button)
+        buttons.addWidget(close_button)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(table)
+        layout.addLayout(buttons)
+
+    def save_points_logic(self):
+        """
+        Сохранение всех трехточек в один .pnt файл-набор (запись на каждое значение столбца).
 
+        :return: None
+        """
+        name = re.sub(r'[<>:"/\\|?*]', "_", self.column_name) + ".pnt"
+        filename, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Сохранение трехточек",
+                                                            os.path.join(self.filedialog_path, name),
+                                                            "All types of docs (*.pnt)")
+        if not filename:
+            return
 
-class ResearchSignals(QtCore.QObject):
-    """ Сигналы для основного приложения """
-    delete_rows = QtCore.pyqtSignal(int, int)
+        write_bundle(filename, (make_pnt_dict(three_points, semi, label) for label, semi, three_points in self.groups
+                                if not isinstance(three_points, ErrorCodes)))
 
 
 class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
     """ Класс-реализация окна исследования """
+    # Окно отрисовано первый раз (отложенная настройка и отчет о запуске).
+    first_painted = QtCore.pyqtSignal()
+
+    # Тени кнопок: (blurRadius, xOffset, yOffset).
+    button_shadows = {"AddButton": (15, -3, 3), "DownloadButton": (15, -3, 3), "DeleteButton": (15, 3, 3),
+                      "SaveButton": (15, 3, 3), "PointButton": (25, 3, 3), "SavePointButton": (25, 3, 3),
+                      "CalcPointButton": (15, 3, 3), "SaveResultButton": (15, -3, 3)}
 
     def __init__(self):
         QtWidgets.QMainWindow.__init__(self)
-        self.setupUi(self)
+        with tracer.span("setup_ui"):
+            self.setupUi(self)
         qr = self.frameGeometry()
         cp = QDesktopWidget().availableGeometry().center()
         qr.moveCenter(cp)
@@ -188,47 +590,152 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
 
         # Обработчики кнопок.
         self.AddButton.clicked.connect(self.add_button_logic)
-        self.AddButton.setGraphicsEffect(QtWidgets.QGraphicsDropShadowEffect(blurRadius=15, xOffset=-3, yOffset=3))
         self.DownloadButton.clicked.connect(self.load_button_logic)
-        self.DownloadButton.setGraphicsEffect(QtWidgets.QGraphicsDropShadowEffect(blurRadius=15, xOffset=-3, yOffset=3))
         self.DeleteButton.clicked.connect(self.delete_button_logic)
-        self.DeleteButton.setGraphicsEffect(QtWidgets.QGraphicsDropShadowEffect(blurRadius=15, xOffset=3, yOffset=3))
         self.SaveButton.clicked.connect(self.save_button_logic)
-        self.SaveButton.setGraphicsEffect(QtWidgets.QGraphicsDropShadowEffect(blurRadius=15, xOffset=3, yOffset=3))
         self.PointButton.clicked.connect(self.calc_point_logic)
-        self.PointButton.setGraphicsEffect(QtWidgets.QGraphicsDropShadowEffect(blurRadius=25, xOffset=3, yOffset=3))
         self.CloseButton.clicked.connect(self.close_logic)
         self.SavePointButton.clicked.connect(self.save_point_logic)
-        self.SavePointButton.setGraphicsEffect(QtWidgets.QGraphicsDropShadowEffect(blurRadius=25, xOffset=3, yOffset=3))
         self.CalcPointButton.clicked.connect(self.calc_join_point_logic)
-        self.CalcPointButton.setGraphicsEffect(QtWidgets.QGraphicsDropShadowEffect(blurRadius=15, xOffset=3, yOffset=3))
         self.SaveResultButton.clicked.connect(self.save_result_logic)
-        self.SaveResultButton.setGraphicsEffect(QtWidgets.QGraphicsDropShadowEffect(blurRadius=15, xOffset=-3, yOffset=3))
+
+        # Тени кнопок замедляют первую отрисовку и добавляются после нее.
+        self.painted = False
+        self.first_painted.connect(self.deferred_setup, QtCore.Qt.QueuedConnection)
 
         # Таблица.
-        self.table_model = QtGui.QStandardItemModel()
+        self.table_model = ColumnarTableModel()
         self.tableView.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
-        self.tableView.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+        self.tableView.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
         self.tableView.setModel(self.table_model)
 
+        # Кэш расчетов трехточки по свойству, сбрасываемый при изменении таблицы.
+        self.table_version = 0
+        self.point_cache = LRUCache(point_cache_size)
+        self.table_model.dataChanged.connect(self.invalidate_point_cache)
+        self.table_model.rowsInserted.connect(self.invalidate_point_cache)
+        self.table_model.rowsRemoved.connect(self.invalidate_point_cache)
+        self.table_model.columnsInserted.connect(self.invalidate_point_cache)
+        self.table_model.modelReset.connect(self.invalidate_point_cache)
+
+        # Моменты последнего рассчитанного отбора, обновляемые при правках таблицы.
+        self.live_point = LivePointTracker(self.table_model)
+        self.live_point.changed.connect(self.live_point_changed)
+
+        # Изменения таблицы во время загрузки (тогда файл-спутник не пишется).
+        self.table_model.dataChanged.connect(self.mark_table_edited)
+        self.table_model.rowsInserted.connect(self.mark_table_edited)
+        self.table_model.rowsRemoved.connect(self.mark_table_edited)
+        self.load_filename = None
+        self.load_source_key = None
+        self.load_appending = False
+        self.table_edited = False
+
+        # Модель просмотра больших файлов.
+        self.mapped_model = None
+
+        # Фоновая загрузка CSV (загрузку и сохранение отменяют кнопка "Отмена" и Escape).
+        self.CancelLoadButton.clicked.connect(self.cancel_progress_logic)
+        self.show_progress(False)
+        self.load_thread = None
+        self.load_worker = None
+
+        # Фоновое сохранение CSV.
+        self.save_thread = None
+        self.save_worker = None
+
+        # Трассировка операций: время этапов последней операции выводится под таблицей.
+        if trace_enabled or os.environ.get("RESEARCH_TRACE"):
+            tracer.enable()
+        self.TraceLabel.setVisible(tracer.enabled)
+        self.load_operation = NULL_SPAN
+        self.save_operation = NULL_SPAN
+
         # Объект управления сигналами.
         self.win_manager = ResearchSignals()
         self.win_manager.delete_rows.connect(self.delete_rows_logic)
 
-        # Объект расчетов.
-        self.calculator = ResearchCalc()
+        # Фоновый расчет трехточки: пул потоков и текущий расчет.
+        self.point_pool = QtCore.QThreadPool(self)
+        self.point_pool.setMaxThreadCount(point_calc_workers)
+        self.point_worker = None
+        self.point_operation = NULL_SPAN
+        # Текст предварительной трехточки, пока идет точный расчет.
+        self.point_preview = None
+
+        # Объект расчетов (создается при первом расчете).
+        self._calculator = None
+
+        # Пул процессов для расчетов по большим таблицам (запускается при первом таком расчете).
+        self._process_engine = None
 
         # Словарь для свойств.
         self.properties_indexes = {}
 
+        # Условие отбора, введенное в поле свойства вручную (скомпилированные условия запоминаются).
+        self.filter_cache = LRUCache(point_cache_size)
+        self.propertylineEdit.textEdited.connect(self.property_text_edited)
+
         # Словарь для сохранения трехточки.
-        self.pnt_list = []
         self.pnt_dict = {}
 
+        # Трехточки из .pnt файлов, запомненные для повторных объединений.
+        self.point_files = PointFileCache(point_file_cache_size, point_file_workers)
+
+        # Накопленное объединение трехточек (загружается при первом объединении вместе с путем к файлу).
+        self.join_state = None
+        self._join_state_path = None
+
         # Флаги сохранения трехточки.
         self.point_flag = False
         self.join_point_flag = False
 
+    @property
+    def calculator(self) -> ResearchCalc:
+        if self._calculator is None:
+            self._calculator = ResearchCalc()
+        return self._calculator
+
+    def process_engine(self, row_count: int):
+        """
+        Пул процессов для расчета по таблице из row_count строк.
+
+        :param row_count: Количество строк таблицы.
+        :return: ProcessEngine или None, если таблица небольшая или пул процессов отключен.
+        """
+        if process_pool_workers == 0 or row_count < process_pool_min_rows:
+            return None
+        if self._process_engine is None:
+            from parallel_calc import ProcessEngine
+            self._process_engine = ProcessEngine(process_pool_workers)
+        return self._process_engine
+
+    @property
+    def join_state_path(self) -> str:
+        """ Путь к файлу состояния объединения в папке данных приложения """
+        if self._join_state_path is None:
+            self._join_state_path = os.path.join(
+                QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.AppDataLocation), join_state_filename)
+        return self._join_state_path
+
+    def paintEvent(self, event):
+        super(ResearchApp, self).paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.first_painted.emit()
+
+    @QtCore.pyqtSlot()
+    def deferred_setup(self):
+        """
+        Настройка, не нужная для первой отрисовки окна: тени кнопок.
+
+        :return: None
+        """
+        with tracer.span("deferred_setup"):
+            for name, (blur, x_offset, y_offset) in self.button_shadows.items():
+                getattr(self, name).setGraphicsEffect(
+                    QtWidgets.QGraphicsDropShadowEffect(blurRadius=blur, xOffset=x_offset, yOffset=y_offset))
+
     @staticmethod
     def output_style_in_qlineedit(obj: QtWidgets.QLineEdit, text: str):
         """
@@ -246,22 +753,25 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
                         )
 
     @staticmethod
-    def threepoint_formatting_for_output(threepoint: list) -> str:
+    def threepoint_formatting_for_output(threepoint: list, errors: list = None) -> str:
         """
         Создание единого стиля для вывода трехточек.
 
         :param threepoint: Данные после расчета функции трехточки.
+        :param errors: Погрешности чисел Min, Avg, Max (для предварительной трехточки).
         :return: str вида Min: [число, вероятность] Avg: [число, вероятность] Max: [число, вероятность]
+                 (с погрешностями - Min: [число ±погрешность, вероятность] ...)
         """
         float_precision_1 = '.0f'
         float_precision_2 = '.2f'
 
-        avg_minimal = "[" + str(format(threepoint[0][0], float_precision_1)) + \
-                      ", " + str(format(threepoint[0][1], float_precision_2)) + "]"
-        avg_middle = "[" + str(format(threepoint[1][0], float_precision_1)) + \
-                     ", " + str(format(threepoint[1][1], float_precision_2)) + "]"
-        avg_maximal = "[" + str(format(threepoint[2][0], float_precision_1)) + \
-                      ", " + str(format(threepoint[2][1], float_precision_2)) + "]"
+        numbers = [str(format(point[0], float_precision_1)) for point in threepoint]
+        if errors is not None:
+            numbers = [number + " ±" + str(format(error, float_precision_1)) for number, error in zip(numbers, errors)]
+
+        avg_minimal = "[" + numbers[0] + ", " + str(format(threepoint[0][1], float_precision_2)) + "]"
+        avg_middle = "[" + numbers[1] + ", " + str(format(threepoint[1][1], float_precision_2)) + "]"
+        avg_maximal = "[" + numbers[2] + ", " + str(format(threepoint[2][1], float_precision_2)) + "]"
 
         return "Min: " + avg_minimal + "\tAvg: " + avg_middle + "\tMax: " + avg_maximal
 
@@ -308,11 +818,14 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
         lower_property.triggered.connect(self.lower_property)
         add_as_property = QtWidgets.QAction('Выбрать как свойство', self)
         add_as_property.triggered.connect(self.add_as_property)
+        group_property = QtWidgets.QAction('Рассчитать для всех значений столбца', self)
+        group_property.triggered.connect(self.group_point_logic)
 
         self.context_menu.addAction(upper_property)
         self.context_menu.addAction(equal_property)
         self.context_menu.addAction(lower_property)
         self.context_menu.addAction(add_as_property)
+        self.context_menu.addAction(group_property)
         self.context_menu.setStyleSheet("background-color: rgba(235,193,255,255);"
                                         "font: 10pt \"Century Gothic\";\n")
 
@@ -324,12 +837,12 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
             if not idx.data():
                 is_empty = True
             else:
-                if str(idx.data()).isdigit():
+                if parse_number(idx.data()) is not None:
                     is_digit = True
                 else:
                     is_letter = True
 
-        if is_empty:
+        if is_empty or len(indexes) != 1:
             lower_property.setEnabled(False)
             upper_property.setEnabled(False)
             equal_property.setEnabled(False)
@@ -343,8 +856,69 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
         if not is_letter:
             add_as_property.setEnabled(False)
 
+        if not indexes:
+            group_property.setEnabled(False)
+
+        self.context_menu.addSeparator()
+        trace_action = QtWidgets.QAction('Трассировка операций', self)
+        trace_action.setCheckable(True)
+        trace_action.setChecked(tracer.enabled)
+        trace_action.toggled.connect(self.trace_toggle_logic)
+        export_trace = QtWidgets.QAction('Сохранить трассировку', self)
+        export_trace.triggered.connect(self.export_trace_logic)
+        export_trace.setEnabled(len(tracer.events) > 0)
+        self.context_menu.addAction(trace_action)
+        self.context_menu.addAction(export_trace)
+
         self.context_menu.popup(QtGui.QCursor.pos())
 
+    @QtCore.pyqtSlot(bool)
+    def trace_toggle_logic(self, enabled: bool):
+        """
+        Включение и выключение трассировки операций.
+
+        :param enabled: Новое состояние трассировки.
+        :return: None
+        """
+        if enabled:
+            tracer.enable()
+        else:
+            tracer.disable()
+        self.TraceLabel.setVisible(enabled)
+
+    def export_trace_logic(self):
+        """
+        Сохранение собранных участков в формате Chrome trace event.
+
+        :return: None
+        """
+        exit_code = None
+        try:
+            filename, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Сохранение трассировки", self.filedialog_path,
+                                                                "Chrome trace (*.json)")
+            if not filename:
+                return
+
+            try:
+                tracer.export_chrome(filename)
+            except OSError:
+                self.show_message_box("Ошибка", "Не удалось сохранить трассировку в выбранный файл.")
+                exit_code = ErrorCodes.ERROR_FILE_NOT_LOADED
+                raise ResearchAppErrors("Не удалось сохранить трассировку в выбранный файл.")
+        except ResearchAppErrors:
+            return exit_code
+
+    def finish_operation(self, operation):
+        """
+        Завершение операции трассировки и вывод времени ее этапов в окне.
+
+        :param operation: Участок операции (tracer.operation).
+        :return: None
+        """
+        operation.finish()
+        if tracer.enabled and operation is not NULL_SPAN:
+            self.TraceLabel.setText(tracer.format_summary(operation))
+
     def getting_headers(self):
         """
         Получение заголовков
@@ -358,6 +932,20 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
 
         return headers
 
+    def getting_wage_column(self, headers: list):
+        """
+        Получение номера колонки с ЗП.
+
+        :param headers: Заголовки таблицы.
+        :return: Номер колонки или None.
+        """
+        wage_col = None
+        for name in wage_column_names:
+            if name in headers:
+                wage_col = headers.index(name)
+
+        return wage_col
+
     def equal_property(self):
         """
         Рассчитать для значений "равно"...
@@ -389,13 +977,15 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
         :param prop: Свойство.
         :return: None
         """
-        self.propertylineEdit.clear()
-        self.properties_indexes.clear()
-
         indexes = self.tableView.selectionModel().selectedIndexes()
         if len(indexes) != 1:
-            exit_code = ErrorCodes.ERROR_MULTIPLE_ELEMENTS
-            raise ResearchAppErrors("Выделено несколько элементов...")
+            self.show_message_box("Информация", "Для выбора свойства нужно выделить одну ячейку.")
+            return ErrorCodes.ERROR_MULTIPLE_ELEMENTS
+
+        self.cancel_point_worker()
+        self.live_point.clear()
+        self.propertylineEdit.clear()
+        self.properties_indexes.clear()
 
         # Получение заголовков.
         headers = self.getting_headers()
@@ -408,7 +998,7 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
         added_prop = ""
 
         # Проверка на числовое значение.
-        if str(item).isdigit():
+        if parse_number(item) is not None:
             # Добавление символа перед свойством.
             if prop:
                 added_prop += str(prop)
@@ -423,6 +1013,18 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
         # Добавление свойства в словарь: (Строка, Столбец): Свойство.
         self.properties_indexes[(indexes[-1].row(), indexes[-1].column())] = added_prop
 
+    @QtCore.pyqtSlot(str)
+    def property_text_edited(self, text: str):
+        """
+        Ручной ввод в поле свойства: свойство из ячейки заменяется условием отбора.
+
+        :param text: Текст поля.
+        :return: None
+        """
+        self.cancel_point_worker()
+        self.live_point.clear()
+        self.properties_indexes.clear()
+
     @QtCore.pyqtSlot(int, int)
     def delete_rows_logic(self, row_number: int, rows_count: int):
         """
@@ -434,26 +1036,6 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
         """
         self.tableView.model().removeRows(row_number, rows_count)
 
-    def find_replace_comma(self) -> bool:
-        """
-        Функция поиска и замены запятых в ячейках таблицы.
-
-        :return: Если есть запятые и произведена замена - true, иначе - false.
-        """
-        bool_flag = False
-        model = self.tableView.model()
-        for row in range(model.rowCount()):
-            for column in range(model.columnCount()):
-                index = model.index(row, column)
-                datas = index.data()
-                data_help = datas.replace(",", ";")
-
-                if datas != data_help:
-                    model.setData(index, data_help)
-                    bool_flag = True
-
-        return bool_flag
-
     def add_button_logic(self):
         """
         Обработчик нажатия на кнопку "Добавить".
@@ -498,31 +1080,176 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
                 exit_code = ErrorCodes.ERROR_EMPTY_FILE
                 raise ResearchAppErrors("Загружен пустой файл - работа с ним невозможна.")
 
+            self.cancel_loading()
+            self.close_mapped_view()
             self.table_model.clear()
-            try:
-                with open(filename, newline='') as File:
-                    reader = csv.reader(File)
-
-                    for i, row in enumerate(reader):
-                        if i == 0:
-                            # Добавление названий колонок.
-                            self.table_model.setHorizontalHeaderLabels(row)
-                        else:
-                            # Добавление строк данных.
-                            items = []
-                            for field in row:
-                                items.append(QtGui.QStandardItem(field.strip()))
-                            self.table_model.appendRow(items)
-                    self.tableView.setModel(self.table_model)
-                    self.tableView.setStyleSheet("border-radius: 20px;\n"
-                                             "background-color: rgba(255, 255, 255, 50);\n"
-                                             "font: 10pt \"Century Gothic\";")
-            except Exception:
-                exit_code = ErrorCodes.ERROR_INVALID_FILE_FORMAT
-                return exit_code
+            self.load_operation = tracer.operation("load", file=os.path.basename(filename))
+
+            # Большие файлы открываются только для просмотра без загрузки в память.
+            if os.stat(filename).st_size >= csv_mapped_view_size:
+                self.open_mapped_view(filename)
+                return
+
+            # Повторное открытие того же файла - из двоичного файла-спутника без разбора CSV.
+            encoding = locale.getpreferredencoding(False)
+            with tracer.span("sidecar_load"):
+                cached = load_sidecar(filename, encoding)
+            if cached is not None:
+                with tracer.span("model_populate", rows=len(cached[1][0]) if cached[1] else 0):
+                    self.table_model.set_columns(*cached)
+                self.set_loaded_table_style()
+                self.finish_operation(self.load_operation)
+                return
+
+            # Ключ снимается до чтения: если файл изменится во время загрузки, файл-спутник окажется устаревшим.
+            self.load_filename = filename
+            self.load_source_key = source_key(filename, encoding)
+            self.table_edited = False
+            self.load_thread = QtCore.QThread()
+            self.load_worker = CsvLoadWorker(filename, encoding)
+            self.load_worker.moveToThread(self.load_thread)
+            self.load_thread.started.connect(self.load_worker.run)
+            self.load_worker.header_loaded.connect(self.load_header_logic)
+            self.load_worker.rows_loaded.connect(self.load_rows_logic)
+            self.load_worker.progress.connect(self.load_progress_logic)
+            self.load_worker.finished.connect(self.load_finished_logic)
+
+            self.show_progress(True)
+            self.load_thread.start()
         except ResearchAppErrors:
             return exit_code
 
+    def open_mapped_view(self, filename: str):
+        """
+        Открытие CSV-файла только для просмотра через отображение в память.
+
+        :param filename: Путь к файлу.
+        :return: None
+        """
+        try:
+            with tracer.span("mapped_open") as span:
+                mapped = MappedCsv(filename)
+                span.set(rows=mapped.row_count)
+        except (OSError, ValueError, UnicodeDecodeError):
+            self.finish_operation(self.load_operation)
+            self.show_message_box("Ошибка", "Загружен файл неверного формата.")
+            return
+
+        self.mapped_model = MappedTableModel(mapped)
+        self.tableView.setModel(self.mapped_model)
+        self.invalidate_point_cache()
+        self.finish_operation(self.load_operation)
+        self.show_message_box("Информация", "Файл большого размера открыт только для просмотра и расчетов.")
+
+    def close_mapped_view(self):
+        """ Возврат к редактируемой таблице и освобождение отображенного файла """
+        if self.mapped_model is None:
+            return
+        self.cancel_saving()
+        # Расчеты по столбцам отображенного файла завершаются до его закрытия.
+        self.cancel_point_worker()
+        self.point_pool.waitForDone()
+        self.tableView.setModel(self.table_model)
+        self.mapped_model.close()
+        self.mapped_model = None
+        self.invalidate_point_cache()
+
+    def show_progress(self, visible: bool):
+        """ Показ прогресса фоновой загрузки или сохранения вместе с кнопкой отмены """
+        self.LoadProgressBar.setValue(0)
+        self.LoadProgressBar.setVisible(visible)
+        self.CancelLoadButton.setVisible(visible)
+
+    def cancel_progress_logic(self):
+        """ Обработчик нажатия на кнопку "Отмена": отмена фоновой загрузки или сохранения """
+        if not self.cancel_loading():
+            self.cancel_saving()
+
+    def cancel_loading(self) -> bool:
+        """
+        Отмена текущей фоновой загрузки CSV.
+
+        :return: Если загрузка шла и была отменена - true, иначе - false.
+        """
+        if self.load_thread is None or not self.load_thread.isRunning():
+            return False
+
+        self.load_worker.cancel()
+        self.load_thread.quit()
+        self.load_thread.wait()
+        self.load_worker = None
+        self.load_thread = None
+        self.show_progress(False)
+        self.load_operation.set(cancelled=True)
+        self.finish_operation(self.load_operation)
+        return True
+
+    @QtCore.pyqtSlot(list)
+    def load_header_logic(self, headers: list):
+        """ Добавление названий колонок загружаемой таблицы """
+        if self.sender() is self.load_worker:
+            self.table_model.setHorizontalHeaderLabels(headers)
+
+    @QtCore.pyqtSlot(list)
+    def load_rows_logic(self, rows: list):
+        """ Добавление порции строк загружаемой таблицы """
+        if self.sender() is self.load_worker:
+            with tracer.span("model_append", rows=len(rows)):
+                self.load_appending = True
+                try:
+                    self.table_model.append_rows(rows)
+                finally:
+                    self.load_appending = False
+
+    @QtCore.pyqtSlot(int)
+    def load_progress_logic(self, percent: int):
+        """ Отображение прогресса загрузки """
+        if self.sender() is self.load_worker:
+            self.LoadProgressBar.setValue(percent)
+
+    @QtCore.pyqtSlot(bool)
+    def load_finished_logic(self, success: bool):
+        """
+        Завершение фоновой загрузки.
+
+        :param success: Файл прочитан без ошибок.
+        :return: None
+        """
+        if self.sender() is not self.load_worker:
+            return
+
+        self.show_progress(False)
+        self.load_thread.quit()
+        self.load_thread.wait()
+        encoding = self.load_worker.encoding
+        self.load_worker = None
+        self.load_thread = None
+        if not success:
+            self.finish_operation(self.load_operation)
+            self.show_message_box("Ошибка", "Загружен файл неверного формата.")
+            return
+
+        self.set_loaded_table_style()
+
+        # Файл-спутник пишется только для таблицы, совпадающей с исходным CSV.
+        if not self.table_edited:
+            with tracer.span("sidecar_save", rows=self.table_model.row_count):
+                save_sidecar(self.load_filename, encoding, self.table_model.headers, self.table_model.columns,
+                             self.load_source_key)
+        self.finish_operation(self.load_operation)
+
+    @QtCore.pyqtSlot()
+    def mark_table_edited(self):
+        """ Отметка об изменении таблицы пользователем (строки самой загрузки не в счет) """
+        if not self.load_appending:
+            self.table_edited = True
+
+    def set_loaded_table_style(self):
+        """ Стиль таблицы после загрузки данных """
+        self.tableView.setStyleSheet("border-radius: 20px;\n"
+                                     "background-color: rgba(255, 255, 255, 50);\n"
+                                     "font: 10pt \"Century Gothic\";")
+
     def delete_button_logic(self):
         """
         Обработчик нажатия на кнопку "Удалить".
@@ -536,15 +1263,27 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
                 exit_code = ErrorCodes.ERROR_TABLE_NOT_LOADED
                 raise ResearchAppErrors("Таблица не загружена, удаление строк невозможно.")
 
-            rows = self.tableView.selectionModel().selectedIndexes()
+            model = self.tableView.model()
+            if model is self.mapped_model:
+                self.show_message_box("Информация", "Файл открыт только для просмотра, удаление строк невозможно.")
+                exit_code = ErrorCodes.ERROR_TABLE_NOT_LOADED
+                raise ResearchAppErrors("Файл открыт только для просмотра, удаление строк невозможно.")
+
+            rows = {index.row() for index in self.tableView.selectionModel().selectedIndexes()}
 
             if not rows:
                 self.show_message_box("Информация", "Не выбрана строка для удаления.")
                 exit_code = ErrorCodes.ERROR_NO_LINE_SELECTED
                 raise ResearchAppErrors("Не выбрана строка для удаления.")
 
-            for row in rows:
-                self.win_manager.delete_rows.emit(row.row(), len(rows))
+            # Выделенные строки объединяются в непрерывные диапазоны и удаляются с конца.
+            ranges = row_ranges(rows)
+            if len(ranges) <= delete_ranges_limit:
+                for start, count in ranges:
+                    self.win_manager.delete_rows.emit(start, count)
+            else:
+                self.table_edited = True
+                model.remove_row_set(rows)
         except ResearchAppErrors:
             return exit_code
 
@@ -566,29 +1305,85 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
             filename, _ = QtWidgets.QFileDialog.getSaveFileName(self, dialog_name, self.filedialog_path,
                                                                 "All types of docs (*.csv)", options=options)
 
-            if filename:
-                if self.find_replace_comma():
-                    print('Произведена замена запятых при сохранении.')
-
-                with open(filename, 'w', newline='') as File:
-                    writer = csv.writer(File)
-                    headers = []
-                    for clm in range(self.tableView.model().columnCount()):
-                        headers.append(self.tableView.model().headerData(clm, QtCore.Qt.Orientation.Horizontal))
-
-                    # Запись заголовков.
-                    writer.writerow(headers)
-
-                    model = self.tableView.model()
-                    for row in range(model.rowCount()):
-                        row_data = []
-                        for column in range(model.columnCount()):
-                            index = model.index(row, column)
-                            row_data.append(model.data(index))
-                        writer.writerow(row_data)
+            if not filename:
+                return
+
+            model = self.tableView.model()
+            headers = self.getting_headers()
+            operation = tracer.operation("save", rows=model.rowCount())
+            # Запятые в ячейках заменяются только в записываемом файле, модель не изменяется.
+            if model is self.mapped_model:
+                if os.path.abspath(filename) == os.path.abspath(model.mapped.filename):
+                    self.finish_operation(operation)
+                    self.show_message_box("Ошибка", "Нельзя сохранить файл поверх открытого для просмотра.")
+                    exit_code = ErrorCodes.ERROR_INVALID_FILE_FORMAT
+                    raise ResearchAppErrors("Нельзя сохранить файл поверх открытого для просмотра.")
+                row_chunks = model.mapped.iter_rows(transform=replace_comma)
+            else:
+                # Снимок столбцов, чтобы правки во время записи не влияли на файл.
+                with tracer.span("snapshot", rows=model.rowCount()):
+                    columns = [column.copy() for column in model.columns]
+                row_chunks = iter_row_chunks(columns, model.rowCount(), transform=replace_comma)
+
+            self.cancel_saving()
+            self.save_operation = operation
+            self.save_thread = QtCore.QThread()
+            self.save_worker = CsvSaveWorker(filename, headers, row_chunks, model.rowCount())
+            self.save_worker.moveToThread(self.save_thread)
+            self.save_thread.started.connect(self.save_worker.run)
+            self.save_worker.progress.connect(self.save_progress_logic)
+            self.save_worker.finished.connect(self.save_finished_logic)
+
+            self.show_progress(True)
+            self.save_thread.start()
         except ResearchAppErrors:
             return exit_code
 
+    def cancel_saving(self) -> bool:
+        """
+        Отмена текущего фонового сохранения таблицы.
+
+        :return: Если сохранение шло и было отменено - true, иначе - false.
+        """
+        if self.save_thread is None or not self.save_thread.isRunning():
+            return False
+
+        self.save_worker.cancel()
+        self.save_thread.quit()
+        self.save_thread.wait()
+        self.save_worker = None
+        self.save_thread = None
+        self.show_progress(False)
+        self.save_operation.set(cancelled=True)
+        self.finish_operation(self.save_operation)
+        return True
+
+    @QtCore.pyqtSlot(int)
+    def save_progress_logic(self, percent: int):
+        """ Отображение прогресса сохранения """
+        if self.sender() is self.save_worker:
+            self.LoadProgressBar.setValue(percent)
+
+    @QtCore.pyqtSlot(bool)
+    def save_finished_logic(self, success: bool):
+        """
+        Завершение фонового сохранения.
+
+        :param success: Таблица записана полностью.
+        :return: None
+        """
+        if self.sender() is not self.save_worker:
+            return
+
+        self.show_progress(False)
+        self.save_thread.quit()
+        self.save_thread.wait()
+        self.save_worker = None
+        self.save_thread = None
+        self.finish_operation(self.save_operation)
+        if not success:
+            self.show_message_box("Ошибка", "Не удалось сохранить таблицу.")
+
     def calc_point_logic(self):
         """
         Обработчик нажатия на кнопку "Рассчитать трехточку".
@@ -596,28 +1391,20 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
         :return: None
         """
         exit_code = None
+        trace = tracer.operation("calc_point")
         try:
-            if not self.properties_indexes:
+            filter_text = self.propertylineEdit.text().strip()
+            if not self.properties_indexes and not filter_text:
                 self.point_flag = False
                 self.show_message_box("Информация", "Не выбрано свойство для расчета трехточки.")
                 exit_code = ErrorCodes.ERROR_NOT_PROPERTY
                 raise ResearchAppErrors("Не выбрано свойство для расчета трехточки.")
 
-            # Нужные строки, подходящие под свойства.
-            correct_rows = []
-            correct_wage = []
-
             # Получение заголовков.
             headers = self.getting_headers()
 
-            # Варианты названия колонки с ЗП.
-            wage_column_names = ["ЗП", "Заработная плата", "Зарплата"]
-
             # Получения номера колонки с ЗП.
-            wage_col = None
-            for name in wage_column_names:
-                if name in headers:
-                    wage_col = headers.index(name)
+            wage_col = self.getting_wage_column(headers)
 
             if wage_col is None:
                 self.point_flag = False
@@ -625,69 +1412,261 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
                 exit_code = ErrorCodes.ERROR_NOT_MONEY
                 raise ResearchAppErrors("Внимание! В таблице нет столбца ЗП(заработная плата).")
 
-            # Анализ столбца, указанного в свойстве.
-            prop_idx = list(self.properties_indexes.keys())[0]
-            prop_item = self.tableView.model().data(self.tableView.model().index(prop_idx[0], prop_idx[1]))
-            for row in range(self.tableView.model().rowCount()):
-                item = self.tableView.model().data(self.tableView.model().index(row, prop_idx[1]))
-                # Обработка числовых значений.
-                if str(item).isdigit():
-                    operation = list(self.properties_indexes.values())[0]
-                    if operation == ">=":
-                        if int(item) >= int(prop_item):
-                            correct_rows.append(row)
-                            wage = self.tableView.model().data(self.tableView.model().index(row, wage_col))
-                            if str(wage).isdigit():
-                                correct_wage.append(float(wage))
-                    elif operation == "<=":
-                        if int(item) <= int(prop_item):
-                            correct_rows.append(row)
-                            wage = self.tableView.model().data(self.tableView.model().index(row, wage_col))
-                            if str(wage).isdigit():
-                                correct_wage.append(float(wage))
-                    else:
-                        if int(item) == int(prop_item):
-                            correct_rows.append(row)
-                            wage = self.tableView.model().data(self.tableView.model().index(row, wage_col))
-                            if str(wage).isdigit():
-                                correct_wage.append(float(wage))
-                else:
-                    if item == prop_item:
-                        correct_rows.append(row)
-                        wage = self.tableView.model().data(self.tableView.model().index(row, wage_col))
-                        if str(wage).isdigit():
-                            correct_wage.append(float(wage))
-
-            # Вычисление трехточки.
-            correct_len = 3
-            if len(correct_rows) > correct_len and len(correct_wage) > correct_len:
-                semi = self.calculator.calc_semi(correct_wage)
-                three_points = self.calculator.calc_three_points(semi)
-
-                if isinstance(three_points, ErrorCodes):
+            # Результат берется из кэша, если таблица не менялась с прошлого расчета.
+            model = self.tableView.model()
+            if self.properties_indexes:
+                prop_idx = list(self.properties_indexes.keys())[0]
+                operation = list(self.properties_indexes.values())[0]
+                prop_item = model.data(model.index(prop_idx[0], prop_idx[1]))
+                key = (self.table_version, prop_idx[1], wage_col, operation, prop_item)
+                prop_col = prop_idx[1]
+                needed = [prop_col, wage_col]
+
+                def make_mask(columns):
+                    return column_mask(columns[prop_col], prop_item, operation)
+            else:
+                expression = self.filter_cache.get(filter_text)
+                if expression is None:
+                    expression = compile_filter(filter_text)
+                    self.filter_cache.put(filter_text, expression)
+
+                if isinstance(expression, ErrorCodes):
                     self.point_flag = False
-                    return
+                    self.output_style_in_qlineedit(self.ValuePointEdit, "Внимание! Ошибка в условии отбора.")
+                    exit_code = expression
+                    raise ResearchAppErrors("Ошибка в условии отбора.")
+
+                names = [str(header) for header in headers]
+                if not expression.names <= set(names):
+                    self.point_flag = False
+                    self.output_style_in_qlineedit(self.ValuePointEdit, "Внимание! В таблице нет столбца из условия.")
+                    exit_code = ErrorCodes.ERROR_NOT_PROPERTY
+                    raise ResearchAppErrors("В таблице нет столбца из условия отбора.")
+
+                key = (self.table_version, "filter", filter_text, wage_col)
+                needed = [names.index(name) for name in expression.names] + [wage_col]
+
+                def make_mask(columns):
+                    return expression.mask(lambda name: columns[names.index(name)])
+
+            # После правок таблицы трехточка того же отбора берется из обновленных моментов.
+            if not self.live_point.tracks(key[1:]) or model is not self.table_model:
+                self.live_point.clear()
+            result = self.point_cache.get(key) or self.live_point.result(key[1:])
+            trace.set(cached=result is not None)
+            if result is None:
+                # Расчет идет в пуле потоков по снимку столбцов, операция трассировки завершается с ним.
+                snapshot = model.column_snapshot(needed)
+
+                def sample(rows):
+                    return model.column_sample(snapshot, needed, rows)
+
+                # Для больших таблиц сначала выводится предварительная трехточка по выборке строк.
+                preview = point_preview_rows and model.rowCount() >= point_preview_min_rows
+                self.start_point_worker(key, snapshot, wage_col, make_mask, trace, sample if preview else None)
+                trace = NULL_SPAN
+                return
 
-                avg_minimal = "[" + str(three_points[0][0]) + \
-                              ", " + str(three_points[0][1]) + "]"
-                avg_middle = "[" + str(three_points[1][0]) + \
-                             ", " + str(three_points[1][1]) + "]"
-                avg_maximal = "[" + str(three_points[2][0]) + \
-                              ", " + str(three_points[2][1]) + "]"
+            self.track_live_point(key, make_mask, needed, wage_col, result)
+            self.show_point_result(result)
+        except ResearchAppErrors:
+            self.live_point.clear()
+            return exit_code
+        finally:
+            self.finish_operation(trace)
 
-                self.pnt_dict = {"Min": avg_minimal,
-                                  "Avg": avg_middle,
-                                  "Max": avg_maximal}
+    def group_point_logic(self):
+        """
+        Расчет трехточек для всех значений выбранного столбца за один проход по таблице.
 
-                # Вывод информации в поля.
-                self.output_style_in_qlineedit(self.ValuePointEdit, self.threepoint_formatting_for_output(three_points))
-                self.point_flag = True
-            else:
-                self.output_style_in_qlineedit(self.ValuePointEdit, "Внимание! Расчёт не возможен.")
-                self.point_flag = False
+        :return: None
+        """
+        exit_code = None
+        try:
+            model = self.tableView.model()
+            if not model.columnCount() > 0:
+                self.show_message_box("Информация", "Таблица не загружена, расчет невозможен.")
+                exit_code = ErrorCodes.ERROR_TABLE_NOT_LOADED
+                raise ResearchAppErrors("Таблица не загружена, расчет невозможен.")
+
+            headers = self.getting_headers()
+            wage_col = self.getting_wage_column(headers)
+            if wage_col is None:
+                self.show_message_box("Информация", "В таблице нет столбца \"Заработная плата\" - расчет невозможен.")
+                exit_code = ErrorCodes.ERROR_NOT_MONEY
+                raise ResearchAppErrors("В таблице нет столбца ЗП(заработная плата).")
+
+            indexes = self.tableView.selectionModel().selectedIndexes()
+            current = indexes[-1].column() if indexes else 0
+            items = [str(header) for header in headers]
+            column_name, ok = QtWidgets.QInputDialog.getItem(self, "Группировка", "Столбец:", items, current, False)
+            if not ok:
+                return
+
+            groups = group_three_points(model.columns[items.index(column_name)], model.columns[wage_col],
+                                        engine=self.process_engine(model.rowCount()))
+            if not groups:
+                self.show_message_box("Информация", "Нет значений столбца, для которых возможен расчет.")
+                exit_code = ErrorCodes.ERROR_EMPTY_PROPERTY
+                raise ResearchAppErrors("Нет значений столбца, для которых возможен расчет.")
+
+            dialog = GroupPointsDialog(self, column_name, groups, self.filedialog_path)
+            dialog.exec()
         except ResearchAppErrors:
             return exit_code
 
+    def start_point_worker(self, key: tuple, columns, wage_col: int, make_mask, operation, sample=None):
+        """
+        Запуск фонового расчета трехточки (текущий расчет отменяется).
+
+        :param key: Ключ результата в кэше расчетов.
+        :param columns: Снимок нужных столбцов таблицы (доступ по номеру столбца).
+        :param wage_col: Номер столбца ЗП.
+        :param make_mask: Функция, строящая по столбцам булев массив подходящих строк.
+        :param operation: Операция трассировки расчета.
+        :param sample: Функция, возвращающая нужные столбцы для выбранных строк (для предварительной трехточки).
+        :return: None
+        """
+        self.cancel_point_worker()
+        row_count = self.tableView.model().rowCount()
+        self.point_worker = PointCalcWorker(key, columns, wage_col, make_mask, self.process_engine(row_count),
+                                            sample, row_count)
+        self.point_worker.preview.connect(self.point_preview_logic)
+        self.point_worker.progress.connect(self.point_progress_logic)
+        self.point_worker.finished.connect(self.point_finished_logic)
+        self.point_operation = operation
+        self.point_flag = False
+        self.output_style_in_qlineedit(self.ValuePointEdit, "Расчет...")
+        self.point_pool.start(self.point_worker.run)
+
+    def cancel_point_worker(self) -> bool:
+        """
+        Отмена текущего фонового расчета трехточки (результат отмененного расчета не выводится).
+
+        :return: Если расчет шел и был отменен - true, иначе - false.
+        """
+        if self.point_worker is None:
+            return False
+
+        self.point_worker.cancel()
+        self.point_worker = None
+        self.point_preview = None
+        self.point_operation.set(cancelled=True)
+        self.finish_operation(self.point_operation)
+        self.point_operation = NULL_SPAN
+        self.ValuePointEdit.clear()
+        return True
+
+    @QtCore.pyqtSlot(object)
+    def point_preview_logic(self, preview: tuple):
+        """
+        Вывод предварительной трехточки по выборке строк до окончания точного расчета.
+
+        :param preview: (семиинварианты, трехточка, погрешности, размер выборки).
+        :return: None
+        """
+        if self.sender() is not self.point_worker:
+            return
+
+        _, three_points, errors, sample_size = preview
+        self.point_preview = "≈ " + self.threepoint_formatting_for_output(three_points, errors) + \
+                             "\t(выборка %d строк)" % sample_size
+        self.output_style_in_qlineedit(self.ValuePointEdit, self.point_preview)
+
+    @QtCore.pyqtSlot(int)
+    def point_progress_logic(self, percent: int):
+        """ Отображение прогресса расчета трехточки (после предварительной трехточки - прогресса уточнения) """
+        if self.sender() is not self.point_worker:
+            return
+        if self.point_preview is None:
+            self.output_style_in_qlineedit(self.ValuePointEdit, "Расчет... %d%%" % percent)
+        else:
+            self.output_style_in_qlineedit(self.ValuePointEdit, self.point_preview + "\tуточнение %d%%" % percent)
+
+    @QtCore.pyqtSlot(object)
+    def point_finished_logic(self, result):
+        """
+        Вывод результата фонового расчета трехточки.
+
+        :param result: Результат PointCalcWorker.
+        :return: None
+        """
+        if self.sender() is not self.point_worker:
+            return
+
+        worker = self.point_worker
+        key = worker.key
+        self.point_worker = None
+        self.point_preview = None
+        if isinstance(result, ErrorCodes):
+            # Ошибки не кэшируются: повторное нажатие запускает расчет заново.
+            self.point_flag = False
+            self.output_style_in_qlineedit(self.ValuePointEdit, point_error_messages.get(
+                result, "Внимание! Ошибка расчета трехточки."))
+        elif result is not None:
+            if key[0] == self.table_version:
+                self.point_cache.put(key, result)
+                # Моменты отслеживаются только для редактируемой таблицы (снимок ее столбцов - словарь).
+                if self.tableView.model() is self.table_model:
+                    self.track_live_point(key, worker.make_mask, list(worker.columns), worker.wage_col, result)
+            self.show_point_result(result)
+        self.finish_operation(self.point_operation)
+        self.point_operation = NULL_SPAN
+
+    def show_point_result(self, result: tuple):
+        """
+        Вывод рассчитанной трехточки в поле и подготовка ее к сохранению.
+
+        :param result: (семиинварианты, трехточка или ErrorCodes).
+        :return: None
+        """
+        semi, three_points = result
+        if semi is None:
+            self.output_style_in_qlineedit(self.ValuePointEdit, "Внимание! Расчёт не возможен.")
+            self.point_flag = False
+            return
+
+        if isinstance(three_points, ErrorCodes):
+            self.point_flag = False
+            return
+
+        self.pnt_dict = make_pnt_dict(three_points, semi, self.propertylineEdit.text())
+
+        # Вывод информации в поля.
+        self.output_style_in_qlineedit(self.ValuePointEdit, self.threepoint_formatting_for_output(three_points))
+        self.point_flag = True
+
+    def track_live_point(self, key: tuple, make_mask, needed: list, wage_col: int, result: tuple):
+        """
+        Отслеживание моментов рассчитанного отбора для пересчета трехточки при правках таблицы.
+
+        :param key: Ключ расчета (рассчитан по текущей версии таблицы).
+        :param make_mask: Функция, строящая по столбцам булев массив подходящих строк.
+        :param needed: Номера столбцов, нужных для отбора и расчета.
+        :param wage_col: Номер столбца ЗП.
+        :param result: (семиинварианты, трехточка или ErrorCodes).
+        :return: None
+        """
+        semi = result[0]
+        if semi is None or self.tableView.model() is not self.table_model:
+            self.live_point.clear()
+            return
+        if not self.live_point.tracks(key[1:]):
+            self.live_point.track(LiveMoments(key[1:], make_mask, needed, wage_col, MomentAccumulator.from_semi(semi)))
+
+    @QtCore.pyqtSlot()
+    def live_point_changed(self):
+        """ Вывод трехточки отслеживаемого отбора после изменения таблицы (без повторного прохода по ней) """
+        if self.point_worker is None:
+            self.show_point_result(self.live_point.moments.result())
+
+    @QtCore.pyqtSlot()
+    def invalidate_point_cache(self):
+        """ Сброс кэша расчетов при любом изменении таблицы (расчет по прежней таблице отменяется) """
+        self.table_version += 1
+        self.point_cache.clear()
+        self.cancel_point_worker()
+
     def close_logic(self):
         """
         Обработчик нажатия на кнопку "Закрыть".
@@ -726,16 +1705,6 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
         except ResearchAppErrors:
             return exit_code
 
-    def _parse_pnt_values(self, value: str) -> list | ErrorCodes:
-        """ Перевести строку со списком в список чисел """
-        try:
-            left = float(re.sub(r"\[([\d.].*), ([\d.].*)\]", r"\1", value))
-            right = float(re.sub(r"\[([\d.].*), ([\d.].*)\]", r"\2", value))
-            return [left, right]
-        except ValueError:
-            exit_code = ErrorCodes.ERROR_NOT_NUMERIC
-            return exit_code
-
     def calc_join_point_logic(self):
         """
             Обработчик нажатия на кнопку "Рассчитать объединение трехточек".
@@ -743,7 +1712,7 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
             :return: None
         """
         exit_code = None
-        self.pnt_list.clear()
+        trace = NULL_SPAN
         try:
             dialog_name = "Загрузка данных"
             options = QtWidgets.QFileDialog.Options()
@@ -756,49 +1725,32 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
                 exit_code = ErrorCodes.ERROR_FILE_NOT_LOADED
                 raise ResearchAppErrors("Файл не загружен.")
 
-            for filename in filenames:
-                _, file_extension = os.path.splitext(filename)
-
-                if file_extension != '.pnt':
-                    self.join_point_flag = False
-                    self.output_style_in_qlineedit(self.ValueJoinPointEdit, "Загружен файл неверного формата.")
-                    exit_code = ErrorCodes.ERROR_INVALID_FILE_FORMAT
-                    raise ResearchAppErrors("Загружен файл неверного формата.")
-
-                if os.stat(filename).st_size == 0:
-                    self.join_point_flag = False
-                    self.output_style_in_qlineedit(self.ValueJoinPointEdit, "Загружен пустой файл - работа с ним невозможна.")
-                    exit_code = ErrorCodes.ERROR_EMPTY_FILE
-                    raise ResearchAppErrors("Загружен пустой файл - работа с ним невозможна.")
-
-                with open(filename, newline='') as File:
-                    try:
-                        json_data = json.load(File)
-                    except Exception:
-                        self.join_point_flag = False
-                        exit_code = ErrorCodes.ERROR_INVALID_FILE_FORMAT
-                        return exit_code
-
-                for k in pnt_keys:
-                    if k not in json_data:
-                        self.join_point_flag = False
-                        self.output_style_in_qlineedit(self.ValueJoinPointEdit, "Отсутствует ожидаемый ключ в загруженном файле.")
-                        exit_code = ErrorCodes.ERROR_POINT_NOT_LOADED
-                        raise ResearchAppErrors("Отсутствует ожидаемый ключ в загруженном файле.")
-
-                    parsed_values = self._parse_pnt_values(json_data[k])
-                    if isinstance(parsed_values, ErrorCodes):
-                        self.join_point_flag = False
-                        self.output_style_in_qlineedit(self.ValueJoinPointEdit,
-                                                       "Ошибка в формате данных загруженной трёхточки.")
-                        exit_code = ErrorCodes.ERROR_NOT_NUMERIC
-                        raise ResearchAppErrors("Ошибка в формате данных загруженной трёхточки.")
-
-                    self.pnt_list.append(parsed_values)
-
-            if self.pnt_list:
-                semi = self.calculator.calc_semi(self.pnt_list)
-                point = self.calculator.calc_three_points(semi)
+            # Читаются только новые и измененные файлы, исключенные из выбора вычитаются из объединения.
+            messages = {
+                ErrorCodes.ERROR_INVALID_FILE_FORMAT: "Загружен файл неверного формата.",
+                ErrorCodes.ERROR_EMPTY_FILE: "Загружен пустой файл - работа с ним невозможна.",
+                ErrorCodes.ERROR_FILE_NOT_LOADED: "Файл не загружен.",
+                ErrorCodes.ERROR_POINT_NOT_LOADED: "Отсутствует ожидаемый ключ в загруженном файле.",
+                ErrorCodes.ERROR_NOT_NUMERIC: "Ошибка в формате данных загруженной трёхточки.",
+            }
+            trace = tracer.operation("join", files=len(filenames))
+            if self.join_state is None:
+                with tracer.span("join_state_load"):
+                    self.join_state = JoinState.load(self.join_state_path)
+            synced = self.join_state.sync(filenames, self.point_files)
+            if isinstance(synced, ErrorCodes):
+                self.join_point_flag = False
+                self.output_style_in_qlineedit(self.ValueJoinPointEdit, messages[synced])
+                exit_code = synced
+                raise ResearchAppErrors(messages[synced])
+            if synced != (0, 0):
+                with tracer.span("join_state_save", files=len(self.join_state)):
+                    self.save_join_state()
+
+            if self.join_state.total.count > 0:
+                semi = self.join_state.semi()
+                with tracer.span("calc_three_points"):
+                    point = self.calculator.calc_three_points(semi)
 
                 if isinstance(point, ErrorCodes):
                     return
@@ -809,6 +1761,21 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
                 self.join_point_flag = False
         except ResearchAppErrors:
             return exit_code
+        finally:
+            self.finish_operation(trace)
+
+    def save_join_state(self):
+        """
+        Сохранение состояния объединения для следующих запусков.
+
+        :return: None
+        """
+        try:
+            os.makedirs(os.path.dirname(self.join_state_path), exist_ok=True)
+            self.join_state.save(self.join_state_path)
+        except OSError:
+            # Без сохраненного состояния следующее объединение просто прочитает файлы заново.
+            pass
 
     def save_result_logic(self):
         """
@@ -841,4 +1808,16 @@ class ResearchApp(QtWidgets.QMainWindow, main_app.Ui_MainWindow):
 
     def keyPressEvent(self, event):
         if event.key() == QtCore.Qt.Key.Key_Escape:
-            self.close()
+            # Escape во время загрузки или сохранения отменяет их, иначе - закрывает окно.
+            if not self.cancel_loading() and not self.cancel_saving():
+                self.close()
+
+    def closeEvent(self, event):
+        self.cancel_loading()
+        self.cancel_saving()
+        self.cancel_point_worker()
+        self.close_mapped_view()
+        self.point_pool.waitForDone()
+        if self._process_engine is not None:
+            self._process_engine.close()
+        event.accept()
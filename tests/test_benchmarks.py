@@ -0,0 +1,33 @@
+import sys
+
+sys.path.insert(1, '../src/')
+
+from benchmarks.bench_research import generate_table, run_size, compare_results
+
+
+def test_generate_table_seeded(tmp_path):
+    """ Проверка повторяемости синтетической таблицы """
+    print('\n\n** Проверка повторяемости синтетической таблицы. **\n')
+    first, second, other = tmp_path / 'first.csv', tmp_path / 'second.csv', tmp_path / 'other.csv'
+    generate_table(str(first), 500, seed=7)
+    generate_table(str(second), 500, seed=7)
+    generate_table(str(other), 500, seed=8)
+
+    assert first.read_bytes() == second.read_bytes()
+    assert first.read_bytes() != other.read_bytes()
+    lines = first.read_text(encoding='utf-8').splitlines()
+    assert lines[0] == 'ФИО,Возраст,Город,Образование,Должность,Стаж,ЗП'
+    assert len(lines) == 501 and all(len(line.split(',')) == 7 for line in lines)
+
+
+def test_run_size_and_compare(tmp_path):
+    """ Проверка замеров и сравнения с эталоном """
+    print('\n\n** Проверка замеров и сравнения с эталоном. **\n')
+    results = run_size(1000, seed=7, repeats=1, data_dir=str(tmp_path))
+    names = {item['name'] for item in results}
+    assert {'csv_load', 'calc_semi', 'calc_three_points', 'filter_property', 'csv_save', 'pnt_join'} <= names
+
+    slower = [dict(item, seconds=item['seconds'] * 2 + 0.01) for item in results]
+    assert compare_results(results, results) == []
+    assert len(compare_results(slower, results)) == len(results)
+    assert compare_results(results, slower) == []
@@ -6,7 +6,7 @@ import numpy as np
 
 sys.path.insert(1, '../src/')
 
-from src.window_logic import ResearchCalc, ErrorCodes
+from src.research_calc import ResearchCalc, ErrorCodes, MomentAccumulator, LRUCache
 
 
 @pytest.fixture()
@@ -222,3 +222,175 @@ def test_calc_three_points_probability_fault_tolerance(calculator):
 
 
 
+
+
+def test_calc_semi_numpy_array_performance(calculator):
+    """ Проверка на работоспособность при работе с массивами numpy """
+    print('\n\n** Проверка работоспособности функции calc_semi при работе с массивами numpy. **\n')
+    list_data = [36, 30, 26, 39, 49, 43, 53, 53, 56, 50, 25, 48]
+    analytic_data = calculator.calc_semi(list_data)
+    print('Результат для списка: ' + str(analytic_data))
+    input_data = calculator.calc_semi(np.array(list_data, dtype=np.float64))
+    print('Результат для массива numpy: ' + str(input_data))
+
+    assert np.allclose(analytic_data, input_data)
+
+
+def test_calc_semi_histogram_pair_performance(calculator):
+    """ Проверка на работоспособность при работе с гистограммами в виде пары массивов """
+    print('\n\n** Проверка работоспособности функции calc_semi при работе с парой (значения, количества). **\n')
+    analytic_data = [4.04, 0.43840000000000146, -0.012672000000037542, -0.1387673600004291, 25]
+    pair_data = calculator.calc_semi((np.array([2., 3., 4., 5.]), np.array([0, 5, 14, 6])))
+    print('Результат для пары массивов: ' + str(pair_data))
+    matrix_data = calculator.calc_semi(np.array([[2, 0], [3, 5], [4, 14], [5, 6]]))
+    print('Результат для массива (N, 2): ' + str(matrix_data))
+
+    assert np.allclose(analytic_data, pair_data)
+    assert np.allclose(analytic_data, matrix_data)
+    assert pair_data[4] == 25
+
+
+def test_calc_semi_histogram_tuple(calculator):
+    """ Проверка на работоспособность при работе с гистограммой, заданной кортежем из двух пар """
+    print('\n\n** Проверка работоспособности функции calc_semi при работе с гистограммой ([1, 5], [2, 3]). **\n')
+    print('Ожидаемый результат: как для гистограммы [[1, 5], [2, 3]] (число 1 - 5 раз, число 2 - 3 раза).')
+    input_data = calculator.calc_semi(([1, 5], [2, 3]))
+    print('Результат работы функции: ' + str(input_data))
+
+    assert np.allclose(input_data, calculator.calc_semi([[1, 5], [2, 3]]))
+    assert np.allclose(input_data, calculator.calc_semi([1] * 5 + [2] * 3))
+    assert input_data[4] == 8
+
+
+def test_calc_semi_empty_fault_tolerance(calculator):
+    """ Проверка на отказоустойчивость при работе с пустым массивом """
+    print('\n\n** Проверка на отказоустойчивость при работе с пустым массивом. **\n')
+    print('Ожидаемый результат: ErrorCodes.ERROR_ELEMENT_COUNT.')
+    input_data = calculator.calc_semi(np.array([], dtype=np.float64))
+    print('Результат работы функции: ' + str(input_data))
+
+    assert input_data == ErrorCodes.ERROR_ELEMENT_COUNT
+
+
+def test_moment_accumulator_merge_performance(calculator):
+    """ Проверка на работоспособность объединения накопителей моментов """
+    print('\n\n** Проверка работоспособности объединения накопителей моментов. **\n')
+    list_data = [36, 30, 26, 39, 49, 43, 53, 53, 56, 50, 25, 48]
+    analytic_data = [42.33333333333333, 110.05555555555588, -485.25925925929914, -15207.879629630595, 12]
+
+    first = MomentAccumulator().update_batch(list_data[:5])
+    second = MomentAccumulator()
+    for item in list_data[5:9]:
+        second.update(item)
+    third = MomentAccumulator().update_batch([53, 56, 50, 25, 48], [0, 0, 1, 1, 1])
+    input_data = first.merge(second).merge(third).semi()
+    print('Результат работы накопителя: ' + str(input_data))
+
+    assert np.allclose(analytic_data, input_data)
+    assert input_data[4] == 12
+    assert np.allclose(calculator.calc_three_points(input_data), calculator.calc_three_points(analytic_data))
+
+
+def test_moment_accumulator_remove_performance(calculator):
+    """ Проверка на работоспособность исключения части данных из накопителя моментов """
+    print('\n\n** Проверка работоспособности исключения части данных из накопителя моментов. **\n')
+    list_data = [36, 30, 26, 39, 49, 43, 53, 53, 56, 50, 25, 48]
+
+    total = MomentAccumulator().update_batch(list_data)
+    part = MomentAccumulator().update_batch(list_data[3:8])
+    input_data = total.remove(part).semi()
+    print('Результат работы накопителя: ' + str(input_data))
+
+    assert np.allclose(calculator.calc_semi(list_data[:3] + list_data[8:]), input_data)
+    assert total.remove(MomentAccumulator().update_batch(list_data[:3] + list_data[8:])).count == 0
+    assert total.semi() == ErrorCodes.ERROR_ELEMENT_COUNT
+
+
+def test_moment_accumulator_from_semi_performance(calculator):
+    """ Проверка на работоспособность восстановления накопителя моментов по семиинвариантам """
+    print('\n\n** Проверка работоспособности восстановления накопителя моментов по семиинвариантам. **\n')
+    list_data = [36, 30, 26, 39, 49, 43, 53, 53, 56, 50, 25, 48]
+
+    accumulator = MomentAccumulator.from_semi(calculator.calc_semi(list_data[:6]))
+    input_data = accumulator.merge(MomentAccumulator().update_batch(list_data[6:])).semi()
+    print('Результат работы накопителя: ' + str(input_data))
+
+    assert accumulator.count == 6 + 6
+    assert np.allclose(calculator.calc_semi(list_data), input_data)
+
+
+def test_moment_accumulator_big_tolerance():
+    """ Проверка точности накопителя моментов на больших числах """
+    print('\n\n** Проверка точности накопителя моментов на больших числах. **\n')
+    list_data = [36212349, 30512348, 28612348, 38912348, 47912347, 8912348]
+    analytic_data = [95537044/3, 1297969964900003/9, -33813496227444724150000/27, -126756460437225535280000000000/27, 6]
+    accumulator = MomentAccumulator()
+    for item in list_data:
+        accumulator.update(item)
+    input_data = accumulator.semi()
+    print('Результат работы накопителя: ' + ", ".join("%.0f" % f for f in input_data))
+
+    assert np.allclose(analytic_data, input_data, rtol=1e-12, atol=0)
+
+
+def test_calc_three_points_batch_performance(calculator):
+    """ Проверка на работоспособность пакетного расчета трехточек """
+    print('\n\n** Проверка работоспособности пакетного расчета трехточек. **\n')
+    semi_list = [[4.04, 0.43840000000000146, -0.012672000000037542, -0.1387673600004291, 25],
+                 [4.04, 0, -0.012672000000037542, 25, 35],
+                 [0, 0.01, 1, 0, 35],
+                 [0, 1, 0, -3, 35],
+                 [0, 1, 1, -2, 35],
+                 [0, 0.01, 0, 0, 35],
+                 [42.33333333333333, 110.05555555555588, -485.25925925929914, -15207.879629630595, 12]]
+    points, statuses = calculator.calc_three_points_batch(np.array(semi_list))
+    print('Статусы строк: ' + str(list(statuses)))
+
+    assert points.shape == (len(semi_list), 3, 2)
+    for i, semi in enumerate(semi_list):
+        single = calculator.calc_three_points(semi)
+        if isinstance(single, ErrorCodes):
+            assert statuses[i] == single
+            assert np.isnan(points[i]).all()
+        else:
+            assert statuses[i] is None
+            assert np.allclose(single, points[i])
+
+
+def test_calc_three_points_batch_fault_tolerance(calculator):
+    """ Проверка на отказоустойчивость пакетного расчета трехточек """
+    print('\n\n** Проверка на отказоустойчивость пакетного расчета трехточек. **\n')
+    print('Ожидаемый результат: ErrorCodes.ERROR_ELEMENT_COUNT.')
+    input_data = calculator.calc_three_points_batch(np.zeros((3, 6)))
+    print('Результат работы функции: ' + str(input_data))
+
+    assert input_data == ErrorCodes.ERROR_ELEMENT_COUNT
+
+
+def test_calc_semi_grouped_performance(calculator):
+    """ Проверка на работоспособность группового расчета семиинвариантов """
+    print('\n\n** Проверка работоспособности группового расчета семиинвариантов. **\n')
+    list_data = [36, 30, 26, 39, 49, 43, 53, 53, 56, 50, 25, 48]
+    group_ids = [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 3]
+    input_data = calculator.calc_semi_grouped(group_ids, list_data)
+    print('Результат работы функции: ' + str(input_data))
+
+    assert input_data.shape == (4, 5)
+    assert np.allclose(input_data[0], calculator.calc_semi(list_data[0:11:2]))
+    assert np.allclose(input_data[1], calculator.calc_semi(list_data[1:10:2]))
+    assert input_data[2, 4] == 0
+    assert input_data[3, 4] == 1
+
+
+def test_lru_cache_eviction():
+    """ Проверка вытеснения записей из кэша результатов """
+    print('\n\n** Проверка вытеснения записей из кэша результатов. **\n')
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert len(cache) == 2
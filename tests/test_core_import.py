@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+sys.path.insert(1, '../src/')
+
+from lazy_import import LazyModule
+
+
+def test_core_import_without_qt_and_numpy():
+    """ Проверка импорта расчетных модулей без Qt и NumPy """
+    print('\n\n** Проверка импорта расчетных модулей без Qt и NumPy. **\n')
+    code = ("import sys\n"
+            "import research_calc, table_columns, filter_expr, point_files, join_state, mapped_csv, sidecar, "
+            "research_cli\n"
+            "print(sorted(name for name in ('PyQt5', 'numpy', 'main_app') if name in sys.modules))\n"
+            "research_calc.ResearchCalc.calc_semi([1, 2, 3, 4])\n"
+            "print('numpy' in sys.modules)\n")
+    output = subprocess.run([sys.executable, '-c', code], cwd=SRC, capture_output=True, text=True, check=True).stdout
+    assert output.split() == ['[]', 'True']
+
+
+def test_lazy_module():
+    """ Проверка отложенного импорта модуля """
+    print('\n\n** Проверка отложенного импорта модуля. **\n')
+    module = LazyModule('json')
+    assert module._module is None
+    assert module.dumps([1]) == '[1]'
+    assert 'dumps' in vars(module) and module._module is not None
@@ -0,0 +1,57 @@
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../src/')
+
+from filter_expr import compile_filter, tokenize
+from research_calc import ErrorCodes
+from table_columns import make_column
+
+
+COLUMNS = {
+    'Отдел': make_column(['ИТ', 'ИТ', 'Бухгалтерия', 'ИТ', 'Склад', '']),
+    'Возраст': make_column(['25', '31', '45', '30', '52', '38']),
+    'Стаж': make_column(['2', '5', '20', '7', '1,5', '3']),
+    'Город проживания': make_column(['Москва', 'Томск', 'Москва', 'Северск', 'Томск', 'Москва']),
+}
+
+
+def rows(text: str) -> list:
+    expression = compile_filter(text)
+    assert not isinstance(expression, ErrorCodes)
+    return np.flatnonzero(expression.mask(COLUMNS.get)).tolist()
+
+
+def test_tokenize():
+    """ Проверка разбиения условия на лексемы """
+    print('\n\n** Проверка разбиения условия на лексемы. **\n')
+    assert tokenize("\"Город проживания\" != 'Нью Йорк' and not(x<=1.5)") == [
+        ('quoted', 'Город проживания'), ('op', '!='), ('quoted', 'Нью Йорк'), ('kw', 'AND'), ('kw', 'NOT'),
+        ('lpar', '('), ('word', 'x'), ('op', '<='), ('word', '1.5'), ('rpar', ')')]
+
+
+def test_filter_comparisons():
+    """ Проверка отбора строк составным условием """
+    print('\n\n** Проверка отбора строк составным условием. **\n')
+    assert rows("Отдел = ИТ AND Возраст >= 30 AND Стаж <= 5") == [1]
+    assert rows("Отдел = ИТ OR Возраст >= 50") == [0, 1, 3, 4]
+    assert rows("Отдел != ИТ") == [2, 4, 5]
+    assert rows("NOT (Отдел = ИТ OR Отдел = Склад) AND Стаж <= 3") == [5]
+    assert rows("\"Город проживания\" IN (Томск, Северск)") == [1, 3, 4]
+    assert rows("\"Город проживания\" not in (Москва) and Стаж <= 1.5") == [4]
+    assert rows("Отдел = ''") == [5]
+
+
+def test_filter_errors():
+    """ Проверка ошибок в условии """
+    print('\n\n** Проверка ошибок в условии. **\n')
+    assert compile_filter("Отдел = ") == ErrorCodes.ERROR_FILTER_SYNTAX
+    assert compile_filter("Отдел = ИТ AND") == ErrorCodes.ERROR_FILTER_SYNTAX
+    assert compile_filter("(Отдел = ИТ") == ErrorCodes.ERROR_FILTER_SYNTAX
+    assert compile_filter("Отдел >= ИТ") == ErrorCodes.ERROR_FILTER_SYNTAX
+    assert compile_filter("Отдел IN ()") == ErrorCodes.ERROR_FILTER_SYNTAX
+
+    expression = compile_filter("Должность = Инженер OR Отдел = ИТ")
+    assert expression.names == {'Должность', 'Отдел'}
+    assert expression.mask(COLUMNS.get) == ErrorCodes.ERROR_NOT_PROPERTY
@@ -0,0 +1,77 @@
+import json
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../src/')
+
+import point_files
+from join_state import JoinState
+from point_files import PointFileCache, make_pnt_dict, write_bundle, read_point_file
+from research_calc import ErrorCodes, ResearchCalc
+
+
+def write_point(path, x: float) -> str:
+    path.write_text(json.dumps(make_pnt_dict([[x, 0.3], [x * 2, 0.5], [x * 3, 0.2]])))
+    return str(path)
+
+
+def join_semi(filenames: list) -> list:
+    """ Объединение заново по всем файлам, как до появления накопленного состояния """
+    pairs = [pair for filename in filenames for record in read_point_file(filename)
+             for pair in record.points]
+    return ResearchCalc.calc_semi(pairs)
+
+
+def test_join_state_incremental(tmp_path, monkeypatch):
+    """ Проверка пересчета объединения только по изменившимся файлам """
+    print('\n\n** Проверка пересчета объединения только по изменившимся файлам. **\n')
+    filenames = [write_point(tmp_path / ('branch%d.pnt' % i), 20000 + 500 * i) for i in range(10)]
+    read = []
+    def counting_read(filename):
+        read.append(filename)
+        return read_point_file(filename)
+    monkeypatch.setattr(point_files, 'read_point_file', counting_read)
+
+    state = JoinState()
+    cache = PointFileCache(workers=4)
+    assert state.sync(filenames, cache) == (10, 0)
+    assert np.allclose(state.semi(), join_semi(filenames))
+
+    read.clear()
+    bundle = str(tmp_path / 'groups.pnt')
+    write_bundle(bundle, [make_pnt_dict([[x, 0.25], [x * 2, 0.5], [x * 4, 0.25]], name=str(x)) for x in (1e4, 3e4)])
+    assert state.sync(filenames[2:] + [bundle], cache) == (1, 2)
+    assert read == [bundle]
+    assert np.allclose(state.semi(), join_semi(filenames[2:] + [bundle]), rtol=1e-9)
+
+    state_file = str(tmp_path / 'join_state.json')
+    state.save(state_file)
+    restored = JoinState.load(state_file)
+    assert len(restored) == 9
+    assert restored.sync(filenames[2:] + [bundle], cache) == (0, 0)
+    assert np.allclose(restored.semi(), state.semi())
+
+    assert restored.sync([], cache) == (0, 9)
+    assert restored.semi() == ErrorCodes.ERROR_ELEMENT_COUNT
+
+
+def test_join_state_errors(tmp_path):
+    """ Проверка неизменности объединения при ошибке в файле """
+    print('\n\n** Проверка неизменности объединения при ошибке в файле. **\n')
+    good = write_point(tmp_path / 'good.pnt', 30000)
+    bad = tmp_path / 'bad.pnt'
+    bad.write_text('{"Min": "[153,135, 0.29]", "Avg": "[1, 0.5]", "Max": "[2, 0.2]"}')
+
+    state = JoinState()
+    cache = PointFileCache()
+    state.sync([good], cache)
+    semi = state.semi()
+    assert state.sync([good, str(bad)], cache) == ErrorCodes.ERROR_NOT_NUMERIC
+    assert state.sync([good, str(tmp_path / 'missing.pnt')], cache) == ErrorCodes.ERROR_FILE_NOT_LOADED
+    assert len(state) == 1 and state.semi() == semi
+
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{"version": 1, "files": ')
+    assert len(JoinState.load(str(broken))) == 0
+    assert len(JoinState.load(str(tmp_path / 'missing.json'))) == 0
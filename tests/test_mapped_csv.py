@@ -0,0 +1,83 @@
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(1, '../src/')
+
+from mapped_csv import MappedCsv, MappedColumns
+from table_columns import column_mask, column_numbers
+
+
+def write_csv(tmp_path, text: str) -> str:
+    filename = tmp_path / 'data.csv'
+    filename.write_bytes(text.encode('utf-8'))
+    return str(filename)
+
+
+def test_mapped_csv_rows(tmp_path):
+    """ Проверка индекса строк с переводами строк внутри кавычек """
+    print('\n\n** Проверка индекса строк отображенного в память файла. **\n')
+    filename = write_csv(tmp_path, 'Город,Возраст,ЗП\r\n"Москва,\nцентр",35,48511\r\nСеверск,58,17564')
+    mapped = MappedCsv(filename, 'utf-8', scan_chunk=5)
+
+    assert mapped.headers == ['Город', 'Возраст', 'ЗП']
+    assert mapped.row_count == 2
+    assert mapped.row(0) == ['Москва,\nцентр', '35', '48511']
+    assert mapped.row(1) == ['Северск', '58', '17564']
+    mapped.close()
+
+
+def test_mapped_csv_columns(tmp_path):
+    """ Проверка расчетов по столбцам отображенного в память файла """
+    print('\n\n** Проверка расчетов по столбцам отображенного в память файла. **\n')
+    rows = ['Город,Возраст,ЗП'] + ['Северск,%d,%d' % (20 + i, 1000 * i) for i in range(10)]
+    mapped = MappedCsv(write_csv(tmp_path, '\n'.join(rows) + '\n'), 'utf-8')
+
+    mask = column_mask(mapped.column(1), '25', '>=')
+    assert mask.sum() == 5
+    assert np.allclose(column_numbers(mapped.column(2))[mask], [5000, 6000, 7000, 8000, 9000])
+    assert mapped.column(0).kind == 'str'
+    mapped.close()
+
+
+def test_mapped_csv_sample_columns(tmp_path):
+    """ Проверка столбцов по выбранным строкам отображенного в память файла """
+    print('\n\n** Проверка столбцов по выбранным строкам отображенного в память файла. **\n')
+    rows = ['Город,Возраст,ЗП'] + ['Город %d,%d,%d' % (i % 3, 20 + i, 1000 * i) for i in range(10)]
+    mapped = MappedCsv(write_csv(tmp_path, '\n'.join(rows) + '\n'), 'utf-8')
+
+    sample = mapped.sample_columns([0, 2], np.array([1, 4, 8]))
+    assert sorted(sample) == [0, 2]
+    assert sample[0].strings(0, 3) == ['Город 1', 'Город 1', 'Город 2']
+    assert column_numbers(sample[2]).tolist() == [1000, 4000, 8000]
+    mapped.close()
+
+
+def test_mapped_columns_index(tmp_path):
+    """ Проверка доступа к столбцам отображенного в память файла по номеру """
+    print('\n\n** Проверка доступа к столбцам отображенного в память файла по номеру. **\n')
+    mapped = MappedCsv(write_csv(tmp_path, 'Город,ЗП\nСеверск,1000\nТомск,2000\n'), 'utf-8')
+    columns = MappedColumns(mapped)
+
+    assert len(list(columns)) == 2
+    with pytest.raises(IndexError):
+        columns[2]
+    mapped.close()
+
+
+def test_mapped_csv_bad_encoding_row(tmp_path):
+    """ Проверка строки не в кодировке файла """
+    print('\n\n** Проверка строки не в кодировке файла. **\n')
+    filename = tmp_path / 'data.csv'
+    filename.write_bytes('Город,ЗП\nТомск,100\n'.encode('utf-8') + 'Омск,200\n'.encode('cp1251'))
+    mapped = MappedCsv(str(filename), 'utf-8')
+
+    # Строка выводится с символами замены, а расчеты по столбцу прерываются ошибкой.
+    assert mapped.row(0) == ['Томск', '100']
+    assert mapped.row(1)[0].startswith('�') and mapped.row(1)[1] == '200'
+    with pytest.raises(UnicodeDecodeError):
+        mapped.column(0)
+    with pytest.raises(UnicodeDecodeError):
+        mapped.sample_columns([0], [1])
+    mapped.close()
@@ -0,0 +1,81 @@
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(1, '../src/')
+
+from parallel_calc import SharedArray, ProcessEngine, group_moments, merge_group_moments, group_semi
+from research_calc import ResearchCalc
+from table_columns import make_column, group_three_points, mask_three_points
+
+
+@pytest.fixture(scope='module')
+def engine():
+    with ProcessEngine(2) as engine:
+        yield engine
+
+
+def test_merge_group_moments():
+    """ Проверка объединения моментов групп двух частей данных """
+    print('\n\n** Проверка объединения моментов групп двух частей данных. **\n')
+    rng = np.random.default_rng(5)
+    group_ids = rng.integers(0, 4, 300)
+    values = rng.lognormal(10, 0.5, 300)
+    values[::17] = np.nan
+    # Группа 3 есть только во второй части, группа 4 - пустая.
+    group_ids[:150][group_ids[:150] == 3] = 0
+
+    moments = merge_group_moments(group_moments(group_ids[:150], values[:150], 5),
+                                  group_moments(group_ids[150:], values[150:], 5))
+    valid = ~np.isnan(values)
+    expected = ResearchCalc.calc_semi_grouped(group_ids[valid], values[valid], 5)
+    assert np.allclose(group_semi(moments)[:4], expected[:4], rtol=1e-9)
+    assert np.isnan(group_semi(moments)[4, 0]) and group_semi(moments)[4, 4] == 0
+
+
+def test_shared_array():
+    """ Проверка массива в разделяемой памяти """
+    print('\n\n** Проверка массива в разделяемой памяти. **\n')
+    from multiprocessing import shared_memory
+    with SharedArray(np.arange(10.)) as shared:
+        name, dtype, shape = shared.descriptor
+        assert shared.array.tolist() == list(range(10)) and shape == (10,)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_engine_mask_moments(engine):
+    """ Проверка расчета моментов по маске в пуле процессов """
+    print('\n\n** Проверка расчета моментов по маске в пуле процессов. **\n')
+    rng = np.random.default_rng(11)
+    values = rng.lognormal(10, 0.5, 10000)
+    values[::13] = np.nan
+    mask = rng.random(10000) < 0.4
+
+    percents = []
+    accumulator = engine.mask_moments(values, mask, progress=percents.append)
+    selected = values[mask]
+    assert np.allclose(accumulator.semi(), ResearchCalc.calc_semi(selected[~np.isnan(selected)]), rtol=1e-9)
+    assert percents[-1] == 100 and percents == sorted(percents)
+    assert engine.mask_moments(values, mask, cancelled=lambda: True) is None
+
+
+def test_engine_three_points(engine):
+    """ Проверка трехточек по маске и по группам в пуле процессов """
+    print('\n\n** Проверка трехточек по маске и по группам в пуле процессов. **\n')
+    rng = np.random.default_rng(3)
+    wages = make_column([str(value) for value in rng.integers(20000, 90000, 2000)] + [''])
+    cities = make_column([str(value) for value in rng.choice(['Томск', 'Омск', 'Орск', ''], 2001)])
+    mask = np.arange(2001) % 2 == 0
+
+    semi, three_points = mask_three_points(wages, mask, engine=engine)
+    expected_semi, expected_points = mask_three_points(wages, mask)
+    assert np.allclose(semi, expected_semi, rtol=1e-9)
+    assert np.allclose(three_points, expected_points, rtol=1e-9)
+
+    groups = group_three_points(cities, wages, engine=engine)
+    expected = group_three_points(cities, wages)
+    assert [label for label, _, _ in groups] == [label for label, _, _ in expected]
+    for (_, semi, points), (_, expected_semi, expected_points) in zip(groups, expected):
+        assert np.allclose(semi, expected_semi, rtol=1e-9) and np.allclose(points, expected_points, rtol=1e-9)
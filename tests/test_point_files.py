@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+
+sys.path.insert(1, '../src/')
+
+import point_files
+from point_files import parse_pnt_value, read_point_file, PointFileCache, make_pnt_dict, parse_point_record, \
+    write_bundle, iter_bundle, PointBundle
+from research_calc import ErrorCodes
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resources')
+
+
+def write_point(path, x: float) -> str:
+    path.write_text(json.dumps({"Min": "[%s, 0.3]" % x, "Avg": "[%s, 0.5]" % (x * 2), "Max": "[%s, 0.2]" % (x * 3)}))
+    return str(path)
+
+
+def test_parse_pnt_value():
+    """ Проверка разбора значения трехточки """
+    print('\n\n** Проверка разбора значения трехточки. **\n')
+    assert parse_pnt_value("[21574.67, 0.31]") == [21574.67, 0.31]
+    assert parse_pnt_value(" [1e3,0.5] ") == [1000.0, 0.5]
+    assert parse_pnt_value("[153,135, 0.29]") == ErrorCodes.ERROR_NOT_NUMERIC
+    assert parse_pnt_value("21574.67, 0.31") == ErrorCodes.ERROR_NOT_NUMERIC
+    assert parse_pnt_value("[nan, 0.31]") == ErrorCodes.ERROR_NOT_NUMERIC
+    assert parse_pnt_value(0.31) == ErrorCodes.ERROR_NOT_NUMERIC
+
+
+def test_read_point_file():
+    """ Проверка чтения .pnt файлов """
+    print('\n\n** Проверка чтения .pnt файлов. **\n')
+    records = read_point_file(os.path.join(RESOURCES, 'threepoint1.pnt'))
+    assert len(records) == 1
+    assert records[0].points == [[21574.67, 0.31], [56484.57, 0.56], [137669.03, 0.13]]
+    assert records[0].semi is None and records[0].count is None
+    assert read_point_file(os.path.join(RESOURCES, 'bad_threepoint.pnt')) == ErrorCodes.ERROR_NOT_NUMERIC
+    assert read_point_file(os.path.join(RESOURCES, 'data.csv')) == ErrorCodes.ERROR_INVALID_FILE_FORMAT
+
+
+def test_point_file_errors(tmp_path):
+    """ Проверка ошибок в .pnt файлах """
+    print('\n\n** Проверка ошибок в .pnt файлах. **\n')
+    empty = tmp_path / 'empty.pnt'
+    empty.write_text('')
+    broken = tmp_path / 'broken.pnt'
+    broken.write_text('{"Min": ')
+    no_key = tmp_path / 'no_key.pnt'
+    no_key.write_text('{"Min": "[1, 0.5]", "Avg": "[2, 0.5]"}')
+
+    assert read_point_file(str(empty)) == ErrorCodes.ERROR_EMPTY_FILE
+    assert read_point_file(str(broken)) == ErrorCodes.ERROR_INVALID_FILE_FORMAT
+    assert read_point_file(str(no_key)) == ErrorCodes.ERROR_POINT_NOT_LOADED
+    assert read_point_file(str(tmp_path / 'missing.pnt')) == ErrorCodes.ERROR_FILE_NOT_LOADED
+
+
+def test_point_file_cache(tmp_path, monkeypatch):
+    """ Проверка повторного чтения только новых и измененных файлов """
+    print('\n\n** Проверка повторного чтения только новых и измененных файлов. **\n')
+    filenames = [write_point(tmp_path / ('branch%d.pnt' % i), 1000 + i) for i in range(20)]
+
+    read = []
+    def counting_read(filename):
+        read.append(filename)
+        return read_point_file(filename)
+    monkeypatch.setattr(point_files, 'read_point_file', counting_read)
+
+    cache = PointFileCache(workers=4)
+    points = cache.load(filenames)
+    assert len(read) == 20
+    assert [records[0].points[0][0] for records in points] == [1000 + i for i in range(20)]
+
+    read.clear()
+    filenames.append(write_point(tmp_path / 'branch20.pnt', 5000))
+    write_point(tmp_path / 'branch3.pnt', 12345.5)
+    stat = os.stat(filenames[3])
+    os.utime(filenames[3], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    points = cache.load(filenames)
+    assert sorted(read) == sorted([filenames[3], filenames[20]])
+    assert points[3][0].points[0][0] == 12345.5 and points[20][0].points[0][0] == 5000
+
+
+def test_pnt_version_2(tmp_path):
+    """ Проверка записи трехточки версии 2 """
+    print('\n\n** Проверка записи трехточки версии 2. **\n')
+    three_points = [[21574.67, 0.31], [56484.57, 0.56], [137669.03, 0.13]]
+    semi = [60000.0, 1.5e9, 2.0e13, -1.0e18, 412]
+    record = make_pnt_dict(three_points, semi, 'Город: Москва')
+    assert record == {'version': 2, 'name': 'Город: Москва', 'Min': [21574.67, 0.31], 'Avg': [56484.57, 0.56],
+                      'Max': [137669.03, 0.13], 'count': 412, 'semi': [60000.0, 1.5e9, 2.0e13, -1.0e18]}
+
+    filename = tmp_path / 'point.pnt'
+    filename.write_text(json.dumps(record))
+    records = read_point_file(str(filename))
+    assert records[0].points == three_points and records[0].semi == semi and records[0].count == 412
+    assert records[0].to_dict() == record
+
+    assert parse_point_record(dict(record, Min='[1, 0.5]')) == ErrorCodes.ERROR_NOT_NUMERIC
+    assert parse_point_record(dict(record, count='412')) == ErrorCodes.ERROR_NOT_NUMERIC
+    assert parse_point_record(dict(record, version=3)) == ErrorCodes.ERROR_INVALID_FILE_FORMAT
+    assert parse_point_record(make_pnt_dict(three_points)).semi is None
+
+
+def test_pnt_bundle(tmp_path):
+    """ Проверка набора трехточек в одном файле """
+    print('\n\n** Проверка набора трехточек в одном файле. **\n')
+    filename = str(tmp_path / 'groups.pnt')
+    groups = [('Группа %d' % i, [[i, 0.3], [i * 2, 0.5], [i * 3, 0.2]], [i * 2, 1.0, 0.0, 0.0, 10 + i])
+              for i in range(1000)]
+    assert write_bundle(filename, (make_pnt_dict(points, semi, name) for name, points, semi in groups)) == 1000
+
+    streamed = list(iter_bundle(filename))
+    assert [record.name for record in streamed] == [name for name, _, _ in groups]
+    assert streamed[10].points == groups[10][1] and streamed[10].count == 20
+
+    records = read_point_file(filename)
+    assert len(records) == 1000 and records[-1].semi == groups[-1][2]
+
+    with PointBundle(filename) as bundle:
+        assert len(bundle) == 1000 and 'Группа 500' in bundle
+        assert bundle.get('Группа 500').points == groups[500][1]
+        assert bundle.get('Группа 7').name == 'Группа 7'
+        assert bundle.get('Нет такой') is None
+
+    assert write_bundle(filename, []) == 0
+    assert read_point_file(filename) == []
@@ -0,0 +1,95 @@
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../src/')
+
+from src.research_cli import ResearchCalc, ErrorCodes, stream_three_points, main
+
+RESOURCES = os.path.join(os.path.dirname(__file__), '..', 'resources')
+DATA_CSV = os.path.join(RESOURCES, 'data.csv')
+
+
+def expected_semi(column: str, check) -> list:
+    """ Семиинварианты, посчитанные по полностью загруженной таблице """
+    with open(DATA_CSV, newline='', encoding='cp1251') as File:
+        rows = list(csv.reader(File))
+    col = rows[0].index(column)
+    wage_col = rows[0].index('ЗП')
+    return ResearchCalc.calc_semi([float(row[wage_col]) for row in rows[1:] if check(row[col])])
+
+
+def test_stream_three_points_numeric_property():
+    """ Проверка потокового расчета для числового свойства """
+    print('\n\n** Проверка потокового расчета для свойства Возраст >= 30. **\n')
+    result = stream_three_points(DATA_CSV, 'Возраст', '30', '>=', encoding='cp1251', chunk_size=4)
+    print('Результат работы функции: ' + str(result))
+    three_points, semi = result
+
+    assert np.allclose(semi, expected_semi('Возраст', lambda x: int(x) >= 30))
+    assert np.allclose(three_points, ResearchCalc.calc_three_points(semi))
+
+
+def test_stream_three_points_text_property():
+    """ Проверка потокового расчета для текстового свойства """
+    print('\n\n** Проверка потокового расчета для свойства Образование = Высшее. **\n')
+    three_points, semi = stream_three_points(DATA_CSV, 'Образование', 'Высшее', encoding='cp1251')
+
+    assert np.allclose(semi, expected_semi('Образование', lambda x: x == 'Высшее'))
+
+
+def test_stream_three_points_fault_tolerance():
+    """ Проверка на отказоустойчивость потокового расчета """
+    print('\n\n** Проверка на отказоустойчивость потокового расчета. **\n')
+    not_zp_csv = os.path.join(RESOURCES, 'Not zp.csv')
+    empty_csv = os.path.join(RESOURCES, 'empty_test.csv')
+
+    assert stream_three_points(not_zp_csv, 'Зимняя2017', '8', encoding='cp1251') == ErrorCodes.ERROR_NOT_MONEY
+    assert stream_three_points(DATA_CSV, 'Отдел', 'ИТ', encoding='cp1251') == ErrorCodes.ERROR_NOT_PROPERTY
+    assert stream_three_points(empty_csv, 'Возраст', '30') == ErrorCodes.ERROR_EMPTY_FILE
+
+
+def test_stream_three_points_unreadable_file(tmp_path):
+    """ Проверка потокового расчета по отсутствующему и нечитаемому файлу """
+    print('\n\n** Проверка потокового расчета по отсутствующему и нечитаемому файлу. **\n')
+    missing_csv = str(tmp_path / 'missing.csv')
+    assert stream_three_points(missing_csv, 'Возраст', '30') == ErrorCodes.ERROR_FILE_NOT_LOADED
+    assert main([missing_csv, '-c', 'Возраст', '-v', '30']) == 1
+
+
+def test_stream_three_points_invalid_file(tmp_path, capsys):
+    """ Проверка потокового расчета по файлу в другой кодировке и с неразбираемыми строками """
+    print('\n\n** Проверка потокового расчета по файлу в другой кодировке и с неразбираемыми строками. **\n')
+    assert stream_three_points(DATA_CSV, 'Возраст', '30', encoding='utf-8') == ErrorCodes.ERROR_INVALID_FILE_FORMAT
+    assert main([DATA_CSV, '-c', 'Возраст', '-v', '30', '--encoding', 'utf-8']) == 1
+    assert 'ERROR_INVALID_FILE_FORMAT' in capsys.readouterr().err
+
+    # Ячейка длиннее допустимого для модуля csv.
+    broken_csv = tmp_path / 'broken.csv'
+    broken_csv.write_text('Возраст,ЗП\n30,' + '1' * (csv.field_size_limit() + 1) + '\n', encoding='utf-8')
+    assert stream_three_points(str(broken_csv), 'Возраст', '30', encoding='utf-8') == \
+        ErrorCodes.ERROR_INVALID_FILE_FORMAT
+
+
+def test_cli_writes_pnt(tmp_path):
+    """ Проверка записи .pnt консольным расчетом """
+    output = tmp_path / 'result.pnt'
+    assert main([DATA_CSV, '-c', 'Возраст', '-v', '30', '--op', '>=', '--encoding', 'cp1251', '-o', str(output)]) == 0
+    with open(output) as File:
+        pnt = json.load(File)
+
+    assert list(pnt.keys()) == ['version', 'name', 'Min', 'Avg', 'Max', 'count', 'semi']
+    assert pnt['version'] == 2 and pnt['name'] == 'Возраст >= 30'
+    assert all(len(pnt[key]) == 2 for key in ['Min', 'Avg', 'Max'])
+    assert pnt['count'] > 3 and len(pnt['semi']) == 4
+
+
+def test_cli_unwritable_output(tmp_path, capsys):
+    """ Проверка записи .pnt в недоступное место """
+    print('\n\n** Проверка записи .pnt в недоступное место. **\n')
+    output = tmp_path / 'missing' / 'result.pnt'
+    assert main([DATA_CSV, '-c', 'Возраст', '-v', '30', '--op', '>=', '--encoding', 'cp1251', '-o', str(output)]) == 1
+    assert 'ERROR_FILE_NOT_LOADED' in capsys.readouterr().err and not output.exists()
@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(1, '../src/')
+
+from sidecar import save_sidecar, load_sidecar, sidecar_path
+from table_columns import make_column
+
+
+def test_sidecar_roundtrip(tmp_path):
+    """ Проверка сохранения и загрузки файла-спутника """
+    print('\n\n** Проверка сохранения и загрузки файла-спутника. **\n')
+    filename = str(tmp_path / 'data.csv')
+    with open(filename, 'w', encoding='utf-8') as File:
+        File.write('Город,ЗП\nСеверск,1.5\nМосква,-3\n')
+    columns = [make_column(['Северск', 'Москва']), make_column(['1.5', '-3'])]
+
+    assert save_sidecar(filename, 'utf-8', ['Город', 'ЗП'], columns)
+    headers, loaded = load_sidecar(filename, 'utf-8')
+
+    assert headers == ['Город', 'ЗП']
+    assert [column.kind for column in loaded] == ['str', 'num']
+    assert [loaded[0].get(row) for row in range(2)] == ['Северск', 'Москва']
+    assert [loaded[1].get(row) for row in range(2)] == ['1.5', '-3']
+    assert load_sidecar(filename, 'cp1251') is None
+
+
+def test_sidecar_stale_source(tmp_path):
+    """ Проверка отказа от устаревшего файла-спутника """
+    print('\n\n** Проверка отказа от устаревшего файла-спутника. **\n')
+    filename = str(tmp_path / 'data.csv')
+    with open(filename, 'w', encoding='utf-8') as File:
+        File.write('Город\nСеверск\n')
+    save_sidecar(filename, 'utf-8', ['Город'], [make_column(['Северск'])])
+    with open(filename, 'a', encoding='utf-8') as File:
+        File.write('Москва\n')
+
+    assert os.path.exists(sidecar_path(filename))
+    assert load_sidecar(filename, 'utf-8') is None
@@ -0,0 +1,320 @@
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../src/')
+
+from src.table_columns import StringColumn, NumericColumn, make_column, to_string_column, \
+    column_mask, column_numbers, group_three_points, mask_three_points, ResearchCalc, iter_row_chunks, export_csv, \
+    read_csv_batches, replace_comma, row_ranges, sample_matching_rows, preview_three_points, LiveMoments, \
+    MomentAccumulator, extend_columns, ErrorCodes
+
+
+def test_make_column_types():
+    """ Проверка определения типа столбца """
+    print('\n\n** Проверка определения типа столбца. **\n')
+    assert make_column(['35', '58', '', '43']).kind == 'num'
+    assert make_column(['Высшее', 'Среднее']).kind == 'str'
+    assert make_column(['007', '12']).kind == 'str'
+    assert make_column(['', '']).kind == 'str'
+
+
+def test_string_column_dictionary():
+    """ Проверка словарного кодирования строкового столбца """
+    print('\n\n** Проверка словарного кодирования строкового столбца. **\n')
+    column = StringColumn(['Москва', 'Северск', 'Москва', 'Москва'])
+    column.insert(1, 2)
+    column.remove(0, 1)
+    column.set(0, 'Северск')
+
+    assert [column.get(row) for row in range(len(column))] == ['Северск', '', 'Северск', 'Москва', 'Москва']
+    assert len(column.dictionary) == 3
+
+
+def test_numeric_column_edit_and_convert():
+    """ Проверка редактирования числового столбца и перевода в строковый """
+    print('\n\n** Проверка редактирования числового столбца. **\n')
+    column = NumericColumn(['48511', '17564'])
+    column.insert(2, 1)
+
+    assert column.get(2) == ''
+    assert column.set(2, '23834')
+    assert not column.set(0, 'abc')
+
+    converted = to_string_column(column)
+    assert [converted.get(row) for row in range(3)] == ['48511', '17564', '23834']
+
+
+def test_numeric_column_decimal_and_negative():
+    """ Проверка разбора десятичных и отрицательных чисел """
+    print('\n\n** Проверка разбора десятичных и отрицательных чисел. **\n')
+    column = make_column(['1.5', '-3', '', '12.25'])
+
+    assert column.kind == 'num'
+    assert [column.get(row) for row in range(4)] == ['1.5', '-3', '', '12.25']
+    # Дробь с запятой остается строкой (текст ячейки не меняется), но в расчетах считается числом.
+    column = make_column(['1,5', '-3'])
+    assert column.kind == 'str' and column_numbers(column).tolist() == [1.5, -3]
+
+
+def test_column_mask_and_numbers():
+    """ Проверка векторного отбора строк по свойству """
+    print('\n\n** Проверка векторного отбора строк по свойству. **\n')
+    ages = make_column(['35', '58', '43', '', '30'])
+    cities = make_column(['Северск', 'Москва', 'Северск', 'Москва', '25'])
+    wages = make_column(['48511', '17564', 'нет', '23834,5', '51585'])
+
+    assert column_mask(ages, '43', '>=').tolist() == [False, True, True, False, False]
+    assert column_mask(ages, '35', '<=').tolist() == [True, False, False, False, True]
+    assert column_mask(cities, 'Северск', 'Северск').tolist() == [True, False, True, False, False]
+    assert column_mask(cities, '30', '<=').tolist() == [False, False, False, False, True]
+    assert np.allclose(column_numbers(wages), [48511, 17564, np.nan, 23834.5, 51585], equal_nan=True)
+
+
+def test_group_three_points():
+    """ Проверка расчета трехточек по всем значениям столбца """
+    print('\n\n** Проверка расчета трехточек по всем значениям столбца. **\n')
+    cities = make_column(['Северск', 'Москва'] * 6 + ['', 'Томск'])
+    wages = make_column(['36', '30', '26', '39', '49', '43', '53', '53', '56', '50', '25', '48', '1', '2'])
+    result = group_three_points(cities, wages)
+    print('Результат работы функции: ' + str(result))
+
+    assert [label for label, _, _ in result] == ['Северск', 'Москва']
+    assert np.allclose(result[0][1], ResearchCalc.calc_semi([36, 26, 49, 53, 56, 25]))
+    assert result[1][1][4] == 6
+
+
+def test_mask_three_points():
+    """ Проверка расчета трехточки по маске строк """
+    print('\n\n** Проверка расчета трехточки по маске строк. **\n')
+    wages = make_column(['36', '30', '26', '', '49', '43', '53', '53', '56', '50'])
+    mask = np.array([True, False] * 5)
+    semi, three_points = mask_three_points(wages, mask)
+
+    assert np.allclose(semi, ResearchCalc.calc_semi([36, 26, 49, 53, 56]))
+    assert three_points == ResearchCalc.calc_three_points(semi)
+    assert mask_three_points(wages, np.array([True] * 3 + [False] * 7)) == (None, None)
+
+
+def test_mask_three_points_chunks():
+    """ Проверка расчета трехточки по маске порциями строк с отменой """
+    print('\n\n** Проверка расчета трехточки по маске порциями строк с отменой. **\n')
+    wages = make_column([str(value) for value in range(1000, 2000)])
+    mask = np.arange(1000) % 3 != 0
+    percents = []
+    semi, three_points = mask_three_points(wages, mask, chunk_rows=64, progress=percents.append)
+
+    assert np.allclose(semi, ResearchCalc.calc_semi(np.arange(1000, 2000)[mask]), rtol=1e-12)
+    assert len(percents) == 16 and percents[-1] == 100
+    assert mask_three_points(wages, mask, chunk_rows=64, cancelled=lambda: len(percents) > 20,
+                             progress=percents.append) is None
+    assert len(percents) == 21
+
+
+
+def test_live_moments():
+    """ Проверка обновления моментов отбора при правке, добавлении и удалении строк """
+    print('\n\n** Проверка обновления моментов отбора при правке, добавлении и удалении строк. **\n')
+    columns = [make_column(['Томск', 'Омск', 'Томск', 'Томск', 'Орск', 'Томск', 'Томск']),
+               make_column(['36', '30', '26', '', '49', '43', '53'])]
+
+    def make_mask(cols):
+        return column_mask(cols[0], 'Томск', '=')
+
+    def exact():
+        return mask_three_points(columns[1], make_mask(columns))
+
+    semi, _ = exact()
+    live = LiveMoments(('Город', 'Томск'), make_mask, [0, 1], 1, MomentAccumulator.from_semi(semi))
+
+    # Правка: вычитается прежний вклад строки и добавляется новый.
+    live.remove_rows(columns, [1, 3])
+    columns[0].set(1, 'Томск')
+    columns[1].set(3, '61')
+    live.add_rows(columns, [1, 3])
+    assert np.allclose(live.result()[0], exact()[0], rtol=1e-12)
+
+    # Добавление строк и удаление набора строк (векторно).
+    for column, value in zip(columns, ['Томск', '47']):
+        column.extend([value])
+    live.add_rows(columns, [7])
+    live.row_values_limit = 0
+    live.remove_rows(columns, [0, 2])
+    keep = np.ones(8, dtype=bool)
+    keep[[0, 2]] = False
+    columns = [column.take(keep) for column in columns]
+    assert np.allclose(live.result()[0], exact()[0], rtol=1e-12)
+    assert np.allclose(live.result()[1], exact()[1], rtol=1e-12)
+
+    live.remove_rows(columns, range(6))
+    assert live.result() == (None, None)
+
+
+def test_sample_matching_rows():
+    """ Проверка повторяемой выборки подходящих строк """
+    print('\n\n** Проверка повторяемой выборки подходящих строк. **\n')
+    rows, scanned = sample_matching_rows(1000, 100, 7, lambda rows: np.ones(len(rows), dtype=bool))
+    assert len(rows) == 100 and len(set(rows.tolist())) == 100 and scanned == 100
+    assert rows.tolist() == sorted(rows.tolist()) and 0 <= rows[0] and rows[-1] < 1000
+    assert np.array_equal(rows, sample_matching_rows(1000, 100, 7, lambda rows: np.ones(len(rows), dtype=bool))[0])
+    assert not np.array_equal(rows, sample_matching_rows(1000, 100, 8, lambda rows: np.ones(len(rows), dtype=bool))[0])
+
+    # Узкий отбор: подходит каждая сотая строка, выборка набирается из подходящих строк.
+    read = []
+
+    def select(rows):
+        read.append(rows)
+        assert rows.tolist() == sorted(rows.tolist())
+        return rows % 100 == 0
+    rows, scanned = sample_matching_rows(100000, 200, 3, select)
+    assert len(rows) == 200 and all(rows % 100 == 0) and sum(len(part) for part in read) >= scanned
+    assert 10000 < scanned < 40000 and len(read) > 1
+
+    # Подходящих строк меньше размера выборки - в выборку попадают все.
+    rows, scanned = sample_matching_rows(1000, 100, 3, lambda rows: rows < 10)
+    assert rows.tolist() == list(range(10)) and scanned == 1000
+    rows, scanned = sample_matching_rows(100000, 100, 3, lambda rows: rows < 10, max_rows=500)
+    assert scanned == 500 and len(rows) < 10
+    assert sample_matching_rows(1000, 100, 3, lambda rows: ErrorCodes.ERROR_NOT_PROPERTY) == \
+        ErrorCodes.ERROR_NOT_PROPERTY
+    assert sample_matching_rows(1000, 100, 3, lambda rows: rows < 10, cancelled=lambda: True) is None
+
+
+def test_preview_three_points():
+    """ Проверка предварительной трехточки по выборке строк """
+    print('\n\n** Проверка предварительной трехточки по выборке строк. **\n')
+    rng = np.random.default_rng(2)
+    wages = make_column([str(value) for value in rng.lognormal(10, 0.4, 100000).round()])
+    mask = np.arange(100000) % 2 == 0
+    _, exact = mask_three_points(wages, mask)
+
+    rows = np.sort(np.random.default_rng(1).choice(100000, 5000, replace=False))
+    semi, three_points, errors = preview_three_points(wages.take(rows), mask[rows], 100000, seed=1)
+    assert semi[4] == mask[rows].sum()
+    assert all(0 < error < abs(point[0]) for point, error in zip(three_points, errors))
+    assert all(abs(point[0] - exact_point[0]) < 2 * error
+               for point, exact_point, error in zip(three_points, exact, errors))
+
+    # Выборка из всех строк таблицы дает точную трехточку с нулевой погрешностью.
+    _, three_points, errors = preview_three_points(wages, mask, 100000)
+    assert np.allclose(three_points, exact) and errors == [0, 0, 0]
+    # Выборка из всех подходящих строк после просмотра всей таблицы - тоже точная.
+    matched = np.flatnonzero(mask)
+    _, three_points, errors = preview_three_points(wages.take(matched), np.ones(len(matched), dtype=bool), 100000,
+                                                   scanned_rows=100000)
+    assert np.allclose(three_points, exact) and errors == [0, 0, 0]
+    assert preview_three_points(wages.take(rows[:3]), mask[rows[:3]], 100000) is None
+
+
+def test_read_csv_batches(tmp_path):
+    """ Проверка чтения CSV порциями строк """
+    print('\n\n** Проверка чтения CSV порциями строк. **\n')
+    filename = tmp_path / 'data.csv'
+    filename.write_text('Город,ЗП\n' + ''.join('Город %d , %d\n' % (i, i) for i in range(10)), encoding='cp1251')
+
+    percents = []
+    batches = list(read_csv_batches(str(filename), 'cp1251', 2, 3, progress=percents.append))
+    assert batches[0] == ['Город', 'ЗП']
+    assert [len(batch) for batch in batches[1:]] == [2, 3, 3, 2]
+    assert batches[1][0] == ['Город 0', '0'] and batches[-1][-1] == ['Город 9', '9']
+    assert percents[-1] == 100 and percents == sorted(percents)
+
+    batches = list(read_csv_batches(str(filename), 'cp1251', 2, 3, cancelled=lambda: True))
+    assert batches == [['Город', 'ЗП']]
+
+
+def test_export_csv_replace_comma(tmp_path):
+    """ Проверка потоковой записи CSV с заменой запятых """
+    print('\n\n** Проверка потоковой записи CSV с заменой запятых. **\n')
+    columns = [make_column(['Москва, центр', 'Северск', 'Томск']), make_column(['48511', '', '1,5'])]
+    filename = str(tmp_path / 'out.csv')
+    chunks = iter_row_chunks(columns, 3, chunk_rows=2, transform=replace_comma)
+
+    assert export_csv(filename, ['Город', 'ЗП'], chunks, 3, encoding='utf-8')
+    with open(filename, encoding='utf-8') as File:
+        assert File.read().splitlines() == ['Город,ЗП', 'Москва; центр,48511', 'Северск,', 'Томск,1;5']
+    assert columns[0].get(0) == 'Москва, центр'
+
+
+def test_row_chunks_transform_once():
+    """ Проверка однократного преобразования словаря строкового столбца при записи порциями """
+    print('\n\n** Проверка однократного преобразования словаря строкового столбца при записи порциями. **\n')
+    calls = []
+
+    def transform(value):
+        calls.append(value)
+        return replace_comma(value)
+    columns = [make_column(['Москва, центр', 'Томск'] * 5), make_column(['1', '2,5'] * 5)]
+
+    rows = [row for chunk in iter_row_chunks(columns, 10, chunk_rows=3, transform=transform) for row in chunk]
+    assert rows == [('Москва; центр', '1'), ('Томск', '2;5')] * 5
+    # По одному вызову на значение словаря каждого столбца, а не на каждую порцию.
+    assert sorted(calls) == ['1', '2,5', 'Москва, центр', 'Томск']
+    assert columns[0].get(0) == 'Москва, центр'
+
+
+def test_number_text_round_trip(tmp_path):
+    """ Проверка сохранения текста числовых ячеек при загрузке и сохранении таблицы """
+    print('\n\n** Проверка сохранения текста числовых ячеек при загрузке и сохранении таблицы. **\n')
+    values = ['1.50', '2.5', '100.0', '-0', '3', '0.10', '', '-0.25', '0.00001']
+    source = tmp_path / 'data.csv'
+    source.write_text('ЗП,Стаж\n' + ''.join('%s,%d\n' % (value, i) for i, value in enumerate(values)),
+                      encoding='utf-8')
+
+    batches = read_csv_batches(str(source), 'utf-8', 4, 4)
+    headers = next(batches)
+    columns = [None] * len(headers)
+    row_count = 0
+    for batch in batches:
+        extend_columns(columns, batch, row_count)
+        row_count += len(batch)
+    assert columns[0].strings(0, row_count) == values and columns[1].kind == 'num'
+    assert np.allclose(column_numbers(columns[0])[:3], [1.5, 2.5, 100])
+
+    output = str(tmp_path / 'out.csv')
+    assert export_csv(output, headers, iter_row_chunks(columns, row_count, transform=replace_comma), row_count,
+                      encoding='utf-8')
+    with open(output, encoding='utf-8') as File:
+        assert File.read() == source.read_text(encoding='utf-8')
+
+
+def test_numeric_column_text():
+    """ Проверка числовых столбцов только для значений, текст которых не меняется """
+    print('\n\n** Проверка числовых столбцов только для значений, текст которых не меняется. **\n')
+    for value in ['1.50', '2,5', '100.0', '-0', '0.10', '007', '0.00001']:
+        column = make_column(['3', value])
+        assert column.kind == 'str' and column.get(1) == value
+    column = make_column(['3', '-0.25', '1.5', '', '0'])
+    assert column.kind == 'num' and column.strings(0, 5) == ['3', '-0.25', '1.5', '', '0']
+    assert column.set(0, '4.5') and not column.set(1, '4.50') and not column.set(1, '4,5')
+
+
+def test_export_csv_cancelled(tmp_path):
+    """ Проверка отмены потоковой записи CSV """
+    print('\n\n** Проверка отмены потоковой записи CSV. **\n')
+    filename = tmp_path / 'out.csv'
+    filename.write_text('old')
+    chunks = iter_row_chunks([make_column(['1', '2', '3'])], 3, chunk_rows=1)
+
+    assert not export_csv(str(filename), ['ЗП'], chunks, 3, cancelled=lambda: True)
+    assert filename.read_text() == 'old'
+    assert not (tmp_path / 'out.csv.tmp').exists()
+
+
+def test_row_ranges():
+    """ Проверка объединения строк в диапазоны для удаления """
+    print('\n\n** Проверка объединения строк в диапазоны для удаления. **\n')
+    assert row_ranges([3, 1, 2, 2, 7, 9, 8, 0]) == [(7, 3), (0, 4)]
+    assert row_ranges([5]) == [(5, 1)]
+    assert row_ranges([]) == []
+
+
+def test_column_take():
+    """ Проверка выборки строк столбца по маске """
+    print('\n\n** Проверка выборки строк столбца по маске. **\n')
+    keep = np.array([True, False, True])
+    cities = make_column(['Москва', 'Северск', 'Томск']).take(keep)
+    wages = make_column(['1', '2', '3']).take(keep)
+
+    assert [cities.get(row) for row in range(len(cities))] == ['Москва', 'Томск']
+    assert [wages.get(row) for row in range(len(wages))] == ['1', '3']
@@ -0,0 +1,79 @@
+import json
+import sys
+
+sys.path.insert(1, '../src/')
+
+from tracing import Tracer, NULL_SPAN
+
+
+def test_tracing_disabled():
+    """ Проверка выключенной трассировки """
+    print('\n\n** Проверка выключенной трассировки. **\n')
+    tracer = Tracer()
+    assert tracer.operation("load") is NULL_SPAN
+    with tracer.span("csv_parse", rows=10) as span:
+        span.set(rows=20)
+    assert len(tracer.events) == 0
+    assert tracer.summary() == [] and tracer.format_summary() == ""
+
+
+def test_tracing_summary():
+    """ Проверка сводки этапов операции """
+    print('\n\n** Проверка сводки этапов операции. **\n')
+    tracer = Tracer()
+    tracer.enable(memory=True)
+    try:
+        operation = tracer.operation("load", file="data.csv")
+        for _ in range(3):
+            with tracer.span("csv_parse", rows=100):
+                with tracer.span("inner"):
+                    data = [0.0] * 200000
+        with tracer.span("sidecar_save", files=1) as span:
+            span.set(rows=300)
+        operation.finish()
+    finally:
+        tracer.disable()
+    del data
+
+    assert tracer.last_operation is operation
+    summary = {name: (rows, files, peak, count) for name, _, rows, files, peak, count in tracer.summary()}
+    assert summary["csv_parse"][0] == 300 and summary["csv_parse"][3] == 3
+    assert summary["sidecar_save"][:2] == (300, 1)
+    # Пик памяти вложенного участка учитывается во внешнем.
+    assert summary["inner"][2] >= 200000 * 8 and summary["csv_parse"][2] >= summary["inner"][2]
+
+    text = tracer.format_summary()
+    assert text.startswith("load: ") and "csv_parse" in text and "300 стр." in text and "1 файл." in text
+
+    # Этапы вне окна операции в сводку не входят.
+    tracer.enable(memory=False)
+    with tracer.span("csv_parse", rows=5):
+        pass
+    tracer.disable()
+    assert {name: rows for name, _, rows, _, _, _ in tracer.summary(operation)}["csv_parse"] == 300
+
+
+def test_tracing_export(tmp_path):
+    """ Проверка записи трассировки в формате Chrome """
+    print('\n\n** Проверка записи трассировки в формате Chrome. **\n')
+    tracer = Tracer()
+    tracer.enable(memory=False)
+    operation = tracer.operation("calc_point")
+    with tracer.span("calc_semi", rows=42):
+        pass
+    operation.finish()
+    operation.finish()
+    tracer.disable()
+
+    filename = tmp_path / 'trace.json'
+    assert tracer.export_chrome(str(filename)) == 2
+    trace = json.loads(filename.read_text())
+    assert trace["displayTimeUnit"] == "ms"
+    events = {event["name"]: event for event in trace["traceEvents"]}
+    assert events["calc_semi"]["ph"] == "X" and events["calc_semi"]["args"] == {"rows": 42}
+    assert events["calc_point"]["cat"] == "operation"
+    assert events["calc_point"]["ts"] <= events["calc_semi"]["ts"]
+    assert events["calc_point"]["dur"] >= events["calc_semi"]["dur"]
+
+    tracer.clear()
+    assert len(tracer.events) == 0 and tracer.last_operation is None
@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+
+sys.path.insert(1, '../src/')
+
+import ui2py
+
+
+def test_convert_only_changed(tmp_path, monkeypatch):
+    """ Проверка генерации модулей только при изменении исходников """
+    print('\n\n** Проверка генерации модулей только при изменении исходников. **\n')
+    ui = tmp_path / 'main.ui'
+    ui.write_text('<ui/>')
+    image = tmp_path / 'icon.png'
+    image.write_bytes(b'png')
+    qrc = tmp_path / 'res.qrc'
+    qrc.write_text('<RCC><qresource prefix="images"><file>icon.png</file></qresource></RCC>')
+    main_app = tmp_path / 'main_app.py'
+    res_rc = tmp_path / 'res_rc.py'
+
+    assert ui2py.qrc_files(str(qrc)) == [str(image)]
+
+    commands = []
+    def system(command):
+        commands.append(command)
+        (main_app if command.startswith('pyuic5') else res_rc).write_text('')
+        return 0
+
+    monkeypatch.setattr(ui2py, 'ROOT_DIR', str(tmp_path))
+    monkeypatch.setattr(ui2py, 'HASHES_FILENAME', str(tmp_path / '.ui2py.json'))
+    monkeypatch.setattr(ui2py, 'conversions', lambda: [
+        (str(main_app), 'pyuic5 main.ui', [str(ui)]),
+        (str(res_rc), 'pyrcc5 res.qrc', [str(qrc)] + ui2py.qrc_files(str(qrc)))])
+    monkeypatch.setattr(ui2py.os, 'system', system)
+
+    assert ui2py.convert_ui_to_py() == [str(main_app), str(res_rc)]
+    assert ui2py.convert_ui_to_py() == []
+    assert sorted(json.loads((tmp_path / '.ui2py.json').read_text())['res_rc.py']) == ['icon.png', 'res.qrc']
+
+    image.write_bytes(b'png2')
+    assert ui2py.convert_ui_to_py() == [str(res_rc)]
+    os.remove(main_app)
+    assert ui2py.convert_ui_to_py() == [str(main_app)]
+    assert ui2py.convert_ui_to_py(force=True) == [str(main_app), str(res_rc)]
+    assert len(commands) == 6
@@ -0,0 +1,186 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(1, '../src/')
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+QtWidgets = pytest.importorskip('PyQt5.QtWidgets')
+
+from ui2py import convert_ui_to_py
+
+
+@pytest.fixture(scope='module')
+def window_logic():
+    # Модуль интерфейса генерируется так же, как при запуске window.py.
+    convert_ui_to_py()
+    module = pytest.importorskip('window_logic')
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    yield module
+    app.processEvents()
+
+
+def wait_point(window, timeout: float = 20.):
+    """ Ожидание окончания фонового расчета трехточки """
+    start = time.perf_counter()
+    while window.point_worker is not None and time.perf_counter() - start < timeout:
+        QtWidgets.QApplication.processEvents()
+        time.sleep(0.001)
+    assert window.point_worker is None
+
+
+def test_mapped_view_three_points(window_logic, tmp_path, monkeypatch):
+    """ Проверка расчета трехточки по файлу, открытому только для просмотра """
+    print('\n\n** Проверка расчета трехточки по файлу, открытому только для просмотра. **\n')
+    monkeypatch.setattr(QtWidgets.QMessageBox, 'exec', lambda self: 0)
+    filename = tmp_path / 'data.csv'
+    wages = np.random.default_rng(4).lognormal(10.8, 0.4, 200).round()
+    filename.write_text('Город,Возраст,ЗП\n' + ''.join('Томск,%d,%d\n' % (20 + i % 40, wage)
+                                                        for i, wage in enumerate(wages)), encoding='utf-8')
+
+    window = window_logic.ResearchApp()
+    window.open_mapped_view(str(filename))
+    window.properties_indexes[(0, 0)] = ''
+    window.calc_point_logic()
+    wait_point(window)
+
+    assert window.ValuePointEdit.text().startswith('Min: [')
+    assert window.point_flag and window.live_point.moments is None
+    window.close()
+
+
+def wait_load(window, timeout: float = 20.):
+    """ Ожидание окончания фоновой загрузки CSV """
+    start = time.perf_counter()
+    while window.load_worker is not None and time.perf_counter() - start < timeout:
+        QtWidgets.QApplication.processEvents()
+        time.sleep(0.001)
+    assert window.load_worker is None
+
+
+def test_load_sidecar_edits(window_logic, tmp_path, monkeypatch):
+    """ Проверка записи файла-спутника после загрузки и отметки о добавлении строк """
+    print('\n\n** Проверка записи файла-спутника после загрузки и отметки о добавлении строк. **\n')
+    monkeypatch.setattr(QtWidgets.QMessageBox, 'exec', lambda self: 0)
+    monkeypatch.setattr(window_logic.locale, 'getpreferredencoding', lambda do_setlocale=True: 'utf-8')
+    filename = tmp_path / 'data.csv'
+    filename.write_text('Город,ЗП\nТомск,100\nОмск,200\n', encoding='utf-8')
+
+    window = window_logic.ResearchApp()
+    monkeypatch.setattr(QtWidgets.QFileDialog, 'getOpenFileName', lambda *args, **kwargs: (str(filename), ''))
+    window.load_button_logic()
+    wait_load(window)
+    # Строки, добавленные самой загрузкой, не считаются правкой таблицы.
+    assert window.table_model.row_count == 2 and not window.table_edited
+    assert window_logic.load_sidecar(str(filename), 'utf-8') is not None
+
+    window.table_model.insertRow(window.table_model.row_count)
+    assert window.table_edited
+    window.close()
+
+
+def test_load_sidecar_source_changed(window_logic, tmp_path, monkeypatch):
+    """ Проверка отказа от файла-спутника, если исходный файл изменился во время загрузки """
+    print('\n\n** Проверка отказа от файла-спутника, если исходный файл изменился во время загрузки. **\n')
+    monkeypatch.setattr(QtWidgets.QMessageBox, 'exec', lambda self: 0)
+    monkeypatch.setattr(window_logic.locale, 'getpreferredencoding', lambda do_setlocale=True: 'utf-8')
+    filename = tmp_path / 'data.csv'
+    filename.write_text('Город,ЗП\nТомск,100\n', encoding='utf-8')
+
+    window = window_logic.ResearchApp()
+    monkeypatch.setattr(QtWidgets.QFileDialog, 'getOpenFileName', lambda *args, **kwargs: (str(filename), ''))
+    window.load_button_logic()
+    # Файл дописывается уже после начала загрузки.
+    with open(filename, 'a', encoding='utf-8') as File:
+        File.write('Омск,200\n')
+    wait_load(window)
+
+    assert window_logic.load_sidecar(str(filename), 'utf-8') is None
+    window.close()
+
+
+def test_point_read_error_not_cached(window_logic, tmp_path, monkeypatch):
+    """ Проверка вывода ошибки чтения файла при расчете трехточки без сохранения ее в кэш """
+    print('\n\n** Проверка вывода ошибки чтения файла при расчете трехточки без сохранения ее в кэш. **\n')
+    monkeypatch.setattr(QtWidgets.QMessageBox, 'exec', lambda self: 0)
+    filename = tmp_path / 'data.csv'
+    wages = np.random.default_rng(4).lognormal(10.8, 0.4, 200).round()
+    filename.write_text('Город,ЗП\n' + ''.join('Томск,%d\n' % wage for wage in wages), encoding='utf-8')
+
+    def unreadable(*args, **kwargs):
+        raise OSError("Файл удален.")
+    calc = window_logic.mask_three_points
+    monkeypatch.setattr(window_logic, 'mask_three_points', unreadable)
+
+    window = window_logic.ResearchApp()
+    window.open_mapped_view(str(filename))
+    window.properties_indexes[(0, 0)] = ''
+    window.calc_point_logic()
+    wait_point(window)
+    message = window_logic.point_error_messages[window_logic.ErrorCodes.ERROR_FILE_NOT_LOADED]
+    assert window.ValuePointEdit.text() == message
+    assert not window.point_flag
+
+    # Повторный расчет после восстановления чтения не берет ошибку из кэша.
+    monkeypatch.setattr(window_logic, 'mask_three_points', calc)
+    window.calc_point_logic()
+    wait_point(window)
+    assert window.ValuePointEdit.text().startswith('Min: [') and window.point_flag
+    window.close()
+
+
+def test_mapped_view_bad_encoding_row(window_logic, tmp_path, monkeypatch):
+    """ Проверка отображения и расчета по файлу со строкой не в кодировке файла """
+    print('\n\n** Проверка отображения и расчета по файлу со строкой не в кодировке файла. **\n')
+    monkeypatch.setattr(QtWidgets.QMessageBox, 'exec', lambda self: 0)
+    filename = tmp_path / 'data.csv'
+    text = 'Город,ЗП\n' + ''.join('Томск,%d\n' % (100 + i) for i in range(20))
+    filename.write_bytes(text.encode('utf-8') + 'Омск,200\n'.encode('cp1251'))
+
+    window = window_logic.ResearchApp()
+    window.open_mapped_view(str(filename))
+    model = window.tableView.model()
+    assert model.data(model.index(20, 1)) == '200'
+
+    window.properties_indexes[(0, 0)] = ''
+    window.calc_point_logic()
+    wait_point(window)
+    message = window_logic.point_error_messages[window_logic.ErrorCodes.ERROR_INVALID_FILE_FORMAT]
+    assert window.ValuePointEdit.text() == message
+    window.close()
+
+
+def test_cancel_load_button(window_logic, tmp_path, monkeypatch):
+    """ Проверка отмены фоновой загрузки кнопкой рядом с прогрессом """
+    print('\n\n** Проверка отмены фоновой загрузки кнопкой рядом с прогрессом. **\n')
+    monkeypatch.setattr(QtWidgets.QMessageBox, 'exec', lambda self: 0)
+    filename = tmp_path / 'data.csv'
+    filename.write_text('Город,ЗП\n' + 'Томск,100\n' * 1000, encoding='utf-8')
+
+    window = window_logic.ResearchApp()
+    assert not window.CancelLoadButton.isVisibleTo(window)
+    monkeypatch.setattr(QtWidgets.QFileDialog, 'getOpenFileName', lambda *args, **kwargs: (str(filename), ''))
+    window.load_button_logic()
+    assert window.CancelLoadButton.isVisibleTo(window) and 'Esc' in window.LoadProgressBar.format()
+
+    window.CancelLoadButton.click()
+    assert window.load_worker is None
+    assert not window.CancelLoadButton.isVisibleTo(window) and not window.LoadProgressBar.isVisibleTo(window)
+    window.close()
+
+
+def test_export_trace_unwritable(window_logic, tmp_path, monkeypatch):
+    """ Проверка сохранения трассировки в недоступное место """
+    print('\n\n** Проверка сохранения трассировки в недоступное место. **\n')
+    messages = []
+    monkeypatch.setattr(QtWidgets.QMessageBox, 'exec', lambda self: messages.append(self.text()) or 0)
+    filename = str(tmp_path / 'missing' / 'trace.json')
+    monkeypatch.setattr(QtWidgets.QFileDialog, 'getSaveFileName', lambda *args, **kwargs: (filename, ''))
+
+    window = window_logic.ResearchApp()
+    assert window.export_trace_logic() == window_logic.ErrorCodes.ERROR_FILE_NOT_LOADED
+    assert len(messages) == 1 and messages[0].endswith("Не удалось сохранить трассировку в выбранный файл.")
+    window.close()